@@ -1,6 +1,12 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import datetime
+import logging
+import os
+import time
+import traceback
+from collections import deque
+from Resources.Limits import RateLimited
 
 """Error Handler
 
@@ -14,14 +20,21 @@ class Errors(commands.Cog, name = "Error Handling"):
     """
     def __init__(self, bot):
         self.bot = bot
-        print(f"{bot.OK} {bot.TIMELOG()} Loaded Error Cog.")
+        self.log = bot.log_util.get_logger("Errors")
+
+        # Error records by fingerprint, see `track`.
+        self.fingerprints = {}
+        self.flush_reports.start()
+
+        self.log.info("Loaded Error Cog.")
 
     """ Method | Cog Unload
 
     Called when the cog is unloaded from the system.
     """
     def cog_unload(self):
-        print(f"{self.bot.OK} {self.bot.TIMELOG()} Unloaded Error Cog.")
+        self.flush_reports.cancel()
+        self.log.info("Unloaded Error Cog.")
 
     """ DISABLED - Is unnecessary
     @commands.guild_only()
@@ -56,106 +69,250 @@ class Errors(commands.Cog, name = "Error Handling"):
         If the error is not in the list of directly handled errors,
         reply with the command error, and send a log of the error to
         the log channel.
+
+        Rate limited commands are answered with a short message the first
+        time a user hits the limit, and ignored after that, so spamming a
+        command costs as little as possible.
         """
+        if isinstance(error, RateLimited):
+            if error.notify:
+                await ctx.send(f"{ctx.author.mention} {error}", delete_after = 10)
+            return
+
         if self.bot.delete_commands:
             await ctx.message.delete()
 
-        if isinstance(error, commands.CommandNotFound):
-            if ctx.message.content.startswith(f"{self.bot.prefix*2}"):
-                return
+        if isinstance(error, commands.CommandNotFound) and ctx.message.content.startswith(f"{self.bot.prefix*2}"):
+            return
 
-            self.print_log(type = self.bot.WARN, message = "Command Not Found", ctx = ctx)
-            embed = self.bot.embed_util.get_embed(
-                title = "Command Not Found",
-                author = ctx.author
-            )
-            await ctx.send(embed = embed)
-            embed = self.bot.embed_util.update_embed(
-                embed = embed,
-                author = ctx.author,
-                ts = True
-            )
-            log = self.bot.get_channel(self.bot.data['logs']['errors'])
-            await log.send(embed = embed)
+        # Repeats of an error are only printed and logged once per reporting window.
+        record = self.track(ctx, error)
+        first = record['window_count'] == 1
+
+        if isinstance(error, commands.CommandNotFound):
+            if first:
+                self.print_log(type = self.bot.WARN, message = "Command Not Found", ctx = ctx)
+            await self.report(ctx, record, title = "Command Not Found")
 
         elif isinstance(error, commands.BadArgument) and "not found" in str(error):
-            self.print_log(type = self.bot.ERR, message = f"{str(error).split(' ')[0]} Not Found", ctx = ctx, err = error)
-            embed = self.bot.embed_util.get_embed(
-                title =  f"{str(error).split(' ')[0]} Not Found",
-                author = ctx.author,
+            if first:
+                self.print_log(type = self.bot.ERR, message = f"{str(error).split(' ')[0]} Not Found", ctx = ctx, err = error)
+            await self.report(
+                ctx,
+                record,
+                title = f"{str(error).split(' ')[0]} Not Found",
                 fields = [{
                     "name": "Received",
                     "value": "`" + str(error).split('\"')[1] + "`",
                     "inline": False
                 }]
             )
-            await ctx.send(embed = embed)
-            embed = self.bot.embed_util.update_embed(
-                embed = embed,
-                author = ctx.author,
-                ts = True
-            )
-            log = self.bot.get_channel(self.bot.data['logs']['errors'])
-            await log.send(embed = embed)
 
         elif isinstance(error, commands.CheckFailure):
-            self.print_log(
-                type = self.bot.WARN,
-                message = "User attempted to use command without permission",
-                ctx = ctx
-            )
-
-            embed = self.bot.embed_util.get_embed(
+            if first:
+                self.print_log(
+                    type = self.bot.WARN,
+                    message = "User attempted to use command without permission",
+                    ctx = ctx
+                )
+            await self.report(
+                ctx,
+                record,
                 title = "Permission Denied",
-                desc = f"I'm sorry {ctx.author.name}, I'm afraid I can't to that.",
-                author = ctx.author
+                desc = f"I'm sorry {ctx.author.name}, I'm afraid I can't to that."
             )
-            await ctx.send(embed = embed)
-            embed = self.bot.embed_util.update_embed(
-                embed = embed,
-                author = ctx.author,
-                ts = True
-            )
-            log = self.bot.get_channel(self.bot.data['logs']['errors'])
-            await log.send(embed = embed)
 
         elif isinstance(error, commands.MissingRequiredArgument):
             error = str(error).split(" ")
             error[0] = '`' + error[0] + '`'
             error = " ".join(error)
 
-            self.print_log(type = self.bot.ERR, message = "Missing required parameter", err = error, ctx = ctx)
-
-            embed = self.bot.embed_util.get_embed(
+            if first:
+                self.print_log(type = self.bot.ERR, message = "Missing required parameter", err = error, ctx = ctx)
+            await self.report(
+                ctx,
+                record,
                 title = "Missing Required Parameter",
-                desc = error.split(' ')[0],
-                author = ctx.author
+                desc = error.split(' ')[0]
             )
-            await ctx.send(embed = embed)
-            embed = self.bot.embed_util.update_embed(
-                embed = embed,
-                author = ctx.author,
-                ts = True
-            )
-            log = self.bot.get_channel(self.bot.data['logs']['errors'])
-            await log.send(embed = embed)
 
         else:
-            embed = self.bot.embed_util.get_embed(
+            await self.report(
+                ctx,
+                record,
                 title = "Command Failed",
-                desc = str(error),
-                author = ctx.author
+                desc = str(error)
             )
+
+            if first:
+                self.print_log(type = self.bot.ERR, message = error)
+
+    async def report(self, ctx, record, title, desc = None, fields = None):
+        """Reporting Errors
+
+        Replies to the user with an error report, then sends the
+        same report with a timestamp to the error log channel.
+
+        Each user only gets one reply per error fingerprint per window,
+        and only the first occurrence in a window is sent to the log
+        channel, the rest are summarized by `flush_reports`.
+        """
+        record['title'] = title
+        reply = not ctx.author.id in record['users']
+        record['users'].add(ctx.author.id)
+        if not reply and record['window_count'] > 1:
+            return
+
+        embed = self.bot.embed_util.from_template(
+            "error_report",
+            title = title,
+            desc = desc or "",
+            author = ctx.author
+        )
+        for field in fields or []:
+            embed.add_field(name = field['name'], value = field['value'], inline = field['inline'])
+        if reply:
             await ctx.send(embed = embed)
-            embed = self.bot.embed_util.update_embed(
-                embed = embed,
-                author = ctx.author,
-                ts = True
+
+        if record['window_count'] == 1:
+            embed.timestamp = self.bot.embed_ts()
+            await self.bot.send_log(ctx.guild, 'errors', embed = embed)
+
+    def fingerprint(self, ctx, error):
+        """Error Fingerprint
+
+        Identifies an error by its exception type, the command it
+        happened in, and the file and line it was raised from.
+        """
+        original = getattr(error, 'original', error)
+        location = ""
+        if original.__traceback__:
+            frame = traceback.extract_tb(original.__traceback__)[-1]
+            location = f"{os.path.basename(frame.filename)}:{frame.lineno}"
+        command = ctx.command.qualified_name if ctx.command else ""
+        return (type(original).__name__, command, location)
+
+    def track(self, ctx, error):
+        """Tracking Errors
+
+        Counts an occurrence of an error against its fingerprint,
+        starting a new reporting window if one is not already open,
+        and keeps a few sample contexts for the window summary.
+        """
+        key = self.fingerprint(ctx, error)
+        record = self.fingerprints.get(key)
+        if not record:
+            record = self.fingerprints[key] = {
+                "key": key,
+                "title": None,
+                "total": 0,
+                "window_start": None,
+                "window_count": 0,
+                "users": set(),
+                "samples": deque(maxlen = self.bot.settings.error_samples)
+            }
+
+        if record['window_start'] is None:
+            record['window_start'] = time.monotonic()
+        record['total'] += 1
+        record['window_count'] += 1
+        record['samples'].append({
+            "author": str(ctx.author),
+            "channel": str(ctx.channel),
+            "content": ctx.message.content[:100]
+        })
+        return record
+
+    @tasks.loop(seconds = 5)
+    async def flush_reports(self):
+        """Flushing Error Reports
+
+        Closes every reporting window that has run its length, sending
+        a single summary to the log channel for errors that happened
+        more than once in it.
+
+        The records are copied first, as errors can be tracked while a
+        summary is being sent, and a summary that fails to send is only
+        logged, so it can't stop the other windows from closing.
+        """
+        now = time.monotonic()
+        for record in list(self.fingerprints.values()):
+            if record['window_start'] is None or now - record['window_start'] < self.bot.settings.error_window:
+                continue
+
+            count = record['window_count']
+            samples = list(record['samples'])
+            record['window_start'] = None
+            record['window_count'] = 0
+            record['users'].clear()
+            record['samples'].clear()
+            if count < 2:
+                continue
+
+            error_type, command, location = record['key']
+            self.log.warning(
+                f"{record['title']} repeated {count} times in {self.bot.settings.error_window}s",
+                extra = {"fields": {"Error": error_type, "Command": command, "Location": location}}
             )
-            log = self.bot.get_channel(self.bot.data['logs']['errors'])
-            await log.send(embed = embed)
+            try:
+                embed = self.bot.embed_util.get_embed(
+                    title = f"{record['title']} (x{count})",
+                    desc = f"`{error_type}`{f' in `{command}`' if command else ''}{f' at `{location}`' if location else ''} happened {count} times in the last {self.bot.settings.error_window} seconds.",
+                    fields = [
+                        {"name": f"Sample {i + 1}", "value": f"`{s['author']}` in `#{s['channel']}`: `{s['content']}`", "inline": False}
+                        for i, s in enumerate(samples)
+                    ],
+                    ts = True
+                )
+                # Repeats are counted across every guild, so the summary goes to the bot wide error log.
+                await self.bot.send_log(None, 'errors', embed = embed)
+            except Exception:
+                self.log.exception(f"Failed to send the summary for {record['title']}.")
 
-            self.print_log(type = self.bot.ERR, message = error)
+    @flush_reports.before_loop
+    async def before_flush_reports(self):
+        await self.bot.wait_until_ready()
+
+    @flush_reports.error
+    async def flush_reports_error(self, error):
+        """Flushing Error Reports Failure
+
+        Logs an unexpected failure of the flush task and starts it again
+        once it has stopped, as without it no reporting window would ever
+        close again.
+        """
+        self.log.error("The error report flush task failed, restarting it.", exc_info = error)
+
+        def restart(task):
+            # The exception was logged above, retrieving it keeps asyncio from logging it again.
+            task.exception()
+            self.flush_reports.start()
+        self.flush_reports.get_task().add_done_callback(restart)
+
+    @commands.group(name = "errors", help = "Commands for viewing errors the bot has run into.", invoke_without_command = True)
+    async def errors(self, ctx):
+        await ctx.send_help("errors")
+
+    @errors.command(name = "top", help = "Lists the most frequent errors since the bot started.", brief = "10")
+    async def errors_top(self, ctx, count: int = 10):
+        """Top Errors
+
+        Lists the error fingerprints that happened the most since the
+        bot started, most frequent first.
+        """
+        records = sorted(self.fingerprints.values(), key = lambda r: r['total'], reverse = True)[:count]
+        lines = []
+        for i, r in enumerate(records, start = 1):
+            error_type, command, location = r['key']
+            lines.append(f"**{i}.** `{error_type}`{f' in `{command}`' if command else ''}{f' at `{location}`' if location else ''} - `{r['total']}`")
+
+        embeds = self.bot.embed_util.get_embeds(
+            title = "Most Frequent Errors",
+            desc = "\n".join(lines) if lines else "No errors since startup.",
+            author = ctx.author
+        )
+        for embed in embeds:
+            await ctx.send(embed = embed)
 
     @commands.Cog.listener()
     async def on_error(self, error):
@@ -169,19 +326,23 @@ class Errors(commands.Cog, name = "Error Handling"):
     def print_log(self, type, message, err = None, ctx = None):
         """Printing Error Logs
 
-        Prints information about an error to the console/terminal.
+        Logs information about an error as a single structured record,
+        which is written to the console and the log file.
         """
-        print(f"{type} {self.bot.TIMELOG()} {message}:")
+        fields = {}
         if err:
-            print(f"{' ' * 35} Error: {err}")
+            fields["Error"] = err
         if ctx:
             failed_com = ctx.message.content.split(' ')
             if len(failed_com) > 1:
-                print(f"{' ' * 35} Command: {failed_com[0]} | Args: {' '.join(failed_com[1:])}")
+                fields["Command"] = f"{failed_com[0]} | Args: {' '.join(failed_com[1:])}"
             else:
-                print(f"{' ' * 35} Command: {failed_com[0]}")
-            print(f"{' ' * 35} Author: {ctx.author} | ID: {ctx.author.id}")
-            print(f"{' ' * 35} Channel: {ctx.channel} | ID: {ctx.channel.id}")
+                fields["Command"] = failed_com[0]
+            fields["Author"] = f"{ctx.author} | ID: {ctx.author.id}"
+            fields["Channel"] = f"{ctx.channel} | ID: {ctx.channel.id}"
+
+        level = logging.WARNING if type == self.bot.WARN else logging.ERROR
+        self.log.log(level, str(message), extra = {"fields": fields})
 
 def setup(bot):
     """Setup
@@ -17,14 +17,15 @@ class General(commands.Cog, name = "General"):
     """A general set of commands."""
     def __init__(self, bot):
         self.bot = bot
-        print(f"{bot.OK} {bot.TIMELOG()} Loaded General Cog.")
+        self.log = bot.log_util.get_logger("General")
+        self.log.info("Loaded General Cog.")
 
     """ Method | Cog Unload
 
     Called when the cog is unloaded from the system.
     """
     def cog_unload(self):
-        print(f"{self.bot.OK} {self.bot.TIMELOG()} Unloaded General Cog.")
+        self.log.info("Unloaded General Cog.")
 
     @commands.guild_only()
     @commands.command(name='uptime', help = 'Returns the amount of time the bot has been online.')
@@ -61,6 +62,9 @@ class General(commands.Cog, name = "General"):
         Returns two values, the ping of the Discord bot to the API,
         and the ping time it takes from when the original message is sent
         to when the bot successfully posts its response.
+
+        The API latency is that of the shard this server is on, with
+        every shard's latency listed when the bot runs more than one.
         """
         if self.bot.delete_commands:
             await ctx.message.delete()
@@ -72,15 +76,92 @@ class General(commands.Cog, name = "General"):
         )
         m = await ctx.send(embed = embed)
 
+        shard = self.bot.get_shard(ctx.guild.shard_id)
         embed = self.bot.embed_util.update_embed(
             embed = embed,
-            desc = "Message latency is {} ms\nDiscord API Latency is {} ms".format(
+            desc = "Message latency is {} ms\nDiscord API Latency is {} (Shard {})".format(
                 trunc((m.created_at - ctx.message.created_at).total_seconds() * 1000),
-                trunc(self.bot.latency * 1000)
-            )
+                self.bot.shard_metrics.format_latency(shard.latency),
+                ctx.guild.shard_id
+            ),
+            fields = self.bot.shard_metrics.get_fields() if len(self.bot.latencies) > 1 else None
         )
         await m.edit(embed = embed)
 
+    @commands.guild_only()
+    @commands.group(name = 'stats', help = 'Shows how each shard of the bot is doing.', invoke_without_command = True)
+    async def stats(self, ctx):
+        """Get Bot Stats
+
+        Shows the stats for each of the bot's shards,
+        the same as `stats shards`.
+        """
+        await self.stats_shards(ctx)
+
+    @commands.guild_only()
+    @stats.command(name = 'shards', help = 'Shows the latency, event rate and reconnects of each shard.')
+    async def stats_shards(self, ctx):
+        """Get Shard Stats
+
+        Shows each shard's latency, the number of servers it has,
+        the gateway events it has received (and how many per second),
+        and how many times it has had to reconnect.
+        """
+        embed = self.bot.embed_util.get_embed(
+            title = f"{self.bot.user.name} Shards",
+            desc = f"Running {len(self.bot.latencies)} of {self.bot.shard_count} shards, this server is on shard {ctx.guild.shard_id}.",
+            fields = self.bot.shard_metrics.get_fields(),
+            author = ctx.author
+        )
+        await ctx.send(embed = embed)
+
+    @commands.guild_only()
+    @stats.command(name = 'commands', help = 'Shows how long each command takes and how often it fails, since startup or over the last hour.', brief = "hour")
+    async def stats_commands(self, ctx, period: str = "all"):
+        """Get Command Stats
+
+        Shows how many times each command was used, how long it
+        took (the median, 95th and 99th percentiles) from the
+        permission check to the reply, and how often it failed.
+
+        The period is either "all" (since startup) or "hour".
+        """
+        period = period.lower()
+        if period not in ("all", "hour"):
+            raise commands.BadArgument(f'Period "{period}" not found, use "all" or "hour".')
+
+        rows = []
+        for name, stats in self.bot.metrics.command_stats.items():
+            histogram = stats.total if period == "all" else stats.last_hour()
+            if histogram.count:
+                rows.append((name, histogram))
+        rows.sort(key = lambda row: row[1].count, reverse = True)
+
+        fields = [{
+            "name": name,
+            "value": "Used `{}` times, `{:.1%}` failed\np50 `{}` p95 `{}` p99 `{}`".format(
+                histogram.count,
+                histogram.failed / histogram.count,
+                *(self.format_duration(histogram.percentile(p)) for p in (50, 95, 99))
+            ),
+            "inline": True
+        } for name, histogram in rows]
+
+        embeds = self.bot.embed_util.get_embeds(
+            title = f"{self.bot.user.name} Commands",
+            desc = ("Since startup" if period == "all" else "Over the last hour") + ("." if fields else ", no commands have been used."),
+            fields = fields,
+            author = ctx.author
+        )
+        for embed in embeds:
+            await ctx.send(embed = embed)
+
+    @staticmethod
+    def format_duration(seconds):
+        if seconds < 1:
+            return f"{seconds * 1000:.0f} ms"
+        return f"{seconds:.2f} s"
+
     @commands.command(name = 'charinfo', aliases = ['char'], help = 'Gets information on a provided character, best used with a default emoji.', brief = ":regional_indicator_a:")
     async def charinfo(self, ctx, *, characters: str):
         def to_string(c):
@@ -118,7 +199,7 @@ class General(commands.Cog, name = "General"):
         if self.bot.delete_commands:
             await ctx.message.delete()
 
-        print(ctx.guild.features)
+        self.log.debug(f"Guild features: {ctx.guild.features}")
         if 'VANITY_URL' in ctx.guild.features:
             invite = await ctx.guild.vanity_invite()
         else:
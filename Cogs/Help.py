@@ -25,6 +25,48 @@ class HelpSource(menus.ListPageSource):
         )
         return embed
 
+"""Help Cache
+
+Holds help output that only depends on the registered commands and the permissions,
+so it is built once instead of on every use of the help command.
+
+    - pages: The bot help fields, per permission profile (see `DataManager.get_permission_profile`).
+    - groups: The command and example lines of every group, built for all groups at once.
+
+Everything is thrown away whenever a cog is loaded or unloaded, the permissions are reloaded, or the prefix changes.
+"""
+class HelpCache:
+    def __init__(self, bot):
+        self.bot = bot
+        self.version = None
+        self.pages = {}
+        self.groups = {}
+
+    def check(self, prefix):
+        version = (self.bot.commands_version, self.bot.permissions_version, prefix)
+        if version != self.version:
+            self.version = version
+            self.pages = {}
+            self.groups = {
+                command.qualified_name: self.build_group(command, prefix)
+                for command in self.bot.walk_commands() if isinstance(command, commands.Group)
+            }
+
+    def build_group(self, group, prefix):
+        command_activation = []
+        command_example = []
+        seen = set()
+        for command in group.walk_commands():
+            if command.hidden or command.qualified_name in seen:
+                continue
+            seen.add(command.qualified_name)
+            command_activation.append(f"`{command.qualified_name} {command.signature}` - {command.help}")
+            if command.brief not in [None, ""]:
+                command_example.append(f"`{prefix}{command.qualified_name} {command.brief}`")
+            else:
+                command_example.append(f"`{prefix}{command.qualified_name}`")
+        return command_activation, command_example
+
 """Custom Help Command
 
 Contains all of the features for a custom help message depending on certain
@@ -34,25 +76,53 @@ NOTE: Users who use the help command can only see commands that they are actuall
 Similarly, any commands that have `hidden=True` in their decorator are hidden.
 """
 class TheHelpCommand(commands.MinimalHelpCommand):
+    async def filter_commands(self, commands, *, sort = False, key = None):
+        """Filter the commands a user is allowed to use.
+
+        The context is marked while the checks run, as they are only
+        looking and shouldn't use up the rate limits of each command.
+        """
+        self.context.checking_only = True
+        try:
+            return await super().filter_commands(commands, sort = sort, key = key)
+        finally:
+            self.context.checking_only = False
+
     async def send_bot_help(self, mapping):
         """Send a help list for all of the bot commands.
 
         Is now using pagination as well.
+
+        The fields are cached per permission profile, as everyone with the
+        same permissions sees the same commands.
         """
-        fields = []
-        # Parsing through all cogs and all commands contained within each command.
-        for cog in mapping.keys():
-            if cog:
-                command_list = await self.filter_commands(mapping[cog], sort = True)
-                if len(command_list) > 0:
-                    # If a cog contains visible commands, add the to an embed field.
-                    fields.append({
-                        "name": cog.qualified_name,
-                        "value": f"{cog.description}\nCommands:\n" + ", ".join(f"`{command}`" for command in command_list),
-                        "inline": False
-                    })
-
-        # Create the paginated help menu
+        cache = self.cog.cache
+        cache.check(self.clean_prefix)
+        profile = None
+        if self.context.guild:
+            profile = self.context.bot.data_manager.get_permission_profile(self.context.author)
+        # Direct messages fail guild only commands, so they get their own entry.
+        key = (self.context.guild is None, profile)
+
+        fields = cache.pages.get(key)
+        if fields is None:
+            fields = []
+            # Parsing through all cogs and all commands contained within each command.
+            for cog in mapping.keys():
+                if cog:
+                    command_list = await self.filter_commands(mapping[cog], sort = True)
+                    if len(command_list) > 0:
+                        # If a cog contains visible commands, add the to an embed field.
+                        fields.append({
+                            "name": cog.qualified_name,
+                            "value": f"{cog.description}\nCommands:\n" + ", ".join(f"`{command}`" for command in command_list),
+                            "inline": False
+                        })
+
+            # Split any cog with too many commands to fit in one field.
+            fields = cache.pages[key] = self.context.bot.embed_util.split_fields(fields)
+
+        # Create the paginated help menu.
         pages = menus.MenuPages(source = HelpSource(self.context, fields), delete_message_after = True)
         await pages.start(self.context)
 
@@ -62,7 +132,7 @@ class TheHelpCommand(commands.MinimalHelpCommand):
         Sends help for all commands contained within a cog, by
         cog name.
         """
-        embed = self.context.bot.embed_util.get_embed(
+        embeds = self.context.bot.embed_util.get_embeds(
             title = f"{cog.qualified_name} Help",
             desc = f"{cog.description}\nTo learn more about specific commands, use `{self.clean_prefix}help <command>`",
             author = self.context.message.author,
@@ -72,23 +142,17 @@ class TheHelpCommand(commands.MinimalHelpCommand):
                 "inline": False
             }]
         )
-        await self.get_destination().send(embed = embed)
+        for embed in embeds:
+            await self.get_destination().send(embed = embed)
 
     async def send_group_help(self, group):
         """Grouped Commands
 
         Sends help message for all commands grouped in a parent command.
         """
-        command_list = group.walk_commands()
-        command_activation = []
-        command_example = []
-        for command in command_list:
-            if "`" + command.qualified_name + " " + command.signature + "` - {}".format(command.help) not in command_activation and not command.hidden:
-                command_activation.append("`" + command.qualified_name + " " + command.signature + "` - {}".format(command.help))
-                if command.brief not in [None, ""]:
-                    command_example.append("`" + self.clean_prefix + command.qualified_name + " " + command.brief + "`")
-                else:
-                    command_example.append("`" + self.clean_prefix + command.qualified_name + "`")
+        cache = self.cog.cache
+        cache.check(self.clean_prefix)
+        command_activation, command_example = cache.groups[group.qualified_name]
 
         fields = []
         if group.aliases:
@@ -108,13 +172,14 @@ class TheHelpCommand(commands.MinimalHelpCommand):
             "inline": False
         })
 
-        embed = self.context.bot.embed_util.get_embed(
+        embeds = self.context.bot.embed_util.get_embeds(
             title = f"'{group.qualified_name.capitalize()}' Help",
             desc = f"{group.help}\n\nFor more information on each command, use `{self.clean_prefix}help [command]`.",
             fields = fields,
             author = self.context.message.author
         )
-        await self.get_destination().send(embed = embed)
+        for embed in embeds:
+            await self.get_destination().send(embed = embed)
 
     async def send_command_help(self, command):
         """Command Specific
@@ -156,17 +221,20 @@ class LoadHelp(commands.Cog, name = "Help"):
     Get help for all cogs/commands.
     """
     def __init__(self, bot):
+        self.bot = bot
+        self.log = bot.log_util.get_logger("Help")
+        self.cache = HelpCache(bot)
         self._original_help_command = bot.help_command
         bot.help_command = TheHelpCommand()
         bot.help_command.cog = self
-        print(f"{bot.OK} {bot.TIMELOG()} Loaded Help Cog.")
+        self.log.info("Loaded Help Cog.")
 
     """ Method | Cog Unload
 
     Called when the cog is unloaded from the system.
     """
     def cog_unload(self):
-        print(f"{self.bot.OK} {self.bot.TIMELOG()} Unloaded Help Cog.")
+        self.log.info("Unloaded Help Cog.")
 
 def setup(bot):
     """Setup
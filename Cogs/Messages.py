@@ -1,10 +1,12 @@
 import asyncio
+import uuid
 
 import discord
 from discord.ext import commands
 import datetime
 
 from Resources.Menus import MenuListSource, MenuListSelector
+from Resources.Scheduler import Scheduler
 
 """ Class | Message
 
@@ -19,12 +21,29 @@ class Message(commands.Cog, name = "Message"):
     """
     def __init__(self, bot):
         self.bot = bot
+        self.log = bot.log_util.get_logger("Messages")
 
+        save = False
         if not 'custom_messages' in self.bot.data:
             self.bot.data['custom_messages'] = []
+            save = True
+
+        # Scheduled messages are tracked by ID, since list positions change when messages are deleted.
+        for msg in self.bot.data['custom_messages']:
+            if not 'id' in msg:
+                msg['id'] = uuid.uuid4().hex
+                save = True
+        if save:
             self.bot.data_manager.save_data()
 
-        print(f"{bot.OK} {bot.TIMELOG()} Loaded Message Cog.")
+        # A single scheduler task handles every scheduled message.
+        self.scheduler = Scheduler(self.bot, self.run_scheduled_message, max_catch_up = self.bot.settings.max_catch_up)
+        self.load_schedules()
+        # In a cluster only the first worker sends scheduled messages, so they aren't sent once per worker.
+        if not self.bot.cluster or self.bot.cluster.is_primary:
+            self.scheduler.start()
+
+        self.log.info("Loaded Message Cog.")
 
 
     """ Method | On Cog Unload
@@ -32,7 +51,33 @@ class Message(commands.Cog, name = "Message"):
     This method is called when the Cog is unloaded.
     """
     def cog_unload(self):
-        print(f"{self.bot.OK} {self.bot.TIMELOG()} Unloaded Message Cog.")
+        self.scheduler.stop()
+        self.log.info("Unloaded Message Cog.")
+
+
+    """ Method | Load Schedules
+
+    Adds every scheduled message to the scheduler, replacing any jobs it already had.
+    Stored schedules that are no longer valid are logged and left out.
+    """
+    def load_schedules(self):
+        self.scheduler.clear()
+        for msg in self.bot.data['custom_messages']:
+            if msg.get('schedule'):
+                try:
+                    self.scheduler.add(msg['id'], msg['schedule'])
+                except ValueError as e:
+                    self.log.error(f"Not scheduling \"{msg['title']}\": {e}")
+
+
+    """ Event Listener | Data Reload
+
+    Reloads the schedules when another cluster worker changes the custom messages.
+    """
+    @commands.Cog.listener()
+    async def on_data_reload(self, keys):
+        if 'custom_messages' in keys:
+            self.load_schedules()
 
 
     """ Command | Message
@@ -163,7 +208,7 @@ class Message(commands.Cog, name = "Message"):
                 )
                 await prompt.edit(embed = embed)
             except Exception as e:
-                print(e)
+                self.log.debug(f"Invalid thumbnail url: {e}")
                 embed = self.bot.embed_util.update_embed(
                     embed = embed,
                     desc = "Your image url was an invlaid image! Please __**send a valid image url for the message**__. This adds a small image in the top-right of your message."
@@ -412,6 +457,7 @@ class Message(commands.Cog, name = "Message"):
                 )
                 await prompt.edit(embed = embed)
 
+        data['id'] = uuid.uuid4().hex
         self.bot.data['custom_messages'].append(data)
         self.bot.data_manager.save_data()
 
@@ -421,15 +467,7 @@ class Message(commands.Cog, name = "Message"):
             fields = [{"name": "Channels", "value": "\n".join(ch.mention for ch in msg.channel_mentions)}]
         )
         await prompt.edit(embed = embed)
-        embed = self.bot.embed_util.get_embed(
-            title = data['title'],
-            desc = data['description'],
-            thumbnail = data['thumbnail'],
-            image = data['image'],
-            url = data['url'],
-            author = data['author'],
-            fields = data['fields']
-        )
+        embed = self.get_custom_embed(data)
         await ctx.send(embed = embed)
 
         embed = self.bot.embed_util.get_embed(
@@ -438,8 +476,7 @@ class Message(commands.Cog, name = "Message"):
             fields = [{"name": "Title", "value": data['title'], "inline": False}, {"name": "Channels", "value": "\n".join(ch.mention for ch in msg.channel_mentions)}],
             ts = True
         )
-        log = self.bot.get_channel(self.bot.data['logs']['custom_messages'])
-        await log.send(embed = embed)
+        await self.bot.send_log(ctx.guild, 'custom_messages', embed = embed)
 
 
     """ Command | Send Message
@@ -469,9 +506,190 @@ class Message(commands.Cog, name = "Message"):
             )
             await ctx.send(embed = embed)
 
+    """ Coroutine | Handle Custom Message Start
+
+    Sends the selected custom message to all of its channels at once, records the IDs of the sent
+    messages back into the custom message, and replies with a summary of how each channel went.
+    """
     async def handle_custom_message_start(self, ctx, selection, payload):
         msg = self.bot.data['custom_messages'][selection]
+        results = await self.send_custom_message(msg)
+
+        embed = self.bot.fan_out.get_summary_embed(f"Sent \"{msg['title']}\"", results, author = ctx.author)
+        await ctx.send(embed = embed)
+
+    """ Coroutine | Send Custom Message
+
+    Sends a custom message to all of its channels through the fan out sender,
+    recording the sent copies so they can be edited later.
+    """
+    async def send_custom_message(self, msg):
+        embed = self.get_custom_embed(msg)
+        content_hash = self.bot.embed_util.get_hash(embed)
+        results = await self.bot.fan_out.send(msg['channels'], embed = embed)
+
+        # JSON object keys have to be strings, so the channel IDs are stored as such.
+        if not 'sent' in msg:
+            msg['sent'] = {}
+        for r in results:
+            if r['ok']:
+                msg['sent'][str(r['channel'])] = {"id": r['message'].id, "hash": content_hash}
+        self.bot.data_manager.save_data()
+
+        return results
+
+
+    """ Command | Edit Message
+
+    Shows the user a menu prompt to select what message they want to edit. Once edited, every copy of the
+    message that was already sent is updated in place.
+    """
+    @commands.guild_only()
+    @message.command(name = "edit", help = "Starts a menu prompt for selecting a custom embedded message to edit, then updates every copy of it that was already sent.")
+    async def edit_message(self, ctx):
+        if len(self.bot.data['custom_messages']) > 0:
+            entries = [e['title'] for e in self.bot.data['custom_messages']]
+
+            source = MenuListSource(
+                self.bot.embed_util,
+                title = "Edit Custom Messages",
+                desc = "Please select a custom message to edit.",
+                entries = entries,
+                selector = True
+            )
+
+            pages = MenuListSelector(ctx, source, self.handle_custom_message_edit, delete_message_after = True)
+            await pages.start(ctx)
+        else:
+            embed = self.bot.embed_util.get_embed(
+                title = "Cannot Edit Custom Messages",
+                desc = f"There are no custom messages registered to be edited. To create a custom message, use `{self.bot.prefix}message create`."
+            )
+            await ctx.send(embed = embed)
+
+    """ Coroutine | Handle Custom Message Edit
+
+    Prompts the user for which part of the selected message to change and its new value,
+    then propagates the change to all of the sent copies.
+    """
+    async def handle_custom_message_edit(self, ctx, selection, payload):
+        msg = self.bot.data['custom_messages'][selection]
+        parts = ['title', 'description', 'url', 'thumbnail', 'image', 'author']
+
+        embed = self.bot.embed_util.get_embed(
+            title = f"Edit \"{msg['title']}\"",
+            desc = "Which part of the message would you like to change? __**Send one of the following**__:\n" + ", ".join(f"`{p}`" for p in parts),
+            footer = "You have 3m"
+        )
+        prompt = await ctx.send(embed = embed)
+
+        def check(m):
+            return ctx.author.id == m.author.id and ctx.channel.id == m.channel.id
+
+        while True:
+            try:
+                reply = await self.bot.wait_for('message', check = check, timeout = 180)
+                await reply.delete()
+            except asyncio.TimeoutError:
+                await prompt.delete()
+                return
+
+            part = reply.content.lower().strip()
+            if part in parts:
+                break
+
+            embed = self.bot.embed_util.update_embed(
+                embed = embed,
+                desc = f"`{reply.content}` is not a part of the message. __**Send one of the following**__:\n" + ", ".join(f"`{p}`" for p in parts)
+            )
+            await prompt.edit(embed = embed)
+
+        embed = self.bot.embed_util.update_embed(
+            embed = embed,
+            desc = f"Got it, now __**send the new {part} for the message**__.",
+            footer = "You have 3m" if part == 'title' else "Enter \"none\" to remove it | You have 3m"
+        )
+        await prompt.edit(embed = embed)
+
+        previous = dict(msg)
+        while True:
+            try:
+                reply = await self.bot.wait_for('message', check = check, timeout = 180)
+                await reply.delete()
+            except asyncio.TimeoutError:
+                await prompt.delete()
+                return
+
+            value = None if reply.content.lower() == 'none' and part != 'title' else reply.content
+            if part == 'author':
+                msg['author'] = {"name": value, "icon_url": msg['author'].get('icon_url') if msg['author'] else None} if value else None
+            else:
+                msg[part] = value
+
+            # Showing the preview doubles as validation, Discord rejects invalid urls and images.
+            try:
+                await prompt.edit(embed = self.get_custom_embed(msg))
+            except discord.HTTPException:
+                msg.update(previous)
+                embed = self.bot.embed_util.update_embed(
+                    embed = embed,
+                    desc = f"That {part} was not valid! Please __**send a valid {part} for the message**__."
+                )
+                await prompt.edit(embed = embed)
+                continue
+            break
+
+        self.bot.data_manager.save_data()
+        await self.propagate_custom_message(ctx, msg)
+
         embed = self.bot.embed_util.get_embed(
+            title = "Custom Embed Edited",
+            desc = f"`{ctx.author}` has changed the {part} of a custom embedded message.",
+            fields = [{"name": "Title", "value": msg['title'], "inline": False}],
+            ts = True
+        )
+        await self.bot.send_log(ctx.guild, 'custom_messages', embed = embed)
+
+    """ Coroutine | Propagate Custom Message
+
+    Renders a custom message once and edits every copy that was already sent to match it.
+
+    Copies whose stored content hash already matches the new render are skipped, and copies
+    that were deleted from Discord, or whose channel no longer exists, are forgotten.
+    """
+    async def propagate_custom_message(self, ctx, msg):
+        embed = self.get_custom_embed(msg)
+        content_hash = self.bot.embed_util.get_hash(embed)
+
+        copies = []
+        skipped = 0
+        for ch, sent in msg.get('sent', {}).items():
+            # Messages sent before hashes were tracked only stored the message ID.
+            if not type(sent) == dict:
+                sent = {"id": sent, "hash": None}
+            if sent['hash'] == content_hash:
+                skipped += 1
+            else:
+                copies.append((int(ch), sent['id']))
+
+        results = await self.bot.fan_out.edit(copies, embed = embed)
+        for (ch, message_id), r in zip(copies, results):
+            if r['ok']:
+                msg['sent'][str(ch)] = {"id": message_id, "hash": content_hash}
+            elif r['status'] == 404:
+                del msg['sent'][str(ch)]
+        self.bot.data_manager.save_data()
+
+        embed = self.bot.fan_out.get_summary_embed(f"Updated \"{msg['title']}\"", results, author = ctx.author, skipped = skipped)
+        await ctx.send(embed = embed)
+
+
+    """ Method | Get Custom Embed
+
+    Renders the embed for a stored custom message.
+    """
+    def get_custom_embed(self, msg):
+        return self.bot.embed_util.get_embed(
             title = msg['title'],
             desc = msg['description'],
             url = msg['url'],
@@ -480,10 +698,6 @@ class Message(commands.Cog, name = "Message"):
             author = msg['author'],
             fields = msg['fields']
         )
-        for ch in msg['channels']:
-            channel = self.bot.get_channel(ch)
-            if channel:
-                await channel.send(embed = embed)
 
 
     @commands.guild_only()
@@ -510,9 +724,207 @@ class Message(commands.Cog, name = "Message"):
             await ctx.send(embed = embed)
 
     async def handle_custom_message_remove(self, ctx, selection, payload):
-        del self.bot.data['custom_messages'][selection]
+        msg = self.bot.data['custom_messages'].pop(selection)
+        self.scheduler.remove(msg['id'])
+        self.bot.data_manager.save_data()
+
+
+    """ Command | Schedule Message
+
+    Shows the user a menu prompt to select a message to send at a set time, or on a recurring schedule.
+    """
+    @commands.guild_only()
+    @message.command(name = "schedule", help = "Starts a menu prompt for selecting a custom embedded message to send at a set time or on a recurring schedule.")
+    async def schedule_message(self, ctx):
+        if len(self.bot.data['custom_messages']) > 0:
+            entries = [e['title'] for e in self.bot.data['custom_messages']]
+
+            source = MenuListSource(
+                self.bot.embed_util,
+                title = "Schedule Custom Messages",
+                desc = "Please select a custom message to schedule.",
+                entries = entries,
+                selector = True
+            )
+
+            pages = MenuListSelector(ctx, source, self.handle_custom_message_schedule, delete_message_after = True)
+            await pages.start(ctx)
+        else:
+            embed = self.bot.embed_util.get_embed(
+                title = "Cannot Schedule Custom Messages",
+                desc = f"There are no custom messages registered to be scheduled. To create a custom message, use `{self.bot.prefix}message create`."
+            )
+            await ctx.send(embed = embed)
+
+    """ Coroutine | Handle Custom Message Schedule
+
+    Prompts the user for when the selected message should be sent, and what to do about
+    runs missed while the bot is offline.
+    """
+    async def handle_custom_message_schedule(self, ctx, selection, payload):
+        msg = self.bot.data['custom_messages'][selection]
+
+        embed = self.bot.embed_util.get_embed(
+            title = f"Schedule \"{msg['title']}\"",
+            desc = "When should this message be sent? __**Send either a date and time**__ in the format `YYYY-MM-DD HH:MM` to send it once, __**or a cron schedule**__ in the format `minute hour day month weekday` to send it repeatedly.\n\nFor example, `0 18 * * 5` sends the message every Friday at 6 PM.",
+            footer = "Times are in the bot's local time | You have 3m"
+        )
+        prompt = await ctx.send(embed = embed)
+
+        def check(m):
+            return ctx.author.id == m.author.id and ctx.channel.id == m.channel.id
+
+        while True:
+            try:
+                reply = await self.bot.wait_for('message', check = check, timeout = 180)
+                await reply.delete()
+            except asyncio.TimeoutError:
+                await prompt.delete()
+                return
+
+            try:
+                at = datetime.datetime.strptime(reply.content.strip(), '%Y-%m-%d %H:%M').astimezone()
+                schedule = {"type": "once", "at": at.astimezone(datetime.timezone.utc).isoformat()}
+                if at <= datetime.datetime.now(datetime.timezone.utc):
+                    raise ValueError("That time has already passed.")
+            except ValueError as e:
+                if len(reply.content.split()) == 5:
+                    schedule = {"type": "cron", "cron": reply.content.strip()}
+                else:
+                    schedule = None
+                    error = str(e) if "passed" in str(e) else "That is not a date and time or a cron schedule."
+
+            if schedule:
+                try:
+                    Scheduler.validate(dict(schedule, catch_up = 'skip'))
+                    break
+                except ValueError as e:
+                    error = str(e)
+
+            embed = self.bot.embed_util.update_embed(
+                embed = embed,
+                desc = f"{error} __**Send either a date and time**__ in the format `YYYY-MM-DD HH:MM`, __**or a cron schedule**__ in the format `minute hour day month weekday`."
+            )
+            await prompt.edit(embed = embed)
+
+        embed = self.bot.embed_util.update_embed(
+            embed = embed,
+            desc = "Got it. If the bot is offline when the message is due, what should happen once it is back?\n\n`skip` - Don't send the missed messages.\n`once` - Send the message once.\n`all` - Send the message once for every time it was missed.",
+            footer = "You have 3m"
+        )
+        await prompt.edit(embed = embed)
+
+        while True:
+            try:
+                reply = await self.bot.wait_for('message', check = check, timeout = 180)
+                await reply.delete()
+            except asyncio.TimeoutError:
+                await prompt.delete()
+                return
+
+            schedule['catch_up'] = reply.content.lower().strip()
+            if schedule['catch_up'] in Scheduler.catch_up_policies:
+                break
+
+            embed = self.bot.embed_util.update_embed(
+                embed = embed,
+                desc = "Please __**send one of**__ `skip`, `once`, or `all`."
+            )
+            await prompt.edit(embed = embed)
+
+        msg['schedule'] = schedule
+        self.scheduler.add(msg['id'], schedule)
         self.bot.data_manager.save_data()
 
+        embed = self.bot.embed_util.get_embed(
+            title = "Custom Embed Scheduled",
+            desc = f"`{ctx.author}` has scheduled a custom embedded message.",
+            fields = [
+                {"name": "Title", "value": msg['title'], "inline": False},
+                {"name": "Schedule", "value": self.describe_schedule(schedule), "inline": False}
+            ],
+            ts = True
+        )
+        await prompt.edit(embed = embed)
+        await self.bot.send_log(ctx.guild, 'custom_messages', embed = embed)
+
+
+    """ Command | Unschedule Message
+
+    Shows the user a menu prompt to select a scheduled message to stop sending.
+    """
+    @commands.guild_only()
+    @message.command(name = "unschedule", help = "Starts a menu prompt for selecting a scheduled custom embedded message to stop sending.")
+    async def unschedule_message(self, ctx):
+        scheduled = [e for e in self.bot.data['custom_messages'] if e.get('schedule')]
+        if len(scheduled) > 0:
+            source = MenuListSource(
+                self.bot.embed_util,
+                title = "Unschedule Custom Messages",
+                desc = "Please select a scheduled message to stop sending.",
+                entries = [f"{e['title']} | {self.describe_schedule(e['schedule'])}" for e in scheduled],
+                selector = True
+            )
+
+            pages = MenuListSelector(ctx, source, self.handle_custom_message_unschedule, delete_message_after = True)
+            await pages.start(ctx)
+        else:
+            embed = self.bot.embed_util.get_embed(
+                title = "No Scheduled Messages",
+                desc = f"There are no scheduled custom messages. To schedule one, use `{self.bot.prefix}message schedule`."
+            )
+            await ctx.send(embed = embed)
+
+    async def handle_custom_message_unschedule(self, ctx, selection, payload):
+        msg = [e for e in self.bot.data['custom_messages'] if e.get('schedule')][selection]
+        self.scheduler.remove(msg['id'])
+        msg['schedule'] = None
+        self.bot.data_manager.save_data()
+
+        embed = self.bot.embed_util.get_embed(
+            title = "Custom Embed Unscheduled",
+            desc = f"`{ctx.author}` has unscheduled a custom embedded message.",
+            fields = [{"name": "Title", "value": msg['title'], "inline": False}],
+            ts = True
+        )
+        await ctx.send(embed = embed)
+        await self.bot.send_log(ctx.guild, 'custom_messages', embed = embed)
+
+
+    """ Coroutine | Run Scheduled Message
+
+    The scheduler callback, which sends a due custom message and logs the outcome.
+    """
+    async def run_scheduled_message(self, key):
+        msg = next((e for e in self.bot.data['custom_messages'] if e['id'] == key), None)
+        if not msg:
+            return
+
+        # The scheduler has already moved the job on, so persist its new state before sending.
+        if not msg['schedule']['next_run']:
+            msg['schedule'] = None
+            self.scheduler.remove(key)
+        self.bot.data_manager.save_data()
+
+        results = await self.send_custom_message(msg)
+        embed = self.bot.fan_out.get_summary_embed(f"Sent Scheduled \"{msg['title']}\"", results)
+        # Custom messages aren't tied to a guild, so scheduled runs are logged bot wide.
+        await self.bot.send_log(None, 'custom_messages', embed = embed)
+
+    """ Method | Describe Schedule
+
+    Formats a schedule to be shown to users.
+    """
+    def describe_schedule(self, schedule):
+        if schedule['type'] == 'cron':
+            desc = f"`{schedule['cron']}`"
+        else:
+            desc = "Once"
+        if schedule.get('next_run'):
+            next_run = datetime.datetime.fromisoformat(schedule['next_run']).astimezone()
+            desc += f" | Next: `{next_run.strftime('%m/%d/%Y | %I:%M %p')}`"
+        return desc
+
 """ Function | Setup
 
 The function called by Discord.py when adding another file in a multi-file project.
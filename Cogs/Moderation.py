@@ -36,6 +36,10 @@ mute <user> [length] - Assigns a role to the specified user which prevents them
 class Moderation(commands.Cog, name = "Moderation"):
     """Commands pertaining to user moderation."""
 
+    # Online counts in the member logs and server stats need presences,
+    # and the leave and role change logs only fire for cached members.
+    cache_needs = {"presences", "members"}
+
     """ Method | Init
 
     This function is called when the Cog is loaded.
@@ -43,6 +47,7 @@ class Moderation(commands.Cog, name = "Moderation"):
     def __init__(self, bot):
         # Give access to the Bot instance.
         self.bot = bot
+        self.log = bot.log_util.get_logger("Moderation")
 
         # Make sure moderation data is initialized.
         save = False
@@ -97,7 +102,7 @@ class Moderation(commands.Cog, name = "Moderation"):
         self.check_mutes.start()
         self.server_stats.start()
 
-        print(f"{bot.OK} {bot.TIMELOG()} Loaded Moderation Cog.")
+        self.log.info("Loaded Moderation Cog.")
 
 
     """ Method | Unload
@@ -109,7 +114,7 @@ class Moderation(commands.Cog, name = "Moderation"):
         self.check_mutes.cancel()
         self.server_stats.cancel()
 
-        print(f"{self.bot.OK} {self.bot.TIMELOG()} Unloaded Moderation Cog.")
+        self.log.info("Unloaded Moderation Cog.")
 
 
     """ Command Group | Logs
@@ -124,7 +129,7 @@ class Moderation(commands.Cog, name = "Moderation"):
         embed = self.bot.embed_util.get_embed(
             title = "Log Channels",
             desc = f"Use `{self.bot.prefix}logs edit log_type #channel` to change what channel a log type uses.",
-            fields = [{"name": " ".join(s.capitalize() for s in getattr(LogType, log).value.split(" ")), "value": self.bot.get_channel(self.bot.data['logs'][log]).mention} for log in sorted(LogType._member_map_)]
+            fields = [{"name": " ".join(s.capitalize() for s in getattr(LogType, log).value.split(" ")), "value": self.get_channel_mention(ctx.guild, log)} for log in sorted(LogType._member_map_)]
         )
 
         await ctx.send(embed = embed)
@@ -161,7 +166,8 @@ class Moderation(commands.Cog, name = "Moderation"):
             return
 
         # Make sure that the new Log Channel is not the same as the one that is already registered.
-        if self.bot.data['logs'][type.name] == channel.id:
+        old_channel = self.bot.data_manager.get_log_channel(ctx.guild, type.name)
+        if old_channel == channel:
             embed = self.bot.embed_util.get_embed(
                 title = "Channel ALready Registered",
                 desc = f"The log type `{type.name}` is already tied to the {channel.mention} channel."
@@ -170,9 +176,7 @@ class Moderation(commands.Cog, name = "Moderation"):
             return
 
         # Register the new log channel.
-        old_channel = self.bot.get_channel(self.bot.data['logs'][type.name])
-        self.bot.data['logs'][type.name] = channel.id
-        self.bot.data_manager.save_data()
+        self.bot.data_manager.set_log_channel(ctx.guild, type.name, channel.id)
 
         # Format the embed confirming the log channel update.
         embed = self.bot.embed_util.get_embed(
@@ -185,7 +189,7 @@ class Moderation(commands.Cog, name = "Moderation"):
                 },
                 {
                     "name": "Old Channel",
-                    "value": old_channel.mention,
+                    "value": old_channel.mention if old_channel else "None",
                     "inline": False
                 }
             ]
@@ -221,7 +225,9 @@ class Moderation(commands.Cog, name = "Moderation"):
     @commands.command(name = "mute", help = "Prevents a user from sending messages either indefinitely or for a set amount of time.", brief = "@username 1h 2m 30s")
     async def mute(self, ctx, user: discord.Member, *, length = None):
         # Get the Muted role.
-        role = ctx.guild.get_role(self.bot.data['mute']['role'])
+        role = self.get_mute_role(ctx.guild)
+        if role is None:
+            return await self.send_no_mute_role(ctx)
 
         # Give the user the role if they do not have it.
         if not role in user.roles:
@@ -269,7 +275,9 @@ class Moderation(commands.Cog, name = "Moderation"):
     @commands.command(name = "unmute", help = "Unmutes a muted member.", brief = "@user")
     async def unmute(self, ctx, user: discord.Member):
         # Get the Muted role.
-        role = ctx.guild.get_role(self.bot.data['mute']['role'])
+        role = self.get_mute_role(ctx.guild)
+        if role is None:
+            return await self.send_no_mute_role(ctx)
 
         # If the user has the role, remove it.
         if role in user.roles:
@@ -295,6 +303,31 @@ class Moderation(commands.Cog, name = "Moderation"):
             await ctx.send(embed = embed)
 
 
+    """ Command | Mute Role
+
+    This command is used to change the role this server gives to muted members.
+
+    Args:
+        - role (discord.Role):
+            Either a mention, case sensitive name, or ID of the role to use.
+    """
+    @commands.guild_only()
+    @commands.command(name = "muterole", help = "Set the role given to muted members in this server.", brief = "@Muted")
+    async def mute_role(self, ctx, *, role: discord.Role):
+        old_role = self.get_mute_role(ctx.guild)
+        self.bot.data_manager.get_guild_data(ctx.guild.id, create = True)['mute_role'] = role.id
+        self.bot.data_manager.save_data()
+
+        embed = self.bot.embed_util.get_embed(
+            title = "Mute Role Updated",
+            fields = [
+                {"name": "New Role", "value": role.mention, "inline": False},
+                {"name": "Old Role", "value": old_role.mention if old_role else "None", "inline": False}
+            ]
+        )
+        await ctx.send(embed = embed)
+
+
     """ Loop | Check Mute Status
 
     This is a function which is triggered every 50 seconds after the bot is online,
@@ -309,10 +342,13 @@ class Moderation(commands.Cog, name = "Moderation"):
             if now > datetime.datetime.fromisoformat(user['time']):
                 # Get the user object and remove the mutedrole from them.
                 guild = self.bot.get_guild(user['guild'])
-                member = guild.get_member(user['id'])
+                # In a cluster, mutes in guilds on another worker's shards are left to that worker.
+                if guild is None:
+                    continue
+                member = await self.bot.get_or_fetch_member(guild, user['id'])
 
-                role = guild.get_role(self.bot.data['mute']['role'])
-                if role in member.roles:
+                role = self.get_mute_role(guild)
+                if member and role is not None and role in member.roles:
                     await member.remove_roles(role)
 
                     # Log the mute timer ending.
@@ -321,8 +357,7 @@ class Moderation(commands.Cog, name = "Moderation"):
                         desc = f"{member.name}'s mute timer ended.",
                         ts = True
                     )
-                    channel = self.bot.get_channel(self.bot.data['logs'][LogType.unmute.name])
-                    await channel.send(embed = embed)
+                    await self.bot.send_log(guild, LogType.unmute.name, embed = embed)
 
 
     """ Event Listener | Member Join
@@ -335,11 +370,10 @@ class Moderation(commands.Cog, name = "Moderation"):
         # Format the embed for the given member's arrival, as well as the total server member count.
         embed = self.bot.embed_util.get_embed(
             desc = f"\N{INBOX TRAY} `{member}` has joined the server. {member.mention}",
-            footer = f"Online: {len([member for member in member.guild.members if member.status in [discord.Status.online, discord.Status.idle, discord.Status.dnd]])} | Total: {member.guild.member_count}",
+            footer = self.bot.cache_profile.get_member_counts(member.guild),
             ts = True
         )
-        channel = self.bot.get_channel(self.bot.data['logs'][LogType.member_join.name])
-        await channel.send(embed = embed)
+        await self.bot.send_log(member.guild, LogType.member_join.name, embed = embed)
 
 
     """ Event Listener | Member Leave
@@ -355,12 +389,11 @@ class Moderation(commands.Cog, name = "Moderation"):
         # Format the embed for the given member's leave, as well as the total server member count.
         embed = self.bot.embed_util.get_embed(
             desc = f"\N{OUTBOX TRAY} `{member}` has left the server.",
-            footer = f"Online: {len([member for member in member.guild.members if member.status in [discord.Status.online, discord.Status.idle, discord.Status.dnd]])} | Total: {member.guild.member_count}",
+            footer = self.bot.cache_profile.get_member_counts(member.guild),
             ts = True
         )
 
-        channel = self.bot.get_channel(self.bot.data['logs'][LogType.member_leave.name])
-        await channel.send(embed = embed)
+        await self.bot.send_log(member.guild, LogType.member_leave.name, embed = embed)
 
 
     """ Event Listener | Member Update
@@ -398,14 +431,17 @@ class Moderation(commands.Cog, name = "Moderation"):
                     "value": "\n".join(role.mention for role in removed),
                     "inline": False
                 })
-            embed = self.bot.embed_util.get_embed(
+            # Large role changes can go over the embed limits, so they are split across several embeds.
+            embeds = self.bot.embed_util.get_embeds(
                 title = "Member Roles Updates",
                 fields = fields,
                 ts = True
             )
 
-            channel = self.bot.get_channel(self.bot.data['logs'][LogType.member_update.name])
-            await channel.send(embed = embed)
+            channel = self.bot.data_manager.get_log_channel(after.guild, LogType.member_update.name)
+            if channel:
+                for embed in embeds:
+                    await channel.send(embed = embed)
 
 
     """ Event Listener | Member Ban
@@ -420,8 +456,7 @@ class Moderation(commands.Cog, name = "Moderation"):
             ts = True
         )
 
-        channel = self.bot.get_channel(self.bot.data['logs'][LogType.member_ban.name])
-        await channel.send(embed = embed)
+        await self.bot.send_log(guild, LogType.member_ban.name, embed = embed)
 
 
     """ Event Listener | Member Unban
@@ -436,21 +471,27 @@ class Moderation(commands.Cog, name = "Moderation"):
             ts = True
         )
 
-        channel = self.bot.get_channel(self.bot.data['logs'][LogType.member_unban.name])
-        await channel.send(embed = embed)
+        await self.bot.send_log(guild, LogType.member_unban.name, embed = embed)
 
 
     """ Loop | Server Stats
 
-    Sends stats about the server to the server analytics
+    Sends stats about each server to its server analytics
     channel every 24 hours after the bot comes online.
     """
     @tasks.loop(hours=24)
     async def server_stats(self):
-        # Get the channel to log server stats to.
-        channel = self.bot.get_channel(self.bot.data['logs'][LogType.stats.name])
-        guild = channel.guild
+        for guild in self.bot.guilds:
+            # Get the channel to log server stats to, skipping servers without one.
+            channel = self.bot.data_manager.get_log_channel(guild, LogType.stats.name)
+            if channel:
+                await self.send_server_stats(guild, channel)
+
+    """ Coroutine | Send Server Stats
 
+    Sends stats about a server to a channel.
+    """
+    async def send_server_stats(self, guild, channel):
         # Format the server stats message.
         embed = self.bot.embed_util.get_embed(
             title = f"{guild.name}",
@@ -474,7 +515,7 @@ class Moderation(commands.Cog, name = "Moderation"):
                 },
                 {
                     "name": "Users",
-                    "value": f"`Online: {len([member for member in guild.members if member.status in [discord.Status.online, discord.Status.idle, discord.Status.dnd]])}` `Total: {guild.member_count}`",
+                    "value": " ".join(f"`{count}`" for count in self.bot.cache_profile.get_member_counts(guild).split(" | ")),
                     "inline": True
                 },
                 {
@@ -496,6 +537,11 @@ class Moderation(commands.Cog, name = "Moderation"):
                     "name": "Owner",
                     "value": f"{guild.owner.mention}",
                     "inline": True
+                },
+                {
+                    "name": "Shard",
+                    "value": f"`{guild.shard_id}` | `{self.bot.shard_metrics.format_latency(self.bot.get_shard(guild.shard_id).latency)}`",
+                    "inline": True
                 }
             ]
         )
@@ -532,63 +578,73 @@ class Moderation(commands.Cog, name = "Moderation"):
     """
     async def log_mod_action(self, ctx, type, target, other = None):
         # Logging the mod action in the command line.
-        print(f"{self.bot.OK} {self.bot.TIMELOG()} New Moderation Action:")
-        print(f"{' '*35} Action Type: {type.name.capitalize()}")
-        print(f"{' '*35} Moderator: {ctx.author} | ID: {ctx.author.id}")
-        print(f"{' '*35} Target: {target} | ID: {target.id}")
-
-        # Creating information fields for an embedded message
-        fields = [
-            {
-                "name": "Action Type",
-                "value": f"`{type.name.capitalize()}`",
-                "inline": False
-            },
-            {
-                "name": "Moderator",
-                "value": f"`{ctx.author}`",
-                "inline": True
-            },
-            {
-                "name": "Target",
-                "value": f"`{target}`",
-                "inline": True
-            }
-        ]
-
-        # Adding extra information.
+        fields = {
+            "Action Type": type.name.capitalize(),
+            "Moderator": f"{ctx.author} | ID: {ctx.author.id}",
+            "Target": f"{target} | ID: {target.id}"
+        }
         if other:
-            print(f"{' '*35} Other Information: {other}")
-            fields.append({
-                "name": "Other Info",
-                "value": other,
-                "inline": False
-            })
+            fields["Other Information"] = other
+        self.log.info("New Moderation Action", extra = {"fields": fields})
 
         # Creating the actual embedded message.
-        embed = self.bot.embed_util.get_embed(
-            title = "New Moderation Action",
-            fields = fields,
-            ts = True
+        embed = self.bot.embed_util.from_template(
+            "mod_action",
+            action = type.name.capitalize(),
+            moderator = ctx.author,
+            target = target
         )
 
+        # Adding extra information.
+        if other:
+            embed.add_field(
+                name = "Other Info",
+                value = other,
+                inline = False
+            )
+
         # Sending the message to the channel for the specific action type.
-        channel = self.bot.get_channel(self.bot.data['logs'][type.name])
-        await channel.send(embed = embed)
+        await self.bot.send_log(ctx.guild, type.name, embed = embed)
+
+    """ Method | Get Channel Mention
+
+    Mentions the channel a guild's logs of a type go to, or "None" if there isn't one.
+    """
+    def get_channel_mention(self, guild, log_type):
+        channel = self.bot.data_manager.get_log_channel(guild, log_type)
+        return channel.mention if channel else "None"
+
+    """ Method | Get Mute Role
+
+    The role a guild gives to muted members. A guild's own role (set with `muterole`) comes first,
+    then the original, bot wide role, which is only found in the guild it was made in. Returns None if there is no role.
+    """
+    def get_mute_role(self, guild):
+        role_id = self.bot.data_manager.get_guild_data(guild.id).get('mute_role')
+        return guild.get_role(role_id or self.bot.data['mute']['role'])
+
+    """ Method | Send No Mute Role
+
+    Tells a moderator that the server has no mute role yet.
+    """
+    async def send_no_mute_role(self, ctx):
+        embed = self.bot.embed_util.get_embed(
+            title = "No Mute Role",
+            desc = f"This server doesn't have a mute role yet, use `{self.bot.prefix}muterole @role` to set one."
+        )
+        await ctx.send(embed = embed)
 
     """ Method | Clear Mute Data
 
-    Clears the active mute timer for a given user.
+    Clears the active mute timer for a given member, in the member's guild.
     """
     def clear_mutes(self, user):
         # If the user had a mute timer that is being overridden by this, end it.
-        if user.id in [u['id'] for u in self.bot.data['mute']['mutes']]:
-            for i, u in enumerate(self.bot.data['mute']['mutes']):
-                if user.id == u['id']:
-                    break
-
-            del self.bot.data['mute']['mutes'][i]
-            self.bot.data_manager.save_data()
+        for i, u in enumerate(self.bot.data['mute']['mutes']):
+            if user.id == u['id'] and u.get('guild') == user.guild.id:
+                del self.bot.data['mute']['mutes'][i]
+                self.bot.data_manager.save_data()
+                break
 
 """ Function | Setup
 
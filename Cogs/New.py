@@ -10,10 +10,11 @@ when creating a new Cog file.
 class New(commands.Cog, name = "New"):
     def __init__(self, bot):
         self.bot = bot
-        print(f"{bot.OK} {bot.TIMELOG()} Loaded New Cog.")
+        self.log = bot.log_util.get_logger("New")
+        self.log.info("Loaded New Cog.")
 
     def cog_unload(self):
-        print(f"{self.bot.OK} {self.bot.TIMELOG()} Unloaded New Cog.")
+        self.log.info("Unloaded New Cog.")
 
     """ Command | Sample
 
@@ -20,12 +20,13 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
     """
     def __init__(self, bot):
         self.bot = bot
+        self.log = bot.log_util.get_logger("RoleReactions")
 
         if not 'role_reactions' in self.bot.data:
             self.bot.data['role_reactions'] = []
             self.bot.data_manager.save_data()
 
-        print(f"{bot.OK} {bot.TIMELOG()} Loaded Role Reaction Cog.")
+        self.log.info("Loaded Role Reaction Cog.")
 
 
     """ Method | On Cog Unload
@@ -33,7 +34,7 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
     This method is called when the Cog is unloaded.
     """
     def cog_unload(self):
-        print(f"{self.bot.OK} {self.bot.TIMELOG()} Unloaded Role Reaction Cog.")
+        self.log.info("Unloaded Role Reaction Cog.")
 
 
     """ Command | View Role Reactions
@@ -330,8 +331,7 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
             icon_url = ctx.author.avatar_url
         )
 
-        log = self.bot.get_channel(self.bot.data['logs']['role_reaction'])
-        await log.send(embed = embed)
+        await self.bot.send_log(ctx.guild, 'role_reaction', embed = embed)
 
 
     """ Command | Delete Role Reaction
@@ -379,8 +379,7 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
                 desc = f"`{payload.member}` removed a Role Reaction from the {rr_channel.mention} channel.",
                 ts = True
             )
-            log = self.bot.get_channel(self.bot.data['logs']['role_reaction'])
-            await log.send(embed = embed)
+            await self.bot.send_log(ctx.guild, 'role_reaction', embed = embed)
 
 
     """ Command | Edit Role Reaction
@@ -516,8 +515,7 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
 
         # Log the changes
         embed = self.bot.embed_util.update_embed(embed = embed, author = ctx.author)
-        log = self.bot.get_channel(self.bot.data['logs']['role_reaction'])
-        await log.send(embed = embed)
+        await self.bot.send_log(ctx.guild, 'role_reaction', embed = embed)
 
 
     """ Coroutine | Handle Editing Role Reaction Description
@@ -578,8 +576,7 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
 
         # Log the changes
         embed = self.bot.embed_util.update_embed(embed = embed, author = ctx.author)
-        log = self.bot.get_channel(self.bot.data['logs']['role_reaction'])
-        await log.send(embed = embed)
+        await self.bot.send_log(ctx.guild, 'role_reaction', embed = embed)
 
 
     """ Coroutine | Handle Removing Role Reactions
@@ -630,8 +627,7 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
             fields = fields
         )
 
-        log = self.bot.get_channel(self.bot.data['logs']['role_reaction'])
-        await log.send(embed = embed)
+        await self.bot.send_log(ctx.guild, 'role_reaction', embed = embed)
 
         if len(rr['roles']) > 1:
             await self.display_rr_remove_menu(ctx, rr)
@@ -714,8 +710,7 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
                         author = ctx.author,
                         footer = self.bot.footer
                     )
-                    log = self.bot.get_channel(self.bot.data['logs']['role_reaction'])
-                    await log.send(embed = embed)
+                    await self.bot.send_log(ctx.guild, 'role_reaction', embed = embed)
                 return
 
             # Redo the prompt if an improper message is passed.
@@ -730,7 +725,7 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
                 await prompt.edit(embed = embed)
 
                 # Log the changes
-                print(num)
+                self.log.debug(f"Role reaction now has {num} roles.")
 
                 if not num == len(rr['roles']):
                     possible = [rr for rr in self.bot.data['role_reactions'] if rr['id'] is not None]
@@ -744,8 +739,7 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
                         author = ctx.author,
                         footer = self.bot.footer
                     )
-                    log = self.bot.get_channel(self.bot.data['logs']['role_reaction'])
-                    await log.send(embed = embed)
+                    await self.bot.send_log(ctx.guild, 'role_reaction', embed = embed)
                 return
             if not len(msg.role_mentions) > 0:
                 embed.description = "Your response must __**mention a role**__. To get started, please __**mention a role that you want to be self-assignable**__:"
@@ -786,8 +780,7 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
                         author = ctx.author,
                         footer = self.bot.footer
                     )
-                    log = self.bot.get_channel(self.bot.data['logs']['role_reaction'])
-                    await log.send(embed = embed)
+                    await self.bot.send_log(ctx.guild, 'role_reaction', embed = embed)
                 return
 
             await prompt.remove_reaction(reaction.emoji, user)
@@ -892,8 +885,7 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
             embed = embed,
             author = ctx.author
         )
-        log = self.bot.get_channel(self.bot.data['logs']['role_reaction'])
-        await log.send(embed = embed)
+        await self.bot.send_log(ctx.guild, 'role_reaction', embed = embed)
 
 
     """ Command | Start Role Reaction
@@ -927,14 +919,15 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
                 self.bot.data_manager.save_data()
 
                 if payload:
-                    embed = self.bot.embed_util.get_embed(
-                        title = "Role Reaction Started",
-                        desc = f"`{ctx.author}` has started a role reaction in {channel.mention}.",
-                        author = ctx.author,
-                        ts = True
+                    embed = self.bot.embed_util.from_template(
+                        "role_reaction_log",
+                        action = "Started",
+                        verb = "started",
+                        user = ctx.author,
+                        channel = channel.mention,
+                        author = ctx.author
                     )
-                    log = self.bot.get_channel(self.bot.data['logs']['role_reaction'])
-                    await log.send(embed = embed)
+                    await self.bot.send_log(ctx.guild, 'role_reaction', embed = embed)
                 return
 
         embed = self.bot.embed_util.get_embed(
@@ -965,15 +958,16 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
         self.bot.data_manager.save_data()
 
         if payload:
-            embed = self.bot.embed_util.get_embed(
-                title = "Role Reaction Stopped",
-                desc = f"`{ctx.author}` has stopped a role reaction in {channel.mention}.",
-                author = ctx.author,
-                ts = True
+            embed = self.bot.embed_util.from_template(
+                "role_reaction_log",
+                action = "Stopped",
+                verb = "stopped",
+                user = ctx.author,
+                channel = channel.mention,
+                author = ctx.author
             )
 
-            log = self.bot.get_channel(self.bot.data['logs']['role_reaction'])
-            await log.send(embed = embed)
+            await self.bot.send_log(ctx.guild, 'role_reaction', embed = embed)
 
 
     """ Event Listener | On Reaction Add
@@ -994,7 +988,7 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
                 guild = self.bot.get_guild(payload.guild_id)
                 role = guild.get_role(rr['roles'][i]['role'])
                 if not role in payload.member.roles:
-                    await payload.member.add_roles(role)
+                    await self.change_role(payload.member.add_roles, "add", role)
             except ValueError:
                 pass
 
@@ -1016,13 +1010,26 @@ class RoleReaction(commands.Cog, name = "Role Reaction"):
 
                 guild = self.bot.get_guild(payload.guild_id)
                 role = guild.get_role(rr['roles'][i]['role'])
-                member = guild.get_member(payload.user_id)
-                if role in member.roles:
-                    await member.remove_roles(role)
+                member = await self.bot.get_or_fetch_member(guild, payload.user_id)
+                if member and role in member.roles:
+                    await self.change_role(member.remove_roles, "remove", role)
             except ValueError:
                 pass
 
 
+    """ Coroutine | Change Role
+
+    Adds or removes a role with the given member method, counting the outcome in the bot's metrics.
+    """
+    async def change_role(self, method, operation, role):
+        try:
+            await method(role)
+        except discord.HTTPException:
+            self.bot.metrics.role_reactions.inc(operation, "failed")
+            raise
+        self.bot.metrics.role_reactions.inc(operation, "ok")
+
+
     """ Coroutine | Display Role Reaction Menu
 
     This coroutine displays the menu of all registered role reactions in one of two ways:
@@ -20,14 +20,9 @@ class SchoolRoles(commands.Cog, name = "School Roles"):
     """
     def __init__(self, bot):
         self.bot = bot
+        self.log = bot.log_util.get_logger("SchoolRoles")
 
-        if not 'school_roles' in self.bot.data:
-            self.bot.data['school_roles'] = {}
-            for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
-                self.bot.data['school_roles'][letter] = []
-            self.bot.data_manager.save_data()
-
-        print(f"{bot.OK} {bot.TIMELOG()} Loaded School Roles Cog.")
+        self.log.info("Loaded School Roles Cog.")
 
 
     """ Method | On Cog Unload
@@ -35,7 +30,7 @@ class SchoolRoles(commands.Cog, name = "School Roles"):
     Ths method is called when the Cog is unloaded from the system.
     """
     def cog_unload(self):
-        print(f"{self.bot.OK} {self.bot.TIMELOG()} Unloaded School Roles Cog.")
+        self.log.info("Unloaded School Roles Cog.")
 
 
     """ Command | Sample
@@ -46,7 +41,7 @@ class SchoolRoles(commands.Cog, name = "School Roles"):
     @commands.group(name = "school", aliases = ['schools'], help = "Show a menu for selecting a school roles to assign to yourself.", brief = "", invoke_without_command = True)
     async def schools(self, ctx):
         entries = []
-        for mapping in [self.get_school_mapping(ctx.guild, l) for l in self.bot.data['school_roles']]:
+        for mapping in [self.get_school_mapping(ctx.guild, l) for l in self.get_school_roles(ctx.guild)]:
             if mapping['roles']:
                 entries.append(mapping)
 
@@ -67,7 +62,7 @@ class SchoolRoles(commands.Cog, name = "School Roles"):
     """
     async def handle_school_letter_select(self, ctx, letter):
         entries = []
-        for r in self.bot.data['school_roles'][letter]:
+        for r in self.get_school_roles(ctx.guild)[letter]:
             r = ctx.guild.get_role(r)
             if r:
                 entries.append(r)
@@ -116,7 +111,7 @@ class SchoolRoles(commands.Cog, name = "School Roles"):
             return await ctx.send(embed = embed)
 
         if role.lower().strip() in [r.name.lower() for r in ctx.guild.roles]:
-            print("Role Already Exists")
+            self.log.debug(f"Role `{role}` already exists, using it.")
             role = ctx.guild.roles[[r.name.lower() for r in ctx.guild.roles].index(role.lower().strip())]
         else:
             role = await ctx.guild.create_role(
@@ -125,8 +120,8 @@ class SchoolRoles(commands.Cog, name = "School Roles"):
                 reason = f"{ctx.author} is adding a new school role to the system."
             )
 
-        for l in self.bot.data['school_roles']:
-            for r in self.bot.data['school_roles'][l]:
+        for l, schools in self.get_school_roles(ctx.guild).items():
+            for r in schools:
                 if role.id == r:
                     embed = self.bot.embed_util.get_embed(
                         title = "Role Already Registered",
@@ -134,7 +129,7 @@ class SchoolRoles(commands.Cog, name = "School Roles"):
                     )
                     return await ctx.send(embed = embed)
 
-        self.bot.data['school_roles'][letter].append(role.id)
+        self.get_school_roles(ctx.guild)[letter].append(role.id)
         self.bot.data_manager.save_data()
 
         embed = self.bot.embed_util.get_embed(
@@ -149,8 +144,7 @@ class SchoolRoles(commands.Cog, name = "School Roles"):
             author = ctx.author,
             ts = True
         )
-        log = self.bot.get_channel(self.bot.data['logs']['school_roles'])
-        await log.send(embed = embed)
+        await self.bot.send_log(ctx.guild, 'school_roles', embed = embed)
 
 
     """ Command | Remove School Role
@@ -161,7 +155,7 @@ class SchoolRoles(commands.Cog, name = "School Roles"):
     @schools.command(name = "remove", aliases = ['rem', 'del', 'delete'], help = "Remove a school role from the self-assignable system.", brief = "")
     async def rem_school(self, ctx):
         entries = []
-        for mapping in [self.get_school_mapping(ctx.guild, l) for l in self.bot.data['school_roles']]:
+        for mapping in [self.get_school_mapping(ctx.guild, l) for l in self.get_school_roles(ctx.guild)]:
             if mapping['roles']:
                 entries.append(mapping)
 
@@ -182,7 +176,7 @@ class SchoolRoles(commands.Cog, name = "School Roles"):
     """
     async def school_letter_remove_select(self, ctx, letter):
         entries = []
-        for r in self.bot.data['school_roles'][letter]:
+        for r in self.get_school_roles(ctx.guild)[letter]:
             r = ctx.guild.get_role(r)
             if r:
                 entries.append(r)
@@ -217,8 +211,25 @@ class SchoolRoles(commands.Cog, name = "School Roles"):
             desc = f"`{ctx.author}` has deleted the `{role.name}` role from the school system",
             ts = True
         )
-        log = self.bot.get_channel(self.bot.data['logs']['school_roles'])
-        await log.send(embed = embed)
+        await self.bot.send_log(ctx.guild, 'school_roles', embed = embed)
+
+
+    """ Method | Get School Roles
+
+    The registered school role IDs for a guild, by letter, kept in the guild's own data.
+
+    The first time a guild is seen, it takes over the roles it owns from the original, bot wide
+    `data['school_roles']`, which is left as is for the other guilds.
+    """
+    def get_school_roles(self, guild):
+        guild_data = self.bot.data_manager.get_guild_data(guild.id, create = True)
+        if not 'school_roles' in guild_data:
+            old = self.bot.data.get('school_roles', {})
+            guild_data['school_roles'] = {
+                letter: [r for r in old.get(letter, []) if guild.get_role(r)] for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+            }
+            self.bot.data_manager.save_data()
+        return guild_data['school_roles']
 
 
     """ Method | Get School Mapping
@@ -248,12 +259,13 @@ class SchoolRoles(commands.Cog, name = "School Roles"):
             "roles": []
         }
 
-        for school in self.bot.data['school_roles'][letter]:
+        schools = self.get_school_roles(guild)[letter]
+        for school in list(schools):
             role = guild.get_role(school)
             if role:
                 res['roles'].append(role)
             else:
-                del self.bot.data['school_roles'][letter][self.bot.data['school_roles'][letter].index(school)]
+                schools.remove(school)
                 self.bot.data_manager.save_data()
 
         res['roles'] = sorted(res['roles'], key = lambda x: x.name)
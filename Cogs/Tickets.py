@@ -21,19 +21,12 @@ class Tickets(commands.Cog, name = "Support Tickets"):
     """
     def __init__(self, bot):
         self.bot = bot
+        self.log = bot.log_util.get_logger("Tickets")
 
-        if not 'ticket_backend' in self.bot.data:
-            bot.data['ticket_backend'] = {
-                "CH_ID": 0,
-                "M_ID": 0
-            }
-
-        self.bot.data_manager.save_data()
-
-        print(f"{bot.OK} {bot.TIMELOG()} Loaded Ticket Cog.")
+        self.log.info("Loaded Ticket Cog.")
 
     def on_cog_unload(self):
-        print(f"{bot.OK} {bot.TIMELOG()} Unloaded Ticket Cog.")
+        self.log.info("Unloaded Ticket Cog.")
 
     @commands.guild_only()
     @commands.command(name = "openticket", help = "Create a new support ticket.", brief = "")
@@ -146,13 +139,13 @@ class Tickets(commands.Cog, name = "Support Tickets"):
 
         closed_ticket_category = self.bot.get_channel(self.bot.closed_ticket_category_id)
         async with ctx.channel.typing():
-            print(f"{self.bot.OK} {self.bot.TIMELOG()} Starting closed ticket archive process:")
+            self.log.info("Starting closed ticket archive process.")
             files_saved = []
             skip_delete = []
             old_skip = []
             for channel in closed_ticket_category.channels:
                 if type(channel) == discord.TextChannel:
-                    print(f"{self.bot.OK} {self.bot.TIMELOG()} Saving #{channel} to ./Archive/{channel}.txt.")
+                    self.log.info(f"Saving #{channel} to ./Archive/{channel}.txt.")
                     doc = []
                     doc.append('|'.join(channel.topic.split('|')[3:]))
 
@@ -169,7 +162,7 @@ class Tickets(commands.Cog, name = "Support Tickets"):
                         with open(f"./Archive/{channel}.txt", 'w+', encoding = "utf-8") as file:
                             file.write('\n'.join(doc))
                         files_saved.append(f"./Archive/{channel}.txt")
-            print(f"{self.bot.OK} {self.bot.TIMELOG()} Collapsing to Zip file.")
+            self.log.info("Collapsing to Zip file.")
             zip_name = f"./Archive/ticket-archive-{datetime.datetime.now().strftime('%m-%d-%Y_%I-%M-%S-%p')}-{ctx.guild.id}.zip"
             with ZipFile(zip_name, 'w') as zip_file:
                 for file in files_saved:
@@ -212,7 +205,22 @@ class Tickets(commands.Cog, name = "Support Tickets"):
                             )
                             await channel.send(content = "Deletion Skipped", embed = embed)
 
-        print(f"{self.bot.OK} {self.bot.TIMELOG()} Finished archiving closed tickets.")
+        self.log.info("Finished archiving closed tickets.")
+
+    def get_backend(self, guild):
+        """Method | Get Backend
+
+        The ticket backend data for a guild, kept in the guild's own data and
+        started from the original, bot wide `data['ticket_backend']` if there is one.
+        """
+        guild_data = self.bot.data_manager.get_guild_data(guild.id, create = True)
+        if not 'ticket_backend' in guild_data:
+            guild_data['ticket_backend'] = dict(self.bot.data.get('ticket_backend', {
+                "CH_ID": 0,
+                "M_ID": 0
+            }))
+            self.bot.data_manager.save_data()
+        return guild_data['ticket_backend']
 
     def get_alpha(self, name):
         """Function
@@ -19,6 +19,7 @@ class TwitterListener(tweepy.AsyncStream):
     def __init__(self, bot, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.bot = bot
+        self.log = bot.log_util.get_logger("Twitter")
 
 
     """ Method | On Connect
@@ -26,7 +27,7 @@ class TwitterListener(tweepy.AsyncStream):
     This method is called once a successfull response is received from the Twitter server.
     """
     async def on_connect(self):
-        print(f"{self.bot.OK} {self.bot.TIMELOG()} Twitter Listener Connected")
+        self.log.info("Twitter Listener Connected")
 
 
     """ Method | On Disconnect
@@ -34,7 +35,7 @@ class TwitterListener(tweepy.AsyncStream):
     This method id called when the Stream is disconnected.
     """
     async def on_disconnect(self):
-        print(f"{self.bot.WARN} {self.bot.TIMELOG()} Twitter Listener Disconnected")
+        self.log.warning("Twitter Listener Disconnected")
 
 
     """ Method | On New Tweet
@@ -48,8 +49,8 @@ class TwitterListener(tweepy.AsyncStream):
         msg = status._json
 
         # Send the tweet to the registered twitter channel.
-        channel = self.bot.get_channel(self.bot.data['logs']['twitter'])
-        if msg['user']['id'] == 24967749:
+        channel = self.bot.data_manager.get_log_channel(None, 'twitter')
+        if channel and msg['user']['id'] == 24967749:
             await channel.send(f"New Tweet from {msg['user']['name']}!\nhttps://twitter.com/{msg['user']['screen_name']}/status/{msg['id_str']}")
 
 
@@ -58,8 +59,7 @@ class TwitterListener(tweepy.AsyncStream):
     This method is called whenever an unhandled exception occurs.
     """
     async def on_exception(self, exception):
-        print(f"{self.bot.ERR} {self.bot.TIMELOG()} Twitter Streaming Error:")
-        print(f"{' '*35} {exception}")
+        self.log.error("Twitter Streaming Error", extra = {"fields": {"Error": exception}})
 
 
     """ Method | On Error
@@ -68,14 +68,10 @@ class TwitterListener(tweepy.AsyncStream):
     """
     async def on_http_error(self, status_code):
         if status_code == 420:
-            print(f"{self.bot.ERR} {self.bot.TIMELOG()} Twitter Error Code Received:")
-            print(f"{' '*35} Code: {status_code}")
-            print(f"{' '*35} Handle: Stop Listener")
+            self.log.error("Twitter Error Code Received", extra = {"fields": {"Code": status_code, "Handle": "Stop Listener"}})
             return False
         else:
-            print(f"{self.bot.WARN} {self.bot.TIMELOG()} Twitter Error Code Received:")
-            print(f"{' '*35} Code: {status_code}")
-            print(f"{' '*35} Handle: Ignore Status")
+            self.log.warning("Twitter Error Code Received", extra = {"fields": {"Code": status_code, "Handle": "Ignore Status"}})
             return True
 
 """ Class | Twitter
@@ -89,6 +85,7 @@ class Twitter(commands.Cog, name = "Twitter"):
     """
     def __init__(self, bot):
         self.bot = bot
+        self.log = bot.log_util.get_logger("Twitter")
 
         # Using the registered API key to connect to Twitter.
         self.twitter_consumer_key = os.getenv("MSI_TWIT_CUST_KEY")
@@ -107,7 +104,7 @@ class Twitter(commands.Cog, name = "Twitter"):
 
         self.bot.loop.create_task(self.listener.filter(follow=['24967749']))
 
-        print(f"{bot.OK} {bot.TIMELOG()} Loaded Twitter Cog.")
+        self.log.info("Loaded Twitter Cog.")
 
 
     """ Method | Cog Unload
@@ -116,7 +113,7 @@ class Twitter(commands.Cog, name = "Twitter"):
     """
     def cog_unload(self):
         self.listener.disconnect()
-        print(f"{self.bot.OK} {self.bot.TIMELOG()} Unloaded Twitter Cog.")
+        self.log.info("Unloaded Twitter Cog.")
 
 
 """ Function | Setup
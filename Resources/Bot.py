@@ -0,0 +1,129 @@
+"""Resource | Bot
+
+This file hosts the bot class itself, which adds a few
+things on top of the discord.py bot. More details provided for each.
+"""
+import logging
+import time
+
+import discord
+from discord.ext import commands
+
+""" Class | Bot
+
+The discord.py bot, extended to keep track of which command names exist.
+
+It is an `AutoShardedBot`, which runs every shard in this process over one event loop.
+With no shard count configured Discord decides how many shards to use, which is one until
+the bot is in enough guilds to need more.
+
+Every time a command is added or removed (which is what loading and unloading a cog does) the
+`commands_version` counter goes up and the set of command names is thrown away, to be rebuilt
+the next time it is needed. This lets messages be checked against the known commands before
+any of the command machinery runs, and gives caches built from the commands a way to know when they are stale.
+"""
+class Bot(commands.AutoShardedBot):
+    def __init__(self, *args, **kwargs):
+        # Set before the parent init, as it registers the default help command.
+        self.commands_version = 0
+        self.command_names = None
+        self.unknown_commands = {}
+        self.shard_metrics = None
+        # Set when running as one of several processes started by `cluster.py`.
+        self.cluster = None
+        self.metrics = None
+        super().__init__(*args, **kwargs)
+
+    """ Method | Dispatch
+
+    Dispatches an event, counting it (and gateway payloads against their shard) first.
+    """
+    def dispatch(self, event_name, *args, **kwargs):
+        if self.metrics is not None:
+            self.metrics.events.inc(event_name)
+        if event_name == 'socket_response' and self.shard_metrics is not None:
+            self.shard_metrics.record(args[0])
+        super().dispatch(event_name, *args, **kwargs)
+
+    """ Method | Add Cog
+
+    Adds a cog, warning if it needs data the cache profile doesn't provide.
+    """
+    def add_cog(self, cog):
+        super().add_cog(cog)
+        profile = getattr(self, 'cache_profile', None)
+        missing = profile.missing(cog) if profile else None
+        if missing:
+            logging.getLogger("bot.Cache").warning(
+                f"{cog.qualified_name} works best with {', '.join(sorted(missing))} cached, which the {profile.name} cache profile doesn't provide. "
+                f"Without it, {cog.qualified_name} misses: {'; '.join(profile.effects[need] for need in sorted(missing))}."
+            )
+
+    """ Coroutine | Get Or Fetch Member
+
+    Gets a member from the cache, or from Discord if it isn't cached (e.g. with the lean cache profile).
+    Returns None if the user isn't in the guild.
+    """
+    async def get_or_fetch_member(self, guild, user_id):
+        member = guild.get_member(user_id)
+        if member is None:
+            try:
+                member = await guild.fetch_member(user_id)
+            except discord.NotFound:
+                return None
+        return member
+
+    """ Coroutine | Send Log
+
+    Sends to a guild's channel for a type of log (see `DataManager.get_log_channel`).
+    Returns the message, or None if the guild has no channel for that log type.
+    """
+    async def send_log(self, guild, log_type, **kwargs):
+        channel = self.data_manager.get_log_channel(guild, log_type)
+        if channel is None:
+            return None
+        return await channel.send(**kwargs)
+
+    def add_command(self, command):
+        super().add_command(command)
+        self.commands_changed()
+
+    def remove_command(self, name):
+        command = super().remove_command(name)
+        self.commands_changed()
+        return command
+
+    def commands_changed(self):
+        self.commands_version += 1
+        self.command_names = None
+
+    """ Method | Is Command
+
+    Checks whether a name is a top level command or alias, ignoring case.
+    """
+    def is_command(self, name):
+        if self.command_names is None:
+            self.command_names = frozenset(name.lower() for name in self.all_commands)
+        return name.lower() in self.command_names
+
+    """ Method | Allow Unknown Command
+
+    Counts an unknown command used by a user, returning whether it should still be handled
+    (and so get an error response) or be dropped because the user has used too many recently.
+
+    Each user can get `unknown_limit` responses per `unknown_window` seconds.
+    """
+    def allow_unknown_command(self, user_id):
+        now = time.monotonic()
+        start, count = self.unknown_commands.get(user_id, (now, 0))
+        if now - start > self.settings.unknown_window:
+            start, count = now, 0
+        self.unknown_commands[user_id] = (start, count + 1)
+
+        # Forget users whose window has ended, so the dict can not grow forever.
+        if len(self.unknown_commands) > 1000:
+            self.unknown_commands = {
+                u: entry for u, entry in self.unknown_commands.items() if now - entry[0] <= self.settings.unknown_window
+            }
+
+        return count < self.settings.unknown_limit
@@ -0,0 +1,98 @@
+"""Resource | Cache
+
+This file hosts the settings deciding how much of Discord the bot keeps
+in memory. More details provided for each.
+"""
+import discord
+
+""" Class | Cache Profile
+
+Picks the gateway intents, member cache and chunking to use, from one of three profiles:
+    - full: Every member is cached along with their status and activities, and presence updates are received.
+    - members: Every member is cached, but without presences (no online counts).
+    - lean: Only members seen through events (joining, or being updated) since the bot started are cached,
+      guilds are not chunked and there are no presences.
+
+Member events are received in every profile, but discord.py only dispatches leaves (`on_member_remove`)
+and updates (`on_member_update`) for cached members. With the lean profile, the first update of a member
+only caches them, and members that aren't cached leave without an event. Joins and bans always arrive.
+
+Cogs can declare what they need with a `cache_needs` class attribute, a set of
+`presences` and/or `members`. Loading a cog that needs something the profile doesn't
+provide logs a warning naming what won't work, and the cog is expected to work without it (see `count_online`).
+"""
+class CacheProfile:
+    profiles = {
+        "full": {"presences", "members"},
+        "members": {"members"},
+        "lean": set()
+    }
+
+    # What a cog loses when a profile doesn't provide something it needs, for the warning given by `Bot.add_cog`.
+    effects = {
+        "presences": "online member counts",
+        "members": "leave and member update events for members not seen since the bot started"
+    }
+
+    def __init__(self, name):
+        if name not in self.profiles:
+            raise ValueError(f"Unknown cache profile `{name}`, use one of: {', '.join(self.profiles)}.")
+        self.name = name
+        self.provides = self.profiles[name]
+
+    """ Method | Get Intents
+
+    The intents to connect with. The members intent is always on, for the member events.
+    """
+    def get_intents(self):
+        intents = discord.Intents.default()
+        intents.members = True
+        intents.presences = "presences" in self.provides
+        return intents
+
+    """ Method | Get Member Cache Flags
+
+    Which members to keep in the cache. The lean profile only keeps members it sees join or
+    get updated (and the bot itself), the others keep every member the intents allow.
+    """
+    def get_member_cache_flags(self, intents):
+        if "members" in self.provides:
+            return discord.MemberCacheFlags.from_intents(intents)
+        flags = discord.MemberCacheFlags.none()
+        flags.joined = True
+        return flags
+
+    """ Property | Chunk Guilds
+
+    Whether to request every member of each guild when connecting.
+    """
+    @property
+    def chunk_guilds(self):
+        return "members" in self.provides
+
+    """ Method | Missing
+
+    Returns what a cog needs that this profile doesn't provide.
+    """
+    def missing(self, cog):
+        return set(getattr(cog, 'cache_needs', set())) - self.provides
+
+    """ Method | Count Online
+
+    The number of online members in a guild, or None if presences are not being cached.
+    """
+    def count_online(self, guild):
+        if "presences" not in self.provides:
+            return None
+        online = (discord.Status.online, discord.Status.idle, discord.Status.dnd)
+        return sum(1 for member in guild.members if member.status in online)
+
+    """ Method | Get Member Counts
+
+    A short description of a guild's member counts, only including the online count if it is known.
+    """
+    def get_member_counts(self, guild):
+        online = self.count_online(guild)
+        if online is None:
+            return f"Total: {guild.member_count}"
+        return f"Online: {online} | Total: {guild.member_count}"
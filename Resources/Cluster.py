@@ -0,0 +1,165 @@
+"""Resource | Cluster
+
+This file hosts the tools used to run the bot's shards across several processes,
+started by `cluster.py`. More details provided for each.
+
+The launcher and the workers talk over a unix socket, one JSON object per line. Every message
+has an `op` naming what it is, and the launcher passes each message from a worker on to every
+other worker, so sending a message from a worker broadcasts it to the whole cluster.
+"""
+import asyncio
+import json
+import logging
+import os
+
+""" Function | Split Shards
+
+Splits the shard IDs into one run of consecutive IDs per worker, as evenly as possible.
+"""
+def split_shards(shard_count, workers):
+    size, extra = divmod(shard_count, workers)
+    ranges = []
+    start = 0
+    for i in range(workers):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+def encode(op, **data):
+    return (json.dumps(dict(data, op = op)) + "\n").encode()
+
+""" Class | Cluster Hub
+
+The launcher's end of the socket, which workers connect to.
+
+Workers say which cluster ID they are with a `hello` message, and that they are connected
+to Discord with a `ready` message. Everything else is relayed to the other workers.
+"""
+class ClusterHub:
+    def __init__(self, path):
+        self.path = path
+        self.log = logging.getLogger("cluster")
+        self.server = None
+        self.workers = {}
+        self.ready = {}
+
+    async def start(self):
+        # A socket file left behind by a launcher that didn't shut down cleanly would block the new one.
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok = True)
+        self.server = await asyncio.start_unix_server(self.handle, path = self.path)
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        for writer in self.workers.values():
+            writer.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    """ Coroutine | Wait Ready
+
+    Waits for a worker to say it is ready, giving up after `timeout` seconds.
+    """
+    async def wait_ready(self, cluster_id, timeout):
+        event = self.ready.setdefault(cluster_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            self.log.warning(f"Worker {cluster_id} wasn't ready after {timeout}s, starting the next one anyway.")
+
+    def reset(self, cluster_id):
+        self.ready[cluster_id] = asyncio.Event()
+
+    async def handle(self, reader, writer):
+        cluster_id = None
+        try:
+            async for line in reader:
+                message = json.loads(line)
+                op = message['op']
+                if op == "hello":
+                    cluster_id = message['cluster']
+                    self.workers[cluster_id] = writer
+                elif op == "ready":
+                    self.ready.setdefault(cluster_id, asyncio.Event()).set()
+                else:
+                    self.log.info(f"Worker {cluster_id} sent `{op}`.")
+                    for other, other_writer in self.workers.items():
+                        if other != cluster_id:
+                            other_writer.write(line)
+        except (ConnectionError, ValueError, KeyError) as e:
+            self.log.warning(f"Dropped worker {cluster_id}: {e}")
+        finally:
+            if self.workers.get(cluster_id) is writer:
+                del self.workers[cluster_id]
+            writer.close()
+
+""" Class | Cluster Client
+
+A worker's end of the socket.
+
+Handlers for each op are added with `on`, and are called with the message's data. Messages
+are sent with `broadcast`, which never waits, so it can be used from anywhere (e.g. saving data).
+If the launcher can't be reached, messages are dropped and the client keeps trying to reconnect.
+"""
+class ClusterClient:
+    def __init__(self, bot, path, cluster_id, shard_ids):
+        self.bot = bot
+        self.path = path
+        self.id = cluster_id
+        self.shard_ids = shard_ids
+        self.log = bot.log_util.get_logger("Cluster")
+        self.handlers = {}
+        self.writer = None
+        self.task = None
+
+    """ Property | Is Primary
+
+    Whether this is the first worker, which runs the background jobs that only one worker should.
+    """
+    @property
+    def is_primary(self):
+        return self.id == 0
+
+    def on(self, op, handler):
+        self.handlers[op] = handler
+
+    def start(self):
+        self.task = self.bot.loop.create_task(self.run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+        if self.writer:
+            self.writer.close()
+
+    def broadcast(self, op, **data):
+        if self.writer is None or self.writer.is_closing():
+            self.log.warning(f"Not connected to the launcher, `{op}` was not sent to the other workers.")
+            return
+        self.writer.write(encode(op, **data))
+
+    async def run(self):
+        while True:
+            try:
+                reader, self.writer = await asyncio.open_unix_connection(self.path)
+                self.writer.write(encode("hello", cluster = self.id))
+                if self.bot.is_ready():
+                    self.writer.write(encode("ready"))
+                self.log.info(f"Connected to the launcher as worker {self.id} (shards {self.shard_ids[0]}-{self.shard_ids[-1]}).")
+
+                async for line in reader:
+                    message = json.loads(line)
+                    handler = self.handlers.get(message.pop('op'))
+                    if handler:
+                        try:
+                            await handler(**message)
+                        except Exception:
+                            self.log.exception("A cluster message handler failed.")
+            except (OSError, ValueError) as e:
+                self.log.warning(f"Lost the connection to the launcher: {e}")
+            self.writer = None
+            await asyncio.sleep(5)
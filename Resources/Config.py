@@ -0,0 +1,237 @@
+"""Resource | Config
+
+This file hosts the typed version of the bot's config. More details provided for each.
+"""
+import dataclasses
+import os
+import typing
+
+from Resources.Logger import LogUtil
+
+""" Class | Bot Config
+
+Every setting from `Config.yml`, with its type, compiled from the raw YAML.
+
+Only plain data is kept here (e.g. the embed color as RGB values, and the name of the token's
+environment variable rather than the token), so a compiled config can be cached to a file.
+`DataManager.apply_config` builds the rest (colors, the token, etc.) when putting it onto the bot,
+as `bot.settings` (and, for the settings older than this class, as the individual `bot.*` attributes of the same names).
+
+See 'Config.yml' for specifics on each setting.
+"""
+@dataclasses.dataclass(frozen = True)
+class BotConfig:
+    # Main Settings
+    token_env_var: str
+    DEBUG: bool
+    prefix: str
+    online_message: str
+    restarting_message: str
+    data_file: str
+    show_game_status: bool
+    game_to_show: str
+    log_channel_id: int
+    lazy_cogs: bool
+    cache_profile_name: str
+    shard_count: typing.Optional[int]
+    data_store: str
+    store_file: str
+
+    # Cluster
+    cluster_workers: int
+    cluster_socket: str
+
+    # Embed Options
+    embed_rgb: typing.Tuple[int, int, int]
+    footer: str
+    footer_image: str
+    delete_commands: bool
+    show_command_author: bool
+
+    # Message Sending
+    send_concurrency: int
+    send_retries: int
+    send_backoff: float
+    max_catch_up: int
+
+    # Error Reporting
+    error_window: float
+    error_samples: int
+
+    # File Watching
+    watch_files: bool
+    watch_interval: float
+
+    # Loop Watchdog
+    watchdog_active: bool
+    watchdog_threshold: float
+    watchdog_history: int
+
+    # Memory Tracker
+    memory_active: bool
+    memory_frames: int
+    memory_interval: float
+    memory_file: str
+    memory_top: int
+
+    # Metrics
+    metrics_active: bool
+    metrics_host: str
+    metrics_port: int
+
+    # Startup Profiler
+    profile_startup: bool
+    profiler_file: str
+
+    # Sampling Profiler
+    sampling_interval: float
+    sampling_max_time: float
+
+    # Unknown Commands
+    unknown_silent: bool
+    unknown_limit: int
+    unknown_window: float
+
+    # Log Output
+    log_level: str
+    log_file: str
+    log_max_bytes: int
+    log_backup_count: int
+    log_cog_levels: dict
+
+    """ Method | From Dict
+
+    Compiles the raw YAML config, raising a `KeyError` for missing options or a `ValueError` for invalid ones.
+    """
+    @classmethod
+    def from_dict(cls, config):
+        color = config['Embed Settings']['Color']
+        settings = cls(
+            token_env_var =       config['Token Env Var'],
+            DEBUG =               config['DEBUG'],
+            prefix =              config['Prefix'],
+            online_message =      config['Online Message'],
+            restarting_message =  config['Restarting Message'],
+            data_file =           os.path.abspath(config['Data File']),
+            show_game_status =    config['Game Status']['Active'],
+            game_to_show =        config['Game Status']['Game'],
+            log_channel_id =      config['Log Channel'],
+            lazy_cogs =           config['Lazy Cogs'],
+            cache_profile_name =  config['Cache Profile'],
+            shard_count =         config['Sharding']['Shard Count'],
+            data_store =          config['Data Store'],
+            store_file =          os.path.abspath(config['Store File']),
+
+            cluster_workers =     config['Cluster']['Workers'],
+            cluster_socket =      os.path.abspath(config['Cluster']['Socket']),
+
+            embed_rgb =           (color['r'], color['g'], color['b']),
+            footer =              config['Embed Settings']['Footer']['Text'],
+            footer_image =        config['Embed Settings']['Footer']['Icon URL'],
+            delete_commands =     config['Embed Settings']['Delete Commands'],
+            show_command_author = config['Embed Settings']['Show Author'],
+
+            send_concurrency =    config['Message Settings']['Max Concurrent Sends'],
+            send_retries =        config['Message Settings']['Send Retries'],
+            send_backoff =        config['Message Settings']['Retry Backoff'],
+            max_catch_up =        config['Message Settings']['Max Catch Up Runs'],
+
+            error_window =        config['Error Reporting']['Window'],
+            error_samples =       config['Error Reporting']['Samples'],
+
+            watch_files =         config['File Watching']['Active'],
+            watch_interval =      config['File Watching']['Poll Interval'],
+
+            watchdog_active =     config['Loop Watchdog']['Active'],
+            watchdog_threshold =  config['Loop Watchdog']['Threshold'],
+            watchdog_history =    config['Loop Watchdog']['History'],
+
+            memory_active =       config['Memory Tracker']['Active'],
+            memory_frames =       config['Memory Tracker']['Frames'],
+            memory_interval =     config['Memory Tracker']['Interval'],
+            memory_file =         os.path.abspath(config['Memory Tracker']['File']),
+            memory_top =          config['Memory Tracker']['Top'],
+
+            metrics_active =      config['Metrics']['Active'],
+            metrics_host =        config['Metrics']['Host'],
+            metrics_port =        config['Metrics']['Port'],
+
+            profile_startup =     config['Startup Profiler']['Active'],
+            profiler_file =       os.path.abspath(config['Startup Profiler']['File']),
+
+            sampling_interval =   config['Sampling Profiler']['Interval'],
+            sampling_max_time =   config['Sampling Profiler']['Max Duration'],
+
+            unknown_silent =      config['Unknown Commands']['Silent'],
+            unknown_limit =       config['Unknown Commands']['Limit'],
+            unknown_window =      config['Unknown Commands']['Window'],
+
+            log_level =           config['Logging']['Level'],
+            log_file =            os.path.abspath(config['Logging']['File']),
+            log_max_bytes =       config['Logging']['Max Bytes'],
+            log_backup_count =    config['Logging']['Backup Count'],
+            log_cog_levels =      config['Logging']['Cog Levels'] or {}
+        )
+        settings.validate()
+        return settings
+
+    """ Method | From Cache
+
+    Rebuilds a compiled config saved with `to_cache`.
+    """
+    @classmethod
+    def from_cache(cls, data):
+        data = dict(data, embed_rgb = tuple(data['embed_rgb']))
+        return cls(**data)
+
+    def to_cache(self):
+        return dataclasses.asdict(self)
+
+    """ Method | Validate
+
+    Checks every setting has the right type, along with a few checks for mistakes that
+    would otherwise only show up later, while the bot is running.
+    """
+    def validate(self):
+        hints = typing.get_type_hints(type(self))
+        for field in dataclasses.fields(self):
+            value = getattr(self, field.name)
+            hint = hints[field.name]
+            if typing.get_origin(hint) is typing.Union:
+                # Optional settings can also be left empty.
+                if value is None:
+                    continue
+                hint = typing.get_args(hint)[0]
+            expected = typing.get_origin(hint) or hint
+            # Whole numbers are fine where decimals are expected, but True/False are not numbers here.
+            allowed = (int, float) if expected is float else expected
+            if not isinstance(value, allowed) or (isinstance(value, bool) and expected is not bool):
+                raise ValueError(f"`{field.name}` should be {expected.__name__}, not `{value!r}`.")
+
+        if not self.prefix:
+            raise ValueError("The prefix must be some text.")
+        if not all(isinstance(c, int) and 0 <= c <= 255 for c in self.embed_rgb):
+            raise ValueError("The embed color values must be whole numbers between 0 and 255.")
+        for level in [self.log_level, *self.log_cog_levels.values()]:
+            if str(level).upper() not in LogUtil.levels:
+                raise ValueError(f"Unknown log level `{level}`, use one of: {', '.join(LogUtil.levels)}.")
+        if self.cache_profile_name not in ("full", "members", "lean"):
+            raise ValueError("The cache profile must be one of: full, members, lean.")
+        if self.shard_count is not None and self.shard_count < 1:
+            raise ValueError("The shard count must be at least 1, or empty to let Discord decide.")
+        if self.data_store not in ("json", "sqlite"):
+            raise ValueError("The data store must be one of: json, sqlite.")
+        if self.cluster_workers < 1:
+            raise ValueError("There must be at least 1 cluster worker.")
+        if self.cluster_workers > 1 and self.data_store != "sqlite":
+            raise ValueError("Running more than one cluster worker needs the sqlite data store.")
+        if self.shard_count is not None and self.shard_count < self.cluster_workers:
+            raise ValueError("Each cluster worker needs at least one shard.")
+        if self.watchdog_threshold <= 0 or self.watchdog_history < 1:
+            raise ValueError("The loop watchdog's threshold must be above 0, and it must keep at least 1 block.")
+        if self.memory_frames < 1 or self.memory_interval <= 0 or self.memory_top < 1:
+            raise ValueError("The memory tracker needs at least 1 frame, an interval above 0, and to log at least 1 line.")
+        if self.sampling_interval <= 0 or self.sampling_max_time <= 0:
+            raise ValueError("The sampling profiler's interval and max duration must be above 0.")
+        if self.send_concurrency < 1:
+            raise ValueError("Max Concurrent Sends must be at least 1.")
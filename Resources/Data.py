@@ -1,13 +1,22 @@
 """Resource | Data Manager
 
 This class manages all of the loading and
-saving of the config, permissions, and data.
+saving of the config, permissions, rate limits, and data.
 """
+import concurrent.futures
+import dataclasses
+import hashlib
 import json
+import logging
 import os
+import time
 from discord import Color
 from colorama import Fore
 import datetime
+import yaml
+
+from Resources.Config import BotConfig
+from Resources.Store import JSONStore, SQLiteStore, merge, decode, MISSING
 
 """ Class | Data Manager
 
@@ -15,8 +24,22 @@ This class is used to, well, manage data. Specifically any data pertaining to
 the bot's config, as well as data storage for persisting data between restarts.
 """
 class DataManager:
-    def __init__(self, bot):
+    # Taken from the fields of `BotConfig`, so adding, removing or retyping a setting ignores older caches.
+    cache_version = hashlib.sha1(repr([(f.name, str(f.type)) for f in dataclasses.fields(BotConfig)]).encode()).hexdigest()
+    # The settings the bot had before `BotConfig`, which `apply_config` also puts onto the bot as attributes.
+    legacy_settings = (
+        "DEBUG", "prefix", "online_message", "restarting_message", "data_file", "show_game_status",
+        "game_to_show", "log_channel_id", "footer", "footer_image", "delete_commands", "show_command_author"
+    )
+
+    def __init__(self, bot = None, cache_file = "./Data/config_cache.json"):
         self.bot = bot
+        self.cache_file = os.path.abspath(cache_file)
+        self.store = None
+        # The JSON of each data key as the store last had it, which the data in memory is based on.
+        self.base = {}
+        # The store is only used from this thread, so saves and reloads happen in the order they were made.
+        self.executor = None
 
     """ Setup | Bot Config
 
@@ -25,33 +48,80 @@ class DataManager:
     See 'Config.yml' for specifics on each setting.
     """
     def load_config(self):
-        with open("./Config.yml", 'r') as file:
-            config = self.bot.yaml.load(file, Loader = self.bot.yaml.Loader)
+        self.apply_config(*self.parse_config())
+
+    """ Setup | Parse Config
+
+    Reads and checks the config file, without changing anything on the bot (so it is safe to run
+    in another thread). Returns the raw config, and the compiled `BotConfig`.
+
+    The compiled config is cached in `cache_file`, and reused while the config file is unchanged:
+    if its modification time and size match, the file is not even read, otherwise it is only parsed
+    again if its content hash differs. The C YAML loader is used when PyYAML was built with it.
+
+    Raises a `ValueError` describing the problem if the config is invalid.
+    """
+    def parse_config(self, path = "./Config.yml"):
+        try:
+            stat = os.stat(path)
+            cache = self.read_config_cache()
+            if cache and cache['mtime'] == stat.st_mtime_ns and cache['size'] == stat.st_size:
+                return cache['config'], BotConfig.from_cache(cache['settings'])
+
+            with open(path, 'rb') as file:
+                content = file.read()
+            digest = hashlib.sha1(content).hexdigest()
+            if cache and cache['hash'] == digest:
+                config, settings = cache['config'], BotConfig.from_cache(cache['settings'])
+            else:
+                config = yaml.load(content, Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+                settings = BotConfig.from_dict(config)
+        except KeyError as e:
+            raise ValueError(f"Config.yml is missing the option {e}.")
+        except (OSError, TypeError, yaml.YAMLError) as e:
+            raise ValueError(f"Config.yml could not be read: {e}")
+
+        self.write_config_cache({"mtime": stat.st_mtime_ns, "size": stat.st_size, "hash": digest, "config": config, "settings": settings.to_cache()})
+        return config, settings
 
+    def read_config_cache(self):
+        try:
+            with open(self.cache_file, 'r', encoding = "utf-8") as file:
+                cache = json.load(file)
+            if cache.get('version') == self.cache_version:
+                return cache
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def write_config_cache(self, cache):
+        cache['version'] = self.cache_version
+        try:
+            # Written to a temporary file first, so a crash can never leave a half written cache.
+            with open(self.cache_file + ".tmp", 'w', encoding = "utf-8") as file:
+                json.dump(cache, file)
+            os.replace(self.cache_file + ".tmp", self.cache_file)
+        except (OSError, TypeError, ValueError) as e:
+            logging.getLogger("bot.Data").warning(f"Could not save the config cache: {e}")
+
+    """ Setup | Apply Config
+
+    Puts a parsed config onto the bot, as `bot.settings`. This never awaits, so nothing can see a half applied config.
+
+    The settings the bot had before `BotConfig` (e.g. `bot.prefix`) are also still put onto the bot as
+    individual attributes, for the code that reads them that way. This is only until that code is moved
+    over to `bot.settings`, and newer settings must be read from `bot.settings`.
+    """
+    def apply_config(self, config, settings):
         # Save config files to the bot.
         self.bot.config = config
+        self.bot.settings = settings
+        for name in self.legacy_settings:
+            setattr(self.bot, name, getattr(settings, name))
 
-        # Main Settings
-        self.bot.TOKEN               = os.getenv(config['Token Env Var'])
-        self.bot.DEBUG               = config['DEBUG']
-        self.bot.prefix              = config['Prefix']
-        self.bot.online_message      = config['Online Message']
-        self.bot.restarting_message  = config['Restarting Message']
-        self.bot.data_file           = os.path.abspath(config['Data File'])
-        self.bot.show_game_status    = config['Game Status']['Active']
-        self.bot.game_to_show        = config['Game Status']['Game']
-        self.bot.log_channel_id      = config['Log Channel']
-
-        # Embed Options
-        self.bot.embed_color = Color.from_rgb(
-            config['Embed Settings']['Color']['r'],
-            config['Embed Settings']['Color']['g'],
-            config['Embed Settings']['Color']['b']
-        )
-        self.bot.footer =              config['Embed Settings']['Footer']['Text']
-        self.bot.footer_image =        config['Embed Settings']['Footer']['Icon URL']
-        self.bot.delete_commands =     config['Embed Settings']['Delete Commands']
-        self.bot.show_command_author = config['Embed Settings']['Show Author']
+        # Settings that are built from the plain config values.
+        self.bot.TOKEN =               os.getenv(settings.token_env_var)
+        self.bot.embed_color =         Color.from_rgb(*settings.embed_rgb)
         self.bot.embed_ts =            lambda: datetime.datetime.now(datetime.timezone.utc)
 
         # Logging Variables
@@ -64,49 +134,274 @@ class DataManager:
 
     Loading Permission variables into bot attributes.
 
+    Alongside the raw permissions, an index of the role IDs allowed to use each command is
+    built, so checking a permission is a single set intersection. Every reload bumps
+    `bot.permissions_version`, so anything cached from the permissions knows it is stale.
+
     See 'Permissions.yml' for specifics on each setting.
     """
     def load_permissions(self):
+        self.apply_permissions(*self.parse_permissions())
+
+    """ Setup | Parse Permissions
+
+    Reads and checks the permissions file without changing anything on the bot, returning the
+    permissions and the role index built from them. Raises a `ValueError` if the file is invalid.
+    """
+    def parse_permissions(self, path = "./Permissions.json"):
         bot_permissions = {}
-        with open("./Permissions.json", 'r') as file:
-            permissions = json.load(file)
-            # Raw permission input is formatted to have role IDs in place.
-            roles = dict(permissions['roles'])
-            for key in permissions["permissions"].keys():
-                bot_permissions[key] = []
-                for permission in permissions["permissions"][key]:
-                    bot_permissions[key].append(permission.format(**roles))
+        try:
+            with open(path, 'r') as file:
+                permissions = json.load(file)
+                # Raw permission input is formatted to have role IDs in place.
+                roles = dict(permissions['roles'])
+                for key in permissions["permissions"].keys():
+                    bot_permissions[key] = []
+                    for permission in permissions["permissions"][key]:
+                        bot_permissions[key].append(permission.format(**roles))
+        except KeyError as e:
+            raise ValueError(f"Permissions.json is missing {e}.")
+        except (OSError, AttributeError, TypeError, ValueError) as e:
+            raise ValueError(f"Permissions.json could not be read: {e}")
+
+        permission_roles = {}
+        for key, role_ids in bot_permissions.items():
+            try:
+                permission_roles[key] = frozenset(int(role_id) for role_id in role_ids)
+            except ValueError as e:
+                logging.getLogger("bot.Data").warning(f"Invalid role in permission `{key}`: {e}")
+                permission_roles[key] = frozenset(int(role_id) for role_id in role_ids if role_id.isdigit())
+
+        return bot_permissions, permission_roles
+
+    """ Setup | Apply Permissions
 
+    Puts parsed permissions onto the bot.
+    """
+    def apply_permissions(self, bot_permissions, permission_roles):
         self.bot.permissions = bot_permissions
+        self.bot.permission_roles = permission_roles
+        self.bot.permissions_version = getattr(self.bot, 'permissions_version', 0) + 1
+
+    """ Setup | Rate Limits
+
+    Loading the command rate limits into bot attributes.
+
+    See 'RateLimits.json' for the format, and `Resources/Limits.py` for how they are applied.
+    """
+    def load_rate_limits(self):
+        self.apply_rate_limits(*self.parse_rate_limits())
+
+    """ Setup | Parse Rate Limits
+
+    Reads and checks the rate limits file without changing anything on the bot, returning the limits
+    by permission name (e.g. "category-command") in a tuple, to be applied like the other settings files.
+    Raises a `ValueError` if the file is invalid.
+    """
+    def parse_rate_limits(self, path = "./RateLimits.json"):
+        try:
+            with open(path, 'r', encoding = "utf-8") as file:
+                limits = json.load(file)['limits']
+        except KeyError as e:
+            raise ValueError(f"RateLimits.json is missing {e}.")
+        except (OSError, ValueError) as e:
+            raise ValueError(f"RateLimits.json could not be read: {e}")
+
+        # `type(...) is int` leaves out booleans, which JSON has as `true` and `false`.
+        if not isinstance(limits, dict):
+            raise ValueError("RateLimits.json: \"limits\" needs to be an object of limits by command.")
+        for name, limit in limits.items():
+            if not isinstance(limit, dict):
+                raise ValueError(f"RateLimits.json: the limits of `{name}` need to be an object.")
+            for key, value in limit.items():
+                if not isinstance(value, dict):
+                    raise ValueError(f"RateLimits.json: the `{key}` limit of `{name}` needs to be an object.")
+                if key in ("user", "guild", "global"):
+                    if type(value.get('rate')) is not int or value['rate'] < 1 or type(value.get('per')) not in (int, float) or value['per'] <= 0:
+                        raise ValueError(f"RateLimits.json: the `{key}` limit of `{name}` needs a \"rate\" of at least 1 and a \"per\" above 0.")
+                elif key == "concurrency":
+                    if type(value.get('max')) is not int or value['max'] < 1 or value.get('per') not in ("guild", "global"):
+                        raise ValueError(f"RateLimits.json: the concurrency of `{name}` needs a \"max\" of at least 1 and a \"per\" of \"guild\" or \"global\".")
+                else:
+                    raise ValueError(f"RateLimits.json: `{name}` has an unknown limit `{key}`.")
+        return limits,
+
+    """ Setup | Apply Rate Limits
+
+    Puts parsed rate limits onto the bot. Every reload bumps `bot.rate_limits_version`, so the limiter starts its buckets over.
+    """
+    def apply_rate_limits(self, limits):
+        self.bot.rate_limits = limits
+        self.bot.rate_limits_version = getattr(self.bot, 'rate_limits_version', 0) + 1
+
+    """ Permissions | Has Permission
+
+    Whether a member is allowed to use the command with the given permission name (e.g. "category-command").
+    Administrators can use every command, and commands without any permissions set can be used by anyone.
+    """
+    def has_permission(self, member, name):
+        if member.guild_permissions.administrator:
+            return True
+        allowed = self.bot.permission_roles.get(name)
+        if allowed is None:
+            return True
+        return not allowed.isdisjoint(self.get_role_ids(member))
+
+    """ Permissions | Get Permission Profile
+
+    Returns the set of permission names a member is allowed to use, which is the same for every
+    member with the same relevant roles. Administrators are given the profile `None`, as they can use everything.
+    """
+    def get_permission_profile(self, member):
+        if member.guild_permissions.administrator:
+            return None
+        role_ids = self.get_role_ids(member)
+        return frozenset(name for name, allowed in self.bot.permission_roles.items() if not allowed.isdisjoint(role_ids))
+
+    """ Permissions | Get Role IDs
+
+    The IDs of a member's roles, read through the public `Member.roles`.
+    """
+    def get_role_ids(self, member):
+        return {role.id for role in member.roles}
+
+    """ Data | Get Guild Data
+
+    The data kept for a single guild, under `data['guilds']`, created if `create` is set.
+    Returns an empty dict (not saved anywhere) when the guild has no data and `create` isn't set.
+    """
+    def get_guild_data(self, guild_id, create = False):
+        guilds = self.bot.data.get('guilds', {})
+        if str(guild_id) in guilds:
+            return guilds[str(guild_id)]
+        if not create:
+            return {}
+        return self.bot.data.setdefault('guilds', {}).setdefault(str(guild_id), {})
+
+    """ Data | Get Log Channel
+
+    The channel a guild's logs of a type go to.
+
+    A guild's own log channels (set with `set_log_channel`) come first, then the original,
+    bot wide log channels under `data['logs']`, but only if the channel is in the guild, so logs
+    never end up in another guild. With no guild (e.g. DMs and background tasks) only the bot wide
+    channels are used. Returns None if there is no channel.
+    """
+    def get_log_channel(self, guild, log_type):
+        if guild is not None:
+            channel_id = self.get_guild_data(guild.id).get('logs', {}).get(log_type)
+            if channel_id:
+                return guild.get_channel(channel_id)
+
+        channel = self.bot.get_channel(self.bot.data.get('logs', {}).get(log_type))
+        if guild is not None and channel is not None and channel.guild != guild:
+            return None
+        return channel
+
+    """ Data | Set Log Channel
+
+    Sets the channel a guild's logs of a type go to.
+    """
+    def set_log_channel(self, guild, log_type, channel_id):
+        self.get_guild_data(guild.id, create = True).setdefault('logs', {})[log_type] = channel_id
+        self.save_data()
+
+    """ Data | Get Store
+
+    Opens the store the data is kept in, picked by the "Data Store" config option.
+    """
+    def get_store(self):
+        if self.bot.settings.data_store == "sqlite":
+            return SQLiteStore(self.bot.settings.store_file, import_from = self.bot.data_file)
+        return JSONStore(self.bot.data_file)
+
+    """ Data | Run Store
+
+    Runs a store method on the store's thread, so the disk (and, in a cluster, waiting on another worker's
+    write) never blocks the event loop, then calls `callback` with the result on the loop.
+
+    Before the loop is running (e.g. at startup), the method is run right away instead.
+    """
+    def run_store(self, func, *args, callback):
+        if self.executor is None:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "DataStore")
+
+        future = self.executor.submit(func, *args)
+        loop = getattr(self.bot, 'loop', None)
+        if loop is None or not loop.is_running():
+            concurrent.futures.wait([future])
+            callback(future)
+        else:
+            future.add_done_callback(lambda f: loop.call_soon_threadsafe(callback, f))
 
     """ Data | Saving
 
-    Open the data file and save the bot's data to it.
+    Save the bot's data to the data store.
 
-    Overwrites previous data in file.
+    The data is copied (as JSON) right away, then written on the store's thread.
+    When running in a cluster, the other workers are told which keys changed so they can reload them.
     """
     def save_data(self):
-        with open(self.bot.data_file, 'w+', encoding = "utf-8") as save_file:
-            try:
-                save_file.write(json.dumps(self.bot.data, indent = 2))
-            except Exception as e:
-                print('Could not save data: ' + str(e))
+        start = time.perf_counter()
+        try:
+            encoded = {key: json.dumps(value) for key, value in self.bot.data.items()}
+        except Exception as e:
+            logging.getLogger("bot.Data").error(f"Could not save data: {e}")
+            return
+        base, self.base = self.base, encoded
+        self.run_store(self.store.save, encoded, base, callback = lambda future: self.saved(future, start))
 
-    """ Data | Loading
+    def saved(self, future, start):
+        try:
+            changed = future.result()
+        except Exception as e:
+            logging.getLogger("bot.Data").error(f"Could not save data: {e}")
+            return
+
+        if self.bot.metrics:
+            self.bot.metrics.data_saves.observe(time.perf_counter() - start)
+            self.bot.metrics.data_size = self.store.size
 
-    Check if the data file exists, if it does, load it, if not, create it.
+        cluster = getattr(self.bot, 'cluster', None)
+        if changed and cluster:
+            cluster.broadcast("data", keys = changed)
+
+    """ Data | Loading
 
-    If the data file exists but has not data, give it a new empty data object.
+    Load the bot's data from the data store, which creates it if it doesn't exist yet.
     """
     def load_data(self):
-        if os.path.exists(self.bot.data_file):
-            with open(self.bot.data_file, 'r', encoding = "utf-8") as file:
-                content = file.read()
-                if len(content) == 0:
-                    self.bot.data = {}
-                    self.save_data()
-                else:
-                    self.bot.data = json.loads(content)
-        else:
-            self.bot.data = {}
-            self.save_data()
+        self.store = self.get_store()
+        self.bot.data = self.store.load()
+        self.base = {key: json.dumps(value) for key, value in self.bot.data.items()}
+
+    """ Data | Reload Keys
+
+    Reloads some of the data's keys after another cluster worker changed them, then
+    dispatches a `data_reload` event with the keys, for cogs holding anything built from them.
+
+    Changes made in memory since the keys were last loaded or saved are merged into the reloaded keys, so none are lost.
+    """
+    def reload_keys(self, keys):
+        self.run_store(self.store.load_keys, keys, callback = lambda future: self.reloaded(future, keys))
+
+    def reloaded(self, future, keys):
+        try:
+            data = future.result()
+        except Exception as e:
+            logging.getLogger("bot.Data").error(f"Could not reload data keys {', '.join(keys)}: {e}")
+            return
+
+        for key in keys:
+            ours = self.bot.data.get(key, MISSING)
+            value = merge(decode(self.base.get(key)), ours, data.get(key, MISSING))
+            if key in data:
+                self.base[key] = json.dumps(data[key])
+            else:
+                self.base.pop(key, None)
+
+            if value is MISSING:
+                self.bot.data.pop(key, None)
+            else:
+                self.bot.data[key] = value
+        self.bot.dispatch("data_reload", keys)
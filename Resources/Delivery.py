@@ -0,0 +1,189 @@
+"""Resource | Message Delivery
+
+This file hosts the tools used to send the same message to many
+channels at once. More details provided for each.
+"""
+import asyncio
+import time
+
+import aiohttp
+import discord
+
+from Resources.Utility import EmbedLimits
+
+""" Class | Fan Out
+
+This class sends a single message to a list of channels concurrently.
+
+The number of requests in flight at any time is capped by a semaphore shared by the whole bot,
+so a large announcement can not starve the rest of the bot of HTTP capacity. Temporary failures
+(Discord server errors, timeouts, dropped connections) are retried with an exponential backoff,
+while permanent ones (missing permissions, deleted channels) fail right away.
+"""
+class FanOut:
+    def __init__(self, bot):
+        self.bot = bot
+        self.semaphore = asyncio.Semaphore(bot.settings.send_concurrency)
+        self.retries = bot.settings.send_retries
+        self.backoff = bot.settings.send_backoff
+
+    """ Coroutine | Send
+
+    Sends a message to every channel ID given, returning one result per channel in the same order.
+
+    Each result is a dict containing:
+        - channel (int): The channel ID.
+        - ok (bool): Whether the request succeeded.
+        - message (Optional[discord.Message]): The message returned by Discord, if it was successful.
+        - attempts (int): How many requests were made for the channel.
+        - latency (float): The time in seconds from the first attempt to the final outcome.
+        - status (Optional[int]): The HTTP status of the last failed request, if there was one.
+        - error (Optional[str]): The reason the request failed, if it did.
+    """
+    async def send(self, channel_ids, **kwargs):
+        return await asyncio.gather(*(self.send_one(ch, **kwargs) for ch in channel_ids))
+
+    """ Coroutine | Send One
+
+    Sends a message to a single channel, retrying temporary failures.
+    """
+    async def send_one(self, channel_id, **kwargs):
+        channel = await self.get_channel(channel_id)
+        if not channel:
+            return {"channel": channel_id, "ok": False, "message": None, "attempts": 0, "latency": 0.0, "status": 404, "error": "Channel not found"}
+        if type(channel) == dict:
+            return channel
+
+        return await self.attempt(channel_id, lambda: channel.send(**kwargs))
+
+    """ Coroutine | Edit
+
+    Edits previously sent messages concurrently, given a list of `(channel_id, message_id)` pairs.
+
+    The messages are edited through partial messages, so each copy only costs a single PATCH request
+    instead of having to fetch the message first. Returns results in the same format as `send`.
+    """
+    async def edit(self, copies, **kwargs):
+        return await asyncio.gather(*(self.edit_one(ch, m, **kwargs) for ch, m in copies))
+
+    """ Coroutine | Edit One
+
+    Edits a single previously sent message, retrying temporary failures.
+    """
+    async def edit_one(self, channel_id, message_id, **kwargs):
+        channel = await self.get_channel(channel_id)
+        if not channel:
+            return {"channel": channel_id, "ok": False, "message": None, "attempts": 0, "latency": 0.0, "status": 404, "error": "Channel not found"}
+        if type(channel) == dict:
+            return channel
+
+        message = channel.get_partial_message(message_id)
+        return await self.attempt(channel_id, lambda: message.edit(**kwargs))
+
+    """ Coroutine | Get Channel
+
+    Gets a channel from the cache. In a cluster, a channel in a guild on another worker's
+    shards isn't cached by this worker, so it is fetched from Discord instead.
+
+    Returns None if the channel no longer exists, or a failed result if it couldn't be fetched.
+    """
+    async def get_channel(self, channel_id):
+        channel = self.bot.get_channel(channel_id)
+        if channel is None and self.bot.cluster:
+            try:
+                channel = await self.bot.fetch_channel(channel_id)
+            except discord.NotFound:
+                return None
+            except discord.HTTPException as e:
+                return {"channel": channel_id, "ok": False, "message": None, "attempts": 1, "latency": 0.0, "status": e.status, "error": f"{e.status} {e.text or type(e).__name__}"}
+        return channel
+
+    """ Coroutine | Attempt
+
+    Runs the request made by the given factory until it succeeds, fails permanently, or runs out of retries.
+
+    The semaphore is only held while a request is in flight, so channels waiting on a backoff
+    do not block the others from being sent.
+    """
+    async def attempt(self, channel_id, factory):
+        result = {"channel": channel_id, "ok": False, "message": None, "attempts": 0, "latency": 0.0, "status": None, "error": None}
+        start = time.perf_counter()
+        delay = self.backoff
+
+        while True:
+            result['attempts'] += 1
+            try:
+                async with self.semaphore:
+                    result['message'] = await factory()
+                result['ok'] = True
+                result['status'] = None
+                result['error'] = None
+                break
+            except (discord.Forbidden, discord.NotFound) as e:
+                result['status'] = e.status
+                result['error'] = e.text or type(e).__name__
+                break
+            except discord.HTTPException as e:
+                result['status'] = e.status
+                # Only server side errors are worth retrying, anything else is a bad request.
+                result['error'] = f"{e.status} {e.text or type(e).__name__}"
+                if e.status < 500:
+                    break
+            except (asyncio.TimeoutError, aiohttp.ClientError, OSError) as e:
+                result['error'] = str(e) or type(e).__name__
+
+            if result['attempts'] > self.retries:
+                break
+            await asyncio.sleep(delay)
+            delay *= 2
+
+        result['latency'] = time.perf_counter() - start
+        return result
+
+    """ Method | Get Summary Embed
+
+    Formats the results of a fan out into an embed, listing the outcome and latency of each channel.
+    Any channels that were skipped without making a request can be noted with `skipped`.
+
+    Failed channels are listed first. If there are too many channels to list within Discord's
+    description limit, the rest are counted on a final line instead, as every send has already
+    happened by the time the summary is built.
+    """
+    def get_summary_embed(self, title, results, author = None, skipped = 0):
+        failed = []
+        succeeded = []
+        for r in results:
+            channel = self.bot.get_channel(r['channel'])
+            name = channel.mention if channel else f"`{r['channel']}`"
+            ms = round(r['latency'] * 1000)
+            retries = f" | {r['attempts'] - 1} retries" if r['attempts'] > 1 else ""
+            if r['ok']:
+                succeeded.append(f"\N{WHITE HEAVY CHECK MARK} {name} - `{ms} ms`{retries}")
+            else:
+                failed.append(f"\N{CROSS MARK} {name} - `{ms} ms`{retries} | {r['error']}")
+
+        lines = []
+        length = 0
+        # Leaves room for the line counting any channels that didn't fit.
+        limit = EmbedLimits.description - 64
+        for line in failed + succeeded:
+            if length + len(line) + 1 > limit:
+                lines.append(f"... and {len(failed) + len(succeeded) - len(lines)} more channels.")
+                break
+            lines.append(line)
+            length += len(line) + 1
+
+        slowest = max((r['latency'] for r in results), default = 0)
+        fields = [
+            {"name": "Succeeded", "value": f"`{len(succeeded)}/{len(results)}`", "inline": True},
+            {"name": "Slowest", "value": f"`{round(slowest * 1000)} ms`", "inline": True}
+        ]
+        if skipped:
+            fields.append({"name": "Unchanged", "value": f"`{skipped}`", "inline": True})
+
+        return self.bot.embed_util.get_embed(
+            title = title[:EmbedLimits.title],
+            desc = "\n".join(lines) if lines else None,
+            fields = fields,
+            author = author
+        )
@@ -0,0 +1,249 @@
+"""Resource | Extensions
+
+This file hosts the tools used to load the bot's extensions (cogs),
+either right away or only once they are needed. More details provided for each.
+"""
+import ast
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import sys
+import time
+import types
+
+""" Class | Extension Loader
+
+Loads extensions while timing how long each one takes to load, which covers running the
+extension's file (and anything it imports for the first time) and its `setup`, which creates
+the cog and runs its `__init__`. The file is only run once, by `load_extension`.
+
+Extensions can also be registered as lazy, in which case only a registry of their top level
+command names and event listeners is read from their source (without importing it). The real
+extension is then loaded the first time one of those commands is used or one of those events happens.
+
+Lazy extensions should not have background tasks or `on_ready` listeners, since neither will run until the extension is loaded.
+"""
+class ExtensionLoader:
+    def __init__(self, bot):
+        self.bot = bot
+        self.log = bot.log_util.get_logger("Extensions")
+
+        self.timings = {}
+        self.lazy = {}
+        self.lazy_commands = {}
+
+    """ Method | Load
+
+    Loads an extension right away, recording how long it took.
+    """
+    def load(self, name):
+        start = time.perf_counter()
+        self.bot.load_extension(name)
+
+        self.timings[name] = {"load": time.perf_counter() - start, "lazy": False}
+        return self.timings[name]
+
+    """ Method | Register Lazy
+
+    Registers an extension to be loaded on first use, from the commands and listeners found in its source.
+    """
+    def register_lazy(self, name):
+        registry = self.scan(name)
+        registry['stubs'] = []
+
+        for command in registry['commands']:
+            self.lazy_commands[command.lower()] = name
+
+        for event in registry['events']:
+            stub = self.make_stub(name, event)
+            self.bot.add_listener(stub, event)
+            registry['stubs'].append((event, stub))
+
+        self.lazy[name] = registry
+        self.timings[name] = {"load": None, "lazy": True}
+
+    """ Method | Load Lazy
+
+    Loads a lazy extension, if it has not been loaded yet. Returns whether it was loaded.
+    """
+    def load_lazy(self, name, reason):
+        if not self.unregister_lazy(name):
+            return False
+
+        try:
+            timing = self.load(name)
+        except Exception:
+            self.log.exception(f"Failed to load lazy extension {name}.")
+            return False
+
+        timing['lazy'] = True
+        self.log.info(f"Loaded lazy extension {name}", extra = {"fields": {
+            "Reason": reason,
+            "Load": f"{timing['load'] * 1000:.1f} ms"
+        }})
+        return True
+
+    """ Method | Unregister Lazy
+
+    Removes a lazy extension's stand in commands and listeners, returning whether it was registered.
+    """
+    def unregister_lazy(self, name):
+        registry = self.lazy.pop(name, None)
+        if registry is None:
+            return False
+
+        for event, stub in registry['stubs']:
+            self.bot.remove_listener(stub, event)
+        for command in registry['commands']:
+            self.lazy_commands.pop(command.lower(), None)
+        return True
+
+    """ Method | Reload All
+
+    Reloads every loaded extension from its current source, all or nothing.
+
+    If any extension fails to load, the ones already reloaded are put back to the module
+    versions they were running before, so the bot is never left with a mix of old and new code.
+    Lazy extensions that have not been loaded yet have their registry read again instead.
+
+    Only the extensions themselves are reloaded. The `Resources` modules and the commands
+    defined in `main.py` (e.g. the Internal cog) keep running the code they started with,
+    so changes to them still need a full restart.
+
+    Returns the name of the extension that failed and its error, or `(None, None)` if everything was reloaded.
+    """
+    def reload_all(self):
+        previous = dict(self.bot.extensions)
+        reloaded = []
+
+        for name in previous:
+            start = time.perf_counter()
+            try:
+                # discord.py puts the failed extension back to its previous version on its own.
+                self.bot.reload_extension(name)
+            except Exception as e:
+                self.log.exception(f"Failed to reload {name}, rolling back.")
+                self.rollback(reloaded, previous)
+                return name, e
+            reloaded.append(name)
+            self.timings[name] = {"load": time.perf_counter() - start, "lazy": self.timings.get(name, {}).get('lazy', False)}
+
+        for name in list(self.lazy):
+            self.unregister_lazy(name)
+            self.register_lazy(name)
+
+        return None, None
+
+    """ Method | Rollback
+
+    Puts the given extensions back to the module versions they were running before a reload.
+
+    The files on disk already hold the new code, so each extension is loaded through `load_extension`
+    from a spec whose loader copies in the previous module instead of running the file.
+    """
+    def rollback(self, names, previous):
+        for name in reversed(names):
+            self.bot.unload_extension(name)
+            # `load_extension` finds the spec of a module that is already in `sys.modules`.
+            placeholder = types.ModuleType(name)
+            placeholder.__spec__ = importlib.machinery.ModuleSpec(name, PreviousModuleLoader(previous[name]), origin = getattr(previous[name], '__file__', None))
+            sys.modules[name] = placeholder
+            try:
+                self.bot.load_extension(name)
+            finally:
+                if sys.modules.get(name) is placeholder:
+                    del sys.modules[name]
+
+    """ Method | Load For Command
+
+    Loads the lazy extension that provides a command, returning whether one was loaded.
+    """
+    def load_for_command(self, command):
+        name = self.lazy_commands.get(command.lower())
+        return name is not None and self.load_lazy(name, f"Command `{command}`")
+
+    """ Method | Make Stub
+
+    Creates the listener that stands in for a lazy extension's listener, loading the extension
+    the first time the event happens and then passing that event on to the real listeners.
+
+    Every event that was dispatched to the stubs before the extension finished loading is passed
+    on as well, not just the one that loaded it, as those events never reach the real listeners.
+    """
+    def make_stub(self, name, event):
+        async def stub(*args):
+            self.load_lazy(name, f"Event `{event}`")
+            if name not in self.bot.extensions:
+                return
+            for cog in list(self.bot.cogs.values()):
+                if type(cog).__module__ != name:
+                    continue
+                for listener_name, listener in cog.get_listeners():
+                    if listener_name == event:
+                        await listener(*args)
+        return stub
+
+    """ Method | Scan
+
+    Reads the top level command names (with aliases) and the listener event names from an extension's
+    source, without importing it. Raises a `ValueError` if a name is not a plain string.
+    """
+    def scan(self, name):
+        spec = importlib.util.find_spec(name)
+        with open(spec.origin, 'r', encoding = "utf-8") as file:
+            tree = ast.parse(file.read(), spec.origin)
+
+        found = {"commands": set(), "events": set()}
+        for node in ast.walk(tree):
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            for decorator in node.decorator_list:
+                call = decorator if isinstance(decorator, ast.Call) else None
+                path = ast.unparse(call.func if call else decorator)
+                kwargs = {k.arg: k.value for k in call.keywords} if call else {}
+                args = call.args if call else []
+
+                # Subcommands (e.g. `@group.command`) are found through their top level group.
+                if path in ("commands.command", "commands.group"):
+                    command = kwargs.get('name', args[0] if args else None)
+                    found['commands'].add(ast.literal_eval(command) if command else node.name)
+                    if 'aliases' in kwargs:
+                        found['commands'].update(ast.literal_eval(kwargs['aliases']))
+                elif path == "commands.Cog.listener":
+                    event = kwargs.get('name', args[0] if args else None)
+                    found['events'].add(ast.literal_eval(event) if event else node.name)
+
+        return found
+
+    """ Method | Report
+
+    Logs how long each extension took to load.
+    """
+    def report(self):
+        fields = {}
+        for name, timing in self.timings.items():
+            if timing['load'] is None:
+                fields[name] = "Lazy (not loaded yet)"
+            else:
+                fields[name] = f"{timing['load'] * 1000:.1f} ms"
+
+        total = sum(t['load'] for t in self.timings.values() if t['load'] is not None)
+        self.log.info(f"Loaded extensions in {total * 1000:.1f} ms", extra = {"fields": fields})
+
+""" Class | Previous Module Loader
+
+An import loader that "runs" a module by copying in the contents of a module that was already loaded,
+so `load_extension` can put an extension back to an earlier version of its code.
+"""
+class PreviousModuleLoader(importlib.abc.Loader):
+    def __init__(self, module):
+        self.module = module
+
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module):
+        module.__dict__.update({
+            key: value for key, value in self.module.__dict__.items()
+            if key not in ('__name__', '__spec__', '__loader__')
+        })
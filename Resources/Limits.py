@@ -0,0 +1,204 @@
+"""Resource | Limits
+
+This file hosts the rate limits for commands, configured in `RateLimits.json`.
+More details provided for each.
+
+Commands are named like in `Permissions.json` (e.g. "rr-start"), and each can have any of:
+    "user", "guild", "global": {"rate": 2, "per": 10}
+        Allows 2 uses every 10 seconds per user, per guild or across the whole bot.
+    "concurrency": {"max": 1, "per": "guild"}
+        Allows the command to run once at a time per guild (or "global").
+"""
+import time
+
+from discord.ext import commands
+
+""" Class | Rate Limited
+
+The error raised by the rate limit check when a command is turned away. It is a `CheckFailure`,
+so it counts as a rejected invocation in the metrics.
+
+`retry_after` is how many seconds until the command can be used again, or None when the command
+is already running as many times as it is allowed to. `notify` is only set the first time a
+user is turned away by a limit, so they aren't answered over and over while spamming.
+"""
+class RateLimited(commands.CheckFailure):
+    def __init__(self, name, scope, retry_after, notify):
+        self.name = name
+        self.scope = scope
+        self.retry_after = retry_after
+        self.notify = notify
+        if retry_after is None:
+            super().__init__(f"`{name}` is already running as many times as it can ({scope}).")
+        else:
+            super().__init__(f"`{name}` is rate limited ({scope}), try again in {retry_after:.0f}s.")
+
+""" Class | Token Bucket
+
+Allows `rate` uses every `per` seconds, refilling one use at a time rather than all at once,
+so a burst of up to `rate` uses is allowed, then one use every `per / rate` seconds.
+"""
+class TokenBucket:
+    __slots__ = ("rate", "per", "tokens", "last", "warned")
+
+    def __init__(self, rate, per, now):
+        self.rate = rate
+        self.per = per
+        self.tokens = rate
+        self.last = now
+        # Whether the user was told about this bucket being empty since it last let a use through.
+        self.warned = False
+
+    def update(self, now):
+        self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate / self.per)
+        self.last = now
+
+    """ Method | Retry After
+
+    How many seconds until the bucket has a use in it, 0 if it has one now.
+    """
+    def retry_after(self):
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) * self.per / self.rate
+
+    def take(self):
+        self.tokens -= 1
+        self.warned = False
+
+""" Class | Rate Limiter
+
+Applies the limits in `bot.rate_limits` (see `DataManager.parse_rate_limits`) to every command, from the global
+`command_permissions` check once the user is known to be allowed to use the command.
+
+Each command can have a token bucket per user, per guild, and one for everyone (global), and a limit on how many
+times it can run at the same time, either per guild or globally. A command is only allowed if every bucket it has
+has a use in it, and only then is a use taken from each, so being turned away by one limit never uses up another.
+Commands without limits cost a dict lookup.
+
+The concurrency slots a command takes are released by `release`, from the `after_invoke` hook once the command
+is done, or from `on_command_error` when it failed before its handler ran. Like the token buckets, a full
+concurrency limit only answers the first use it turns away, until one of its slots is released.
+
+Buckets are made on first use, and buckets that have completely refilled are dropped every few minutes,
+as they behave exactly like a new one. In a cluster each worker keeps its own buckets, which only matters
+for the global and user limits, as every guild is run by a single worker.
+"""
+class RateLimiter:
+    prune_interval = 300
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.buckets = {}
+        self.running = {}
+        # The concurrency keys someone was told are full since a slot of theirs was last released.
+        self.warned = set()
+        self.version = None
+        self.last_prune = time.monotonic()
+
+    def get_key(self, scope, ctx):
+        if scope == "user":
+            return ctx.author.id
+        if scope == "guild":
+            # Direct messages are limited per channel instead.
+            return ctx.guild.id if ctx.guild else ctx.channel.id
+        return None
+
+    """ Coroutine | Check
+
+    Takes a use of the command from its limits, raising `RateLimited` when it is turned away.
+    """
+    async def check(self, ctx):
+        # The help command runs the checks to see which commands to list, which isn't a use.
+        if getattr(ctx, 'checking_only', False):
+            return True
+        name = ctx.command.qualified_name.replace(' ', '-')
+        limits = self.bot.rate_limits.get(name)
+        if limits is None:
+            return True
+
+        now = time.monotonic()
+        if self.version != self.bot.rate_limits_version:
+            # The limits changed, so the old buckets may have the wrong sizes.
+            self.version = self.bot.rate_limits_version
+            self.buckets.clear()
+        elif now - self.last_prune > self.prune_interval:
+            self.prune(now)
+
+        buckets = []
+        for scope in ("user", "guild", "global"):
+            limit = limits.get(scope)
+            if limit is None:
+                continue
+            key = (name, scope, self.get_key(scope, ctx))
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = TokenBucket(limit['rate'], limit['per'], now)
+            else:
+                bucket.update(now)
+            retry_after = bucket.retry_after()
+            if retry_after:
+                self.reject(name, scope)
+                notify = not bucket.warned
+                bucket.warned = True
+                raise RateLimited(name, scope, retry_after, notify)
+            buckets.append(bucket)
+
+        concurrency = limits.get('concurrency')
+        if concurrency is not None:
+            key = (name, self.get_key(concurrency['per'], ctx))
+            if self.running.get(key, 0) >= concurrency['max']:
+                self.reject(name, "concurrency")
+                notify = key not in self.warned
+                self.warned.add(key)
+                raise RateLimited(name, concurrency['per'], None, notify)
+            self.running[key] = self.running.get(key, 0) + 1
+            # A group's subcommand runs the checks again, so a context can hold more than one slot.
+            if not hasattr(ctx, 'rate_limit_slots'):
+                ctx.rate_limit_slots = []
+            ctx.rate_limit_slots.append(key)
+
+        for bucket in buckets:
+            bucket.take()
+        return True
+
+    def reject(self, name, scope):
+        if self.bot.metrics:
+            self.bot.metrics.rate_limited.inc(name, scope)
+
+    """ Method | Release
+
+    Gives back the concurrency slots a command took, which is safe to call more than once.
+    The next use turned away by a released limit is answered again, like a token bucket's after a use.
+    """
+    def release(self, ctx):
+        for key in getattr(ctx, 'rate_limit_slots', ()):
+            self.warned.discard(key)
+            count = self.running.get(key, 0) - 1
+            if count > 0:
+                self.running[key] = count
+            else:
+                self.running.pop(key, None)
+        ctx.rate_limit_slots = []
+
+    def prune(self, now):
+        self.last_prune = now
+        for key, bucket in list(self.buckets.items()):
+            bucket.update(now)
+            if bucket.tokens >= bucket.rate:
+                del self.buckets[key]
+
+    """ Coroutine | After Invoke
+
+    Registered as the bot's `after_invoke` hook. A group that goes on to a subcommand keeps its slots until the subcommand is done.
+    """
+    async def after_invoke(self, ctx):
+        if ctx.invoked_subcommand is None:
+            self.release(ctx)
+
+    """ Coroutine | On Command Error
+
+    Registered as a listener, releasing the slots of commands that failed before their handler ran.
+    """
+    async def on_command_error(self, ctx, error):
+        self.release(ctx)
@@ -0,0 +1,232 @@
+"""Resource | Logger
+
+This file hosts the bot's logging system, which replaces printing
+straight to the console. More details provided for each.
+
+Log calls made from the event loop only put the record on a queue, a
+background thread does the formatting and writing, so slow consoles and
+disks never block the bot. Every record is written twice:
+    - To the console, colored with the `bot.OK`, `bot.WARN` and `bot.ERR` tags.
+    - To a rotating local file, as one JSON object per line.
+
+Each cog gets its own logger, whose level can be changed while the bot is running.
+"""
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+
+""" Class | Timestamp Cache
+
+Formats timestamps for log output, reusing the formatted string for every
+record made within the same second instead of calling `strftime` each time.
+"""
+class TimestampCache:
+    def __init__(self, fmt):
+        self.fmt = fmt
+        self.second = None
+        self.text = None
+
+    def get(self, timestamp = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        second = int(timestamp)
+        if second != self.second:
+            # Assigned together, so a reader on another thread never sees a mismatched pair.
+            self.text, self.second = datetime.datetime.fromtimestamp(second).strftime(self.fmt), second
+        return self.text
+
+""" Class | Console Formatter
+
+Formats records the same way the bot always printed them:
+
+    [OK]   [01/31/2021 | 01:00:00 PM] Message:
+                                       Key: Value
+
+Structured fields passed with `extra = {"fields": {...}}` are shown as indented lines under the message.
+"""
+class ConsoleFormatter(logging.Formatter):
+    def __init__(self, tags, timestamps):
+        super().__init__()
+        self.tags = tags
+        self.timestamps = timestamps
+
+    def format(self, record):
+        tag = self.tags.get(record.levelno, record.levelname)
+        fields = getattr(record, 'fields', None)
+        lines = [f"{tag} {self.timestamps.get(record.created)} {record.getMessage()}{':' if fields else ''}"]
+        if fields:
+            lines.extend(f"{' ' * 35} {key}: {value}" for key, value in fields.items())
+        if record.exc_text:
+            lines.append(record.exc_text)
+        return "\n".join(lines)
+
+""" Class | JSON Formatter
+
+Formats records as a single line of JSON, for the log file.
+"""
+class JSONFormatter(logging.Formatter):
+    def __init__(self, names, timestamps):
+        super().__init__()
+        self.names = names
+        self.timestamps = timestamps
+
+    def format(self, record):
+        data = {
+            "time": self.timestamps.get(record.created),
+            "level": self.names.get(record.levelno, record.levelname),
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            data['fields'] = {key: str(value) for key, value in fields.items()}
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, ensure_ascii = False)
+
+""" Class | Queue Handler
+
+Puts records on the log queue. Unlike the standard library version, the structured fields are kept
+so each output can format them its own way, only the message arguments and traceback are resolved
+up front so the record no longer references anything on the event loop.
+"""
+class QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+""" Class | Log Util
+
+Sets up the logging system from the config, and gives out per-cog loggers.
+
+All loggers are children of the `bot` logger, e.g. `bot.Moderation`.
+"""
+class LogUtil:
+    levels = {
+        "DEBUG": logging.DEBUG,
+        "OK": logging.INFO,
+        "INFO": logging.INFO,
+        "WARN": logging.WARNING,
+        "WARNING": logging.WARNING,
+        "ERR": logging.ERROR,
+        "ERROR": logging.ERROR
+    }
+
+    def __init__(self, bot, suffix = None):
+        self.bot = bot
+        self.root = logging.getLogger("bot")
+        self.root.propagate = False
+
+        self.timestamps = TimestampCache('[%m/%d/%Y | %I:%M:%S %p]')
+
+        console = logging.StreamHandler()
+        console.setFormatter(ConsoleFormatter(
+            {logging.DEBUG: "[DEBUG]", logging.INFO: bot.OK, logging.WARNING: bot.WARN, logging.ERROR: bot.ERR},
+            self.timestamps
+        ))
+
+        # Processes can't share a rotating log file, so each cluster worker gets its own, e.g. `bot.worker0.log`.
+        path = bot.settings.log_file
+        if suffix:
+            root, ext = os.path.splitext(path)
+            path = f"{root}.{suffix}{ext}"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok = True)
+        file = logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes = bot.settings.log_max_bytes,
+            backupCount = bot.settings.log_backup_count,
+            encoding = "utf-8"
+        )
+        file.setFormatter(JSONFormatter(
+            {logging.DEBUG: "DEBUG", logging.INFO: "OK", logging.WARNING: "WARN", logging.ERROR: "ERR"},
+            TimestampCache('%Y-%m-%dT%H:%M:%S')
+        ))
+
+        # The queue is unbounded so logging can never block the event loop.
+        self.queue = queue.SimpleQueue()
+        self.handler = QueueHandler(self.queue)
+        self.root.handlers = [self.handler]
+        self.listener = logging.handlers.QueueListener(self.queue, console, file, respect_handler_level = True)
+        self.listener.start()
+        self.running = True
+
+        self.configure()
+
+    """ Method | Configure
+
+    Applies the log levels from the config, used again whenever the config is reloaded.
+    """
+    def configure(self):
+        self.root.setLevel(self.get_level(self.bot.settings.log_level))
+        for name, level in (self.bot.settings.log_cog_levels or {}).items():
+            self.set_level(name, level)
+
+    """ Method | Get Level
+
+    Converts a level name, including the bot's own `OK`/`WARN`/`ERR` names, into a logging level.
+    """
+    def get_level(self, name):
+        try:
+            return self.levels[str(name).upper()]
+        except KeyError:
+            raise ValueError(f"Unknown log level `{name}`, use one of: {', '.join(self.levels)}.")
+
+    """ Method | Get Logger
+
+    Gets the logger for a cog (or any other part of the bot) by name.
+    """
+    def get_logger(self, name):
+        return self.root.getChild(name)
+
+    """ Method | Set Level
+
+    Changes the level of a cog's logger at runtime. Pass None as the level to go back to the global level.
+    The logger is created if it doesn't exist yet, so the config can set levels before the cogs are loaded.
+    """
+    def set_level(self, name, level):
+        logger = self.get_logger(name)
+        logger.setLevel(logging.NOTSET if level is None else self.get_level(level))
+        return logger
+
+    """ Method | Find Logger
+
+    The name of an existing logger, matched ignoring case (e.g. "moderation" finds "Moderation").
+    Raises a `ValueError` if no logger has that name.
+    """
+    def find_logger(self, name):
+        for existing in self.get_levels():
+            if existing.lower() == name.lower():
+                return existing
+        raise ValueError(f"There is no logger named `{name}`, use one of: {', '.join(sorted(self.get_levels()))}.")
+
+    """ Method | Get Levels
+
+    Returns the effective level name of every logger created so far.
+    """
+    def get_levels(self):
+        names = {logging.DEBUG: "DEBUG", logging.INFO: "OK", logging.WARNING: "WARN", logging.ERROR: "ERR"}
+        loggers = [l for n, l in logging.Logger.manager.loggerDict.items() if n.startswith("bot.") and isinstance(l, logging.Logger)]
+        return {l.name[4:]: names.get(l.getEffectiveLevel(), str(l.getEffectiveLevel())) for l in loggers}
+
+    """ Method | Queue Depth
+
+    The number of records waiting to be written.
+    """
+    def queue_depth(self):
+        return self.queue.qsize()
+
+    """ Method | Stop
+
+    Writes out everything left on the queue and stops the background thread. Safe to call more than once.
+    """
+    def stop(self):
+        if self.running:
+            self.running = False
+            self.listener.stop()
@@ -0,0 +1,226 @@
+"""Resource | Memory
+
+This file hosts the memory tracker, which finds what is using memory and what keeps growing.
+More details provided for each.
+"""
+import asyncio
+import collections
+import datetime
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+""" Function | Get RSS
+
+The memory the process is using (its resident set size) in bytes. This is read from `/proc` on Linux,
+otherwise it is the highest it has been, or None where neither is available (e.g. Windows).
+"""
+def get_rss():
+    try:
+        with open("/proc/self/statm", 'r') as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, everything else kilobytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def format_size(size):
+    if abs(size) < 1024:
+        return f"{size} B"
+    for unit in ("KiB", "MiB", "GiB"):
+        size /= 1024
+        if abs(size) < 1024 or unit == "GiB":
+            return f"{size:.1f} {unit}"
+
+""" Class | Memory Tracker
+
+Tracks the bot's memory with `tracemalloc`, for the `memory` command and the background sampler.
+
+Tracing makes every allocation slower and uses memory of its own, so it is only on while the "Memory Tracker"
+config option is active, or after the `memory baseline` command turns it on until `memory stop`.
+
+A baseline is a snapshot of the traced memory and of how many objects of each type there are, which later
+snapshots are compared to, to see what grew since. Objects are counted with `gc.get_objects`, which only sees
+objects that can hold other objects (e.g. lists, dicts, class instances), which is where leaks build up.
+
+While active, the background sampler adds a line of JSON to `path` every `interval` seconds with the RSS,
+the traced memory, and the `top` lines that allocated the most since the last sample, so growth can be
+looked into after the fact. Snapshots are taken and compared on a separate thread, so the loop keeps running
+in between the steps, though the larger the heap the longer each step holds it.
+"""
+class MemoryTracker:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    filters = (
+        # The tracker's own allocations (e.g. counting types) would otherwise show up as growth.
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>")
+    )
+
+    def __init__(self, bot, frames = 1, interval = 600, path = None, top = 10):
+        self.bot = bot
+        self.frames = frames
+        self.interval = interval
+        self.path = path
+        self.top = top
+        self.log = bot.log_util.get_logger("Memory")
+
+        self.baseline = None
+        self.last = None
+        self.task = None
+
+    """ Method | Start
+
+    Turns tracing on and starts the background sampler.
+    """
+    def start(self):
+        self.start_tracing()
+        self.task = self.bot.loop.create_task(self.run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    def start_tracing(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    """ Method | Stop Tracing
+
+    Turns tracing off, freeing what it used, which also drops the baseline as it can't be compared to anymore.
+    The background sampler keeps recording the RSS.
+    """
+    def stop_tracing(self):
+        tracemalloc.stop()
+        self.baseline = None
+        self.last = None
+
+    def take_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(self.filters)
+
+    """ Method | Count Types
+
+    How many objects of each type the garbage collector knows of, by the type's name.
+    """
+    @staticmethod
+    def count_types():
+        counts = collections.Counter()
+        for obj in gc.get_objects():
+            cls = type(obj)
+            counts[cls.__qualname__ if cls.__module__ == "builtins" else f"{cls.__module__}.{cls.__qualname__}"] += 1
+        return counts
+
+    """ Method | Where
+
+    Where a statistic's memory was allocated, with the file relative to the bot for its own code,
+    or its folder and name for anything else (e.g. "discord/message.py").
+    """
+    def where(self, stat):
+        frame = stat.traceback[0]
+        filename = frame.filename
+        if filename.startswith(self.root):
+            filename = os.path.relpath(filename, self.root)
+        else:
+            filename = "/".join(filename.replace("\\", "/").split("/")[-2:])
+        return f"{filename}:{frame.lineno}"
+
+    """ Method | Growth
+
+    The `top` lines that allocated the most since `old`, as `(where, size change, count change)` tuples.
+    """
+    def growth(self, snapshot, old, top):
+        stats = [stat for stat in snapshot.compare_to(old, 'lineno') if stat.size_diff > 0]
+        stats.sort(key = lambda stat: stat.size_diff, reverse = True)
+        return [(self.where(stat), stat.size_diff, stat.count_diff) for stat in stats[:top]]
+
+    """ Method | Get Summary
+
+    What is using memory now, as a dict of the RSS, the traced memory (None when not tracing),
+    the `top` lines that allocated the most and the `top` types with the most objects.
+    """
+    def get_summary(self, top = 10):
+        summary = {"rss": get_rss(), "traced": None, "sites": [], "types": self.count_types().most_common(top)}
+        if tracemalloc.is_tracing():
+            summary['traced'] = tracemalloc.get_traced_memory()
+            stats = self.take_snapshot().statistics('lineno')[:top]
+            summary['sites'] = [(self.where(stat), stat.size, stat.count) for stat in stats]
+        return summary
+
+    """ Method | Set Baseline
+
+    Turns tracing on if it isn't, then takes the snapshot that `diff` compares to.
+    """
+    def set_baseline(self):
+        self.start_tracing()
+        self.baseline = {"time": time.time(), "snapshot": self.take_snapshot(), "types": self.count_types()}
+
+    """ Method | Diff
+
+    What grew since the baseline, as a dict of the seconds since the baseline, the `top` lines that
+    allocated the most, and the `top` types that gained the most objects.
+    Returns None when there is no baseline.
+    """
+    def diff(self, top = 10):
+        # Held on to, as tracing may be stopped while this runs.
+        baseline = self.baseline
+        if baseline is None or not tracemalloc.is_tracing():
+            return None
+        types = self.count_types()
+        types.subtract(baseline['types'])
+        return {
+            "seconds": time.time() - baseline['time'],
+            "sites": self.growth(self.take_snapshot(), baseline['snapshot'], top),
+            "types": [(name, count) for name, count in types.most_common(top) if count > 0]
+        }
+
+    """ Method | Sample
+
+    Takes a sample for the background sampler, returning it as a dict.
+    """
+    def sample(self):
+        record = {
+            "time": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "rss": get_rss(),
+            "traced": None,
+            "peak": None,
+            "growth": []
+        }
+        if tracemalloc.is_tracing():
+            record['traced'], record['peak'] = tracemalloc.get_traced_memory()
+            snapshot = self.take_snapshot()
+            if self.last is not None:
+                record['growth'] = [
+                    {"where": where, "size": size, "count": count}
+                    for where, size, count in self.growth(snapshot, self.last, self.top)
+                ]
+            self.last = snapshot
+        return record
+
+    def save_sample(self, record):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok = True)
+        with open(self.path, 'a', encoding = "utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+
+    """ Coroutine | Run
+
+    The background sampler, taking a sample every interval.
+    """
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                record = await self.bot.loop.run_in_executor(None, self.sample)
+                self.save_sample(record)
+            except Exception:
+                self.log.exception("Failed to take a memory sample.")
@@ -194,7 +194,7 @@ class MenuListSource(menus.ListPageSource):
         embed = self.embed_util.get_embed(
             title = self.title,
             desc = self.desc + "\n\n" + "\n".join(items),
-            fields = fields
+            fields = self.embed_util.split_fields(fields)
         )
         if self.get_max_pages() > 1:
             embed.title = embed.title + f" | [{menu.current_page + 1}/{self.get_max_pages()}]"
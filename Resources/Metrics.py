@@ -0,0 +1,329 @@
+"""Resource | Metrics
+
+This file hosts the bot's metrics, and the local HTTP endpoint that serves them in the
+Prometheus text format. More details provided for each.
+"""
+import asyncio
+import bisect
+import collections
+import time
+
+from aiohttp import web
+from discord.ext import commands
+
+def format_labels(names, values):
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+""" Class | Counter
+
+A count that only goes up, kept per combination of label values.
+"""
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, help, labels = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}
+
+    def inc(self, *labels, amount = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        for labels, value in self.values.items():
+            yield f"{self.name}_total{format_labels(self.labels, labels)} {value}"
+
+""" Class | Histogram
+
+Counts observations (e.g. durations in seconds) into buckets, kept per combination of label values.
+Each entry is `[bucket counts, sum, count]`, the bucket counts not being cumulative until rendered.
+"""
+class Histogram:
+    type = "histogram"
+    default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, name, help, labels = (), buckets = default_buckets):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.values = {}
+
+    def observe(self, value, *labels):
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self):
+        for labels, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket
+                yield f"{self.name}_bucket{format_labels(self.labels + ('le',), labels + (bound,))} {cumulative}"
+            yield f"{self.name}_sum{format_labels(self.labels, labels)} {total}"
+            yield f"{self.name}_count{format_labels(self.labels, labels)} {count}"
+
+""" Class | Gauge
+
+A value that can go up and down. Gauges are read from a callback when the metrics are scraped,
+so they cost nothing in between. The callback returns a dict of label values to values.
+"""
+class Gauge:
+    type = "gauge"
+
+    def __init__(self, name, help, callback, labels = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.callback = callback
+
+    def render(self):
+        for labels, value in self.callback().items():
+            yield f"{self.name}{format_labels(self.labels, labels)} {value}"
+
+""" Class | Latency Histogram
+
+A compact histogram of durations, for reading percentiles back out.
+
+Durations are counted in microseconds, in buckets that grow with the value like HDR histograms do:
+every power of two is split into 16 equal buckets, so a percentile is always within about 3% of the
+real value, whatever its size. Only buckets that have been used are kept, and there are at most a
+few hundred of them, so the memory used doesn't grow with the number of samples.
+"""
+class LatencyHistogram:
+    sub_bits = 4
+    sub_count = 1 << sub_bits
+    # Anything over about 19 hours is counted as 19 hours.
+    max_value = (1 << 36) - 1
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.failed = 0
+
+    @classmethod
+    def index(cls, value):
+        if value < 2 * cls.sub_count:
+            return value
+        shift = value.bit_length() - cls.sub_bits - 1
+        return cls.sub_count * shift + (value >> shift)
+
+    @classmethod
+    def bounds(cls, index):
+        if index < 2 * cls.sub_count:
+            return index, index
+        shift, top = divmod(index, cls.sub_count)
+        shift -= 1
+        top += cls.sub_count
+        return top << shift, ((top + 1) << shift) - 1
+
+    def record(self, seconds, failed = False):
+        value = min(max(int(seconds * 1000000), 0), self.max_value)
+        index = self.index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        if failed:
+            self.failed += 1
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.failed += other.failed
+
+    """ Method | Percentile
+
+    The duration in seconds that `percent` percent of the samples took at most, or None if there are no samples.
+    """
+    def percentile(self, percent):
+        if not self.count:
+            return None
+        target = max(self.count * percent / 100, 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                low, high = self.bounds(index)
+                return (low + high) / 2 / 1000000
+
+""" Class | Command Stats
+
+The latency histograms of a single command, one since startup and one for each of the last 60 minutes.
+"""
+class CommandStats:
+    def __init__(self):
+        self.total = LatencyHistogram()
+        # (minute, histogram) pairs, newest last.
+        self.minutes = collections.deque(maxlen = 60)
+
+    def record(self, seconds, failed = False):
+        self.total.record(seconds, failed)
+        minute = int(time.monotonic() // 60)
+        if not self.minutes or self.minutes[-1][0] != minute:
+            self.minutes.append((minute, LatencyHistogram()))
+        self.minutes[-1][1].record(seconds, failed)
+
+    """ Method | Last Hour
+
+    The samples of the last hour merged into one histogram.
+    """
+    def last_hour(self):
+        oldest = int(time.monotonic() // 60) - 59
+        histogram = LatencyHistogram()
+        for minute, entry in self.minutes:
+            if minute >= oldest:
+                histogram.merge(entry)
+        return histogram
+
+""" Class | Metrics
+
+Every metric the bot keeps, and the HTTP server that serves them.
+
+Counters and histograms are updated where things happen (e.g. `Bot.dispatch` counts events),
+which is a dict update each. Everything that can be read at any time (latency, queue depth) is a
+gauge, only read when scraped. The event loop lag is measured at scrape time too, as how long a
+callback waits to run.
+"""
+class Metrics:
+    def __init__(self, bot):
+        self.bot = bot
+        self.runner = None
+        self.loop_lag = 0.0
+
+        self.commands = Counter("bot_command_invocations", "Commands invoked, by command and outcome (ok, failed or rejected).", ("command", "outcome"))
+        self.command_latency = Histogram("bot_command_latency_seconds", "Time taken to run each command.", ("command",))
+        self.events = Counter("bot_events", "Events dispatched, by event name.", ("event",))
+        self.role_reactions = Counter("bot_role_reaction_operations", "Roles added and removed by role reactions.", ("operation", "outcome"))
+        self.data_saves = Histogram("bot_data_save_seconds", "Time taken to save the data.", buckets = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1))
+        self.data_size = 0
+        self.rate_limited = Counter("bot_rate_limited", "Commands turned away by a rate limit, by command and the limit's scope.", ("command", "scope"))
+        # The percentiles of each command's latency, for the `stats commands` command.
+        self.command_stats = {}
+        self.loop_stalls = Counter("bot_loop_stalls", "Times the loop watchdog caught the event loop blocked for longer than its threshold.")
+
+        self.metrics = [
+            self.commands,
+            self.command_latency,
+            self.events,
+            self.role_reactions,
+            self.rate_limited,
+            self.data_saves,
+            self.loop_stalls,
+            Gauge("bot_data_size_bytes", "Size of the data written by the last save.", lambda: {(): self.data_size}),
+            Gauge("bot_log_queue_depth", "Log records waiting to be written.", lambda: {(): bot.log_util.queue_depth()}),
+            Gauge("bot_gateway_latency_seconds", "Time between a heartbeat and its acknowledgement, by shard.", self.get_latencies, ("shard",)),
+            Gauge("bot_event_loop_lag_seconds", "Time a callback waited to run on the event loop, measured when scraped.", lambda: {(): self.loop_lag}),
+            Gauge("bot_guilds", "Guilds the bot is in.", lambda: {(): len(bot.guilds)})
+        ]
+
+    def get_latencies(self):
+        # A shard without a heartbeat yet has an infinite latency, which Prometheus can't use.
+        return {(shard_id,): latency for shard_id, latency in self.bot.latencies if latency != float('inf')}
+
+    """ Method | Render
+
+    All of the metrics in the Prometheus text format.
+    """
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    """ Coroutine | Measure Loop Lag
+
+    How long a callback scheduled now waits before the event loop runs it.
+    """
+    async def measure_loop_lag(self):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        start = time.perf_counter()
+        loop.call_soon(future.set_result, None)
+        await future
+        self.loop_lag = time.perf_counter() - start
+
+    async def handle(self, request):
+        await self.measure_loop_lag()
+        return web.Response(text = self.render(), content_type = "text/plain", charset = "utf-8", headers = {"X-Prometheus-Format": "0.0.4"})
+
+    """ Coroutine | Start
+
+    Starts the HTTP server, serving the metrics at `/metrics`.
+    """
+    async def start(self, host, port):
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle)
+        self.runner = web.AppRunner(app, access_log = None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, host, port).start()
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    """ Method | Start Timing
+
+    Notes when a command started, called from the global `command_permissions` check.
+    Checks run before the arguments are converted and before the `before_invoke` hook,
+    so the timing covers the permission check, the conversion and the command itself.
+    A group's subcommand runs the checks again, which keeps the group's start.
+    """
+    def start_timing(self, ctx):
+        if getattr(ctx, 'metrics_start', None) is None:
+            ctx.metrics_start = time.perf_counter()
+
+    """ Method | Record Command
+
+    Records a command's outcome and how long it took, once per invocation.
+    """
+    def record_command(self, ctx, outcome):
+        start = getattr(ctx, 'metrics_start', None)
+        if start is None or ctx.command is None:
+            return
+        ctx.metrics_start = None
+        name = ctx.command.qualified_name
+        self.commands.inc(name, outcome)
+        # Invocations turned away before running (e.g. no permission) aren't part of the command's latency.
+        if outcome == "rejected":
+            return
+        duration = time.perf_counter() - start
+        self.command_latency.observe(duration, name)
+        stats = self.command_stats.get(name)
+        if stats is None:
+            stats = self.command_stats[name] = CommandStats()
+        stats.record(duration, outcome == "failed")
+
+    """ Coroutine | Before Invoke
+
+    Registered as the bot's `before_invoke` hook, noting when a command started if no check did already.
+    """
+    async def before_invoke(self, ctx):
+        self.start_timing(ctx)
+
+    """ Coroutine | After Invoke
+
+    Registered as the bot's `after_invoke` hook, recording a command's outcome and how long it took.
+    A group that goes on to a subcommand is left to the subcommand, which records the whole invocation.
+    """
+    async def after_invoke(self, ctx):
+        if ctx.invoked_subcommand is not None:
+            return
+        self.record_command(ctx, "failed" if ctx.command_failed else "ok")
+
+    """ Coroutine | On Command Error
+
+    Registered as a listener, recording the commands that failed before their handler ran
+    (e.g. a bad argument), which the `after_invoke` hook never sees. Failed checks count as rejected.
+    """
+    async def on_command_error(self, ctx, error):
+        self.record_command(ctx, "rejected" if isinstance(error, commands.CheckFailure) else "failed")
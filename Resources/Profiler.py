@@ -0,0 +1,306 @@
+"""Resource | Profiler
+
+This file hosts the tools used to measure how long the bot takes to
+start up, and where it spends its time once running. More details provided for each.
+"""
+import asyncio
+import collections
+import contextlib
+import datetime
+import inspect
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+""" Class | Startup Profiler
+
+Records how long each step of starting the bot takes, from the first import in `main.py` until `on_ready` finishes.
+
+Steps are grouped (e.g. "Imports", "Setup", "Connection") and timed either with the `measure`
+context manager, or between two named marks. Measuring is cheap, so it always happens, but the
+report is only sent when the "Startup Profiler" config option is active.
+
+Each report is added to a local file as one line of JSON, along with the git commit the bot
+is running, and compared with the previous one so slowdowns between releases stand out.
+"""
+class StartupProfiler:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.marks = {}
+        self.reported = False
+
+    """ Context Manager | Measure
+
+    Times the code run inside it as a step in the given group.
+    """
+    @contextlib.contextmanager
+    def measure(self, group, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.setdefault(group, {})[name] = time.perf_counter() - start
+
+    """ Method | Mark
+
+    Records the first time a point in startup was reached, later calls with the same name are ignored.
+    """
+    def mark(self, name):
+        self.marks.setdefault(name, time.perf_counter())
+
+    """ Method | Between
+
+    Records the time between two marks as a step in the given group.
+    """
+    def between(self, group, name, start, end):
+        if start in self.marks and end in self.marks:
+            self.phases.setdefault(group, {})[name] = self.marks[end] - self.marks[start]
+
+    """ Method | Get Report
+
+    Collects everything recorded into a dict, with all times in milliseconds.
+    The load time of each extension is taken from the bot's extension loader.
+    """
+    def get_report(self, bot, version = None):
+        phases = {group: dict(steps) for group, steps in self.phases.items()}
+        phases['Extensions'] = {
+            name: timing['load']
+            for name, timing in bot.extension_loader.timings.items() if timing['load'] is not None
+        }
+
+        return {
+            "time": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "version": version,
+            "total": round((time.perf_counter() - self.start) * 1000, 1),
+            "phases": {
+                group: {name: round(seconds * 1000, 1) for name, seconds in steps.items()}
+                for group, steps in phases.items()
+            }
+        }
+
+    """ Method | Get Version
+
+    The git commit the bot is running, or None if it isn't running from a git checkout.
+    """
+    def get_version(self):
+        try:
+            return subprocess.run(["git", "rev-parse", "HEAD"], cwd = self.root, check = True, capture_output = True, text = True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    """ Method | Save Report
+
+    Adds a report to the end of the profiler's file, returning the report before it if there is one.
+    """
+    def save_report(self, path, report):
+        previous = None
+        if os.path.exists(path):
+            with open(path, 'r', encoding = "utf-8") as file:
+                lines = [line for line in file.read().splitlines() if line.strip()]
+            if lines:
+                try:
+                    previous = json.loads(lines[-1])
+                except ValueError:
+                    previous = None
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok = True)
+
+        with open(path, 'a', encoding = "utf-8") as file:
+            file.write(json.dumps(report) + "\n")
+        return previous
+
+    """ Method | Get Embed
+
+    Formats a report into an embed, with one field per group of steps.
+    """
+    def get_embed(self, bot, report, previous = None):
+        fields = []
+        for group, steps in report['phases'].items():
+            if steps:
+                width = max(len(name) for name in steps)
+                fields.append({
+                    "name": group,
+                    "value": "```\n" + "\n".join(f"{name:<{width}} {ms:>8.1f} ms" for name, ms in steps.items()) + "\n```",
+                    "inline": False
+                })
+
+        desc = f"Ready in `{report['total']:.1f} ms`."
+        if previous:
+            change = report['total'] - previous['total']
+            desc += f"\n`{change:+.1f} ms` compared to the last startup (`{(previous.get('version') or 'unknown')[:10]}`)."
+
+        return bot.embed_util.get_embed(
+            title = "Startup Profile",
+            desc = desc,
+            fields = bot.embed_util.split_fields(fields),
+            ts = True
+        )
+
+    """ Coroutine | Send Report
+
+    Saves the startup report to the profiler's file and sends it to the log channel, only the first time it is called.
+    Running git and the file I/O happen in an executor, so they don't block the event loop.
+    """
+    async def send_report(self, bot):
+        if self.reported:
+            return
+        self.reported = True
+
+        version = await bot.loop.run_in_executor(None, self.get_version)
+        report = self.get_report(bot, version)
+        previous = await bot.loop.run_in_executor(None, self.save_report, bot.settings.profiler_file, report)
+        await bot.log_channel.send(embed = self.get_embed(bot, report, previous))
+
+""" Class | Sampling Profiler
+
+Profiles the running event loop for a few seconds at a time, for the `profile` command.
+
+A separate thread wakes up every `interval` seconds and takes the stack of the loop's thread, adding the time
+since its last sample to that stack. Only the code objects are kept while sampling, so a sample costs a walk up
+the stack and a dict update, and nothing is done to the loop itself. A thread can only sample once the loop's
+thread lets go of the GIL, so samples come further apart while the loop is busy, which is why each sample counts
+for the time it stands for rather than once.
+
+Time where the loop is waiting for something to happen is counted as "(idle)", so everything else is the time
+spent running code.
+"""
+class SamplingProfiler:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def __init__(self, interval = 0.005):
+        self.interval = interval
+        self.running = False
+
+    """ Coroutine | Run
+
+    Samples the loop this is awaited on for `seconds` seconds, returning a `Profile` of the samples.
+    """
+    async def run(self, seconds):
+        if self.running:
+            raise RuntimeError("A profile is already running.")
+        self.running = True
+        profile = Profile(self.root)
+        stop = threading.Event()
+        thread = threading.Thread(target = self.sample, args = (threading.get_ident(), profile, stop), name = "SamplingProfiler", daemon = True)
+        thread.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stop.set()
+            # The thread is at most one sample from noticing, which is far less than a blocking call.
+            thread.join()
+            self.running = False
+        return profile
+
+    """ Method | Sample
+
+    The sampling thread, adding the stacks of the loop's thread to the profile until it is stopped.
+    """
+    def sample(self, loop_thread, profile, stop):
+        last = time.perf_counter()
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(loop_thread)
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            codes.reverse()
+            now = time.perf_counter()
+            profile.add(tuple(codes), now - last)
+            last = now
+
+""" Class | Profile
+
+The samples taken by the `SamplingProfiler`, as the time in seconds spent in each distinct stack
+(a tuple of code objects, outermost first), with ways to summarize them.
+"""
+class Profile:
+    def __init__(self, root):
+        self.root = root
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self.idle = 0.0
+
+    def add(self, stack, seconds):
+        self.stacks[stack] += seconds
+        self.samples += 1
+        self.duration += seconds
+        if self.is_idle(stack):
+            self.idle += seconds
+
+    def is_idle(self, stack):
+        # The loop waits for events in its selector's `select`, which is the innermost Python frame while waiting.
+        return bool(stack) and stack[-1].co_name == "select" and os.path.basename(stack[-1].co_filename) == "selectors.py"
+
+    """ Method | Name
+
+    A readable name for a code object, with the file relative to the bot for its own code.
+    """
+    def name(self, code):
+        if code.co_filename.startswith(self.root):
+            filename = os.path.relpath(code.co_filename, self.root)
+        else:
+            filename = os.path.basename(code.co_filename)
+        return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+    """ Method | Get Coroutine
+
+    The coroutine a stack is running for, which is the outermost coroutine in the bot's own code,
+    or the outermost coroutine at all for library tasks (e.g. the gateway). Stacks without a coroutine
+    are either the loop waiting (idle) or plain callbacks.
+    """
+    def get_coroutine(self, stack):
+        if self.is_idle(stack):
+            return "(idle)"
+        coroutines = [code for code in stack if code.co_flags & inspect.CO_COROUTINE]
+        if not coroutines:
+            return "(callbacks)"
+        for code in coroutines:
+            if code.co_filename.startswith(self.root):
+                return self.name(code)
+        return self.name(coroutines[0])
+
+    """ Method | Collapse
+
+    The profile in the collapsed stack format (one `outermost;...;innermost weight` line per stack, the weight
+    being microseconds), which flamegraph tools (e.g. flamegraph.pl, speedscope) read directly.
+    """
+    def collapse(self):
+        lines = []
+        for stack, seconds in self.stacks.most_common():
+            lines.append(";".join(self.name(code) for code in stack) + f" {round(seconds * 1000000)}")
+        return "\n".join(lines) + "\n"
+
+    """ Method | Top Functions
+
+    The `count` functions that ran for the longest while the loop wasn't idle, as `(name, self, total)` tuples in seconds:
+    `self` is the time the function itself was running, `total` also counts the functions it called.
+    """
+    def top_functions(self, count = 20):
+        own = collections.Counter()
+        total = collections.Counter()
+        for stack, seconds in self.stacks.items():
+            if not stack or self.is_idle(stack):
+                continue
+            own[stack[-1]] += seconds
+            for code in set(stack):
+                total[code] += seconds
+        ranked = sorted(total, key = lambda code: (own[code], total[code]), reverse = True)[:count]
+        return [(self.name(code), own[code], total[code]) for code in ranked]
+
+    """ Method | By Coroutine
+
+    The time spent on each coroutine (see `get_coroutine`) in seconds, longest first.
+    """
+    def by_coroutine(self):
+        coroutines = collections.Counter()
+        for stack, seconds in self.stacks.items():
+            coroutines[self.get_coroutine(stack)] += seconds
+        return coroutines.most_common()
@@ -0,0 +1,297 @@
+"""Resource | Scheduler
+
+This file hosts the classes used to run jobs at set times, either once or
+on a recurring cron-like schedule. More details provided for each.
+"""
+import asyncio
+import datetime
+import heapq
+import itertools
+
+""" Class | Cron Schedule
+
+Parses and evaluates a cron-like recurrence, made up of five space separated fields:
+
+    minute (0-59) | hour (0-23) | day of month (1-31) | month (1-12) | day of week (0-6, 0 is Sunday)
+
+Each field accepts `*`, single values, ranges (`1-5`), steps (`*/15`, `0-30/10`) and comma separated lists of those.
+As with cron, when both the day of month and day of week are restricted, a day matching either one is used.
+Times are evaluated in the local time of the machine the bot is running on.
+"""
+class CronSchedule:
+    ranges = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expr):
+        self.expr = expr
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError("A cron schedule needs exactly 5 fields: minute hour day month weekday.")
+
+        self.minutes, self.hours, self.days, self.months, self.weekdays = [
+            self.parse_field(f, low, high) for f, (low, high) in zip(fields, self.ranges)
+        ]
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    def parse_field(self, field, low, high):
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step = part.split('/', 1)
+                step = int(step)
+                if step < 1:
+                    raise ValueError(f"Invalid step in `{field}`.")
+
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(v) for v in part.split('-', 1))
+            else:
+                start = end = int(part)
+
+            if start < low or end > high or start > end:
+                raise ValueError(f"`{field}` is outside of the range {low}-{high}.")
+            values.update(range(start, end + 1, step))
+
+        return sorted(values)
+
+    def day_matches(self, day):
+        # Python counts weekdays from Monday, cron counts from Sunday.
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        if self.any_day:
+            return in_weekdays
+        if self.any_weekday:
+            return in_days
+        return in_days or in_weekdays
+
+    """ Method | Next After
+
+    Returns the first time matching the schedule that is strictly after the given aware datetime, in UTC.
+    """
+    def next_after(self, after):
+        start = after.astimezone().replace(tzinfo = None, second = 0, microsecond = 0) + datetime.timedelta(minutes = 1)
+        day = start.date()
+
+        # Five years is enough to find any valid date, including February 29th.
+        for _ in range(366 * 5):
+            if day.month in self.months and self.day_matches(day):
+                for hour in self.hours:
+                    if day == start.date() and hour < start.hour:
+                        continue
+                    for minute in self.minutes:
+                        if day == start.date() and hour == start.hour and minute < start.minute:
+                            continue
+                        local = datetime.datetime.combine(day, datetime.time(hour, minute))
+                        return local.astimezone().astimezone(datetime.timezone.utc)
+            day += datetime.timedelta(days = 1)
+
+        raise ValueError(f"The schedule `{self.expr}` never runs.")
+
+
+""" Class | Scheduler
+
+Runs scheduled jobs from a single background task.
+
+Jobs are kept in a heap ordered by their next run time, and the task sleeps until the earliest one is due
+(or until a job is added or removed), so any number of jobs only ever costs one timer.
+
+Each job is identified by a key and described by a schedule dict, which the scheduler keeps up to date
+so it can be persisted by the owner:
+    - type (str): Either `once` to run at a single time, or `cron` to recur.
+    - at (str): The ISO formatted time to run a `once` job.
+    - cron (str): The cron expression of a `cron` job.
+    - catch_up (str): What to do with runs that were missed while the bot was offline:
+        `skip` ignores them, `once` runs the job a single time, `all` runs every missed occurrence.
+    - next_run (Optional[str]): The ISO formatted time of the next run, or None once a `once` job is done.
+
+The callback is awaited with the key of the job every time it is due.
+"""
+class Scheduler:
+    catch_up_policies = ['skip', 'once', 'all']
+
+    def __init__(self, bot, callback, max_catch_up = 10):
+        self.bot = bot
+        self.callback = callback
+        self.max_catch_up = max_catch_up
+
+        self.jobs = {}
+        self.heap = []
+        self.counter = itertools.count()
+        self.wake = asyncio.Event()
+        self.task = None
+        self.log = bot.log_util.get_logger("Scheduler")
+
+    """ Method | Validate
+
+    Checks that a schedule dict is valid, raising a `ValueError` describing the problem if not.
+    Cron schedules that parse but never match a date (e.g. February 30th) are rejected too.
+    """
+    @classmethod
+    def validate(cls, schedule):
+        if schedule.get('catch_up') not in cls.catch_up_policies:
+            raise ValueError(f"The catch up policy must be one of: {', '.join(cls.catch_up_policies)}.")
+        if schedule['type'] == 'cron':
+            CronSchedule(schedule['cron']).next_after(datetime.datetime.now(datetime.timezone.utc))
+        elif schedule['type'] == 'once':
+            datetime.datetime.fromisoformat(schedule['at'])
+        else:
+            raise ValueError(f"Unknown schedule type `{schedule['type']}`.")
+
+    """ Method | Next Run
+
+    Calculates the next run of a schedule after the given time, or None if it will not run again.
+    """
+    def next_run(self, schedule, after):
+        if schedule['type'] == 'cron':
+            return CronSchedule(schedule['cron']).next_after(after)
+        at = datetime.datetime.fromisoformat(schedule['at'])
+        return at if at > after else None
+
+    """ Method | Add
+
+    Registers (or replaces) a job. If the schedule has no next run yet, it is calculated from now.
+    """
+    def add(self, key, schedule):
+        self.validate(schedule)
+        if not schedule.get('next_run'):
+            if schedule['type'] == 'once':
+                schedule['next_run'] = schedule['at']
+            else:
+                schedule['next_run'] = self.next_run(schedule, datetime.datetime.now(datetime.timezone.utc)).isoformat()
+
+        self.jobs[key] = schedule
+        self.push(key)
+
+    """ Method | Remove
+
+    Unregisters a job. Its stale heap entry is dropped lazily once it reaches the top.
+    """
+    def remove(self, key):
+        if self.jobs.pop(key, None) is not None:
+            self.wake.set()
+
+    """ Method | Clear
+
+    Unregisters every job, e.g. before adding them again from reloaded data.
+    """
+    def clear(self):
+        self.jobs = {}
+        self.heap = []
+        self.wake.set()
+
+    def push(self, key):
+        schedule = self.jobs[key]
+        if schedule['next_run']:
+            due = datetime.datetime.fromisoformat(schedule['next_run'])
+            heapq.heappush(self.heap, (due, next(self.counter), key, schedule['next_run']))
+            self.wake.set()
+
+    """ Method | Start
+
+    Starts the background task, which first catches up any runs missed while the bot was offline.
+    """
+    def start(self):
+        if not self.task:
+            self.task = self.bot.loop.create_task(self.run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    """ Coroutine | Run
+
+    The single scheduler task.
+    """
+    async def run(self):
+        await self.bot.wait_until_ready()
+        await self.catch_up()
+
+        while True:
+            self.wake.clear()
+            now = datetime.datetime.now(datetime.timezone.utc)
+
+            while self.heap:
+                due, _, key, stamp = self.heap[0]
+                schedule = self.jobs.get(key)
+                # Drop entries for jobs that were removed or rescheduled since they were pushed.
+                if schedule is None or schedule['next_run'] != stamp:
+                    heapq.heappop(self.heap)
+                    continue
+                if due > now:
+                    break
+
+                heapq.heappop(self.heap)
+                try:
+                    self.advance(key, now)
+                except ValueError:
+                    self.log.exception(f"Could not calculate the next run of scheduled job {key}, removing it.")
+                    self.jobs.pop(key, None)
+                task = self.bot.loop.create_task(self.callback(key))
+                task.add_done_callback(lambda t, key = key: self.report(t, key))
+
+            # Never sleep more than an hour, so changes to the system clock are picked up eventually.
+            timeout = 3600
+            if self.heap:
+                timeout = min(timeout, max((self.heap[0][0] - now).total_seconds(), 0))
+            try:
+                await asyncio.wait_for(self.wake.wait(), timeout = timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    """ Method | Report
+
+    Logs the exception of a finished job run, if it failed, so one failing job can't go unnoticed.
+    """
+    def report(self, task, key):
+        if not task.cancelled() and task.exception():
+            self.log.error(f"Scheduled job {key} failed.", exc_info = task.exception())
+
+    """ Method | Advance
+
+    Moves a job on to its next run after the given time and puts it back on the heap.
+    """
+    def advance(self, key, now):
+        schedule = self.jobs[key]
+        following = self.next_run(schedule, now)
+        schedule['next_run'] = following.isoformat() if following else None
+        self.push(key)
+
+    """ Coroutine | Catch Up
+
+    Handles every job whose next run passed while the bot was offline, according to its catch up policy.
+    A job that fails is logged and skipped, so it can't stop the others from catching up.
+    """
+    async def catch_up(self):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for key, schedule in list(self.jobs.items()):
+            if not schedule['next_run']:
+                continue
+            missed = datetime.datetime.fromisoformat(schedule['next_run'])
+            if missed > now:
+                continue
+
+            try:
+                runs = 0
+                if schedule['catch_up'] == 'once':
+                    runs = 1
+                elif schedule['catch_up'] == 'all':
+                    while missed and missed <= now and runs < self.max_catch_up:
+                        runs += 1
+                        missed = self.next_run(schedule, missed)
+
+                self.advance(key, now)
+            except ValueError:
+                self.log.exception(f"Could not calculate the next run of scheduled job {key}, removing it.")
+                self.jobs.pop(key, None)
+                continue
+
+            for _ in range(runs):
+                try:
+                    await self.callback(key)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    self.log.exception(f"Scheduled job {key} failed while catching up.")
@@ -0,0 +1,138 @@
+"""Resource | Shards
+
+This file hosts the per shard counters shown by `ping` and the stats
+commands. More details provided for each.
+"""
+import time
+
+""" Class | Shard Metrics
+
+Keeps track of each shard's gateway events and connections:
+    - events: Gateway events received since the bot started.
+    - rate: Events per second, over the last full `window` seconds.
+    - connects: How many times the shard has identified with Discord (the first connection included).
+    - resumes: How many times the shard has resumed a dropped connection.
+    - disconnects: How many times the shard's connection has dropped.
+
+Gateway payloads don't say which shard received them, so events are counted against the
+shard Discord sends them on: `(guild_id >> 22) % shard_count`, with events that aren't
+for a guild (e.g. DMs) always going to shard 0.
+
+Counting happens in `Bot.dispatch`, which sees every payload without a listener (and so
+without a task) per event.
+"""
+class ShardMetrics:
+    def __init__(self, bot, window = 60):
+        self.bot = bot
+        self.window = window
+        self.shards = {}
+
+        bot.add_listener(self.on_shard_connect)
+        bot.add_listener(self.on_shard_resumed)
+        bot.add_listener(self.on_shard_disconnect)
+
+    """ Method | Get
+
+    The counters for a shard, created the first time it is used.
+    """
+    def get(self, shard_id):
+        shard = self.shards.get(shard_id)
+        if shard is None:
+            shard = self.shards[shard_id] = {
+                "events": 0,
+                "rate": 0.0,
+                "window_start": time.monotonic(),
+                "window_events": 0,
+                "connects": 0,
+                "resumes": 0,
+                "disconnects": 0
+            }
+        return shard
+
+    """ Method | Shard For
+
+    The shard a guild's events are sent on.
+    """
+    def shard_for(self, guild_id):
+        if not guild_id or not self.bot.shard_count:
+            return 0
+        return (int(guild_id) >> 22) % self.bot.shard_count
+
+    """ Method | Record
+
+    Counts a gateway payload. Only dispatches (op 0) are counted, not heartbeats and the like.
+    """
+    def record(self, msg):
+        if msg.get('op') != 0:
+            return
+        data = msg.get('d')
+        guild_id = None
+        if isinstance(data, dict):
+            guild_id = data.get('guild_id')
+            # Guild create/update/delete payloads are the guild itself.
+            if guild_id is None and msg.get('t', '').startswith("GUILD_"):
+                guild_id = data.get('id')
+
+        shard = self.get(self.shard_for(guild_id))
+        shard['events'] += 1
+        shard['window_events'] += 1
+
+        now = time.monotonic()
+        elapsed = now - shard['window_start']
+        if elapsed >= self.window:
+            shard['rate'] = shard['window_events'] / elapsed
+            shard['window_start'] = now
+            shard['window_events'] = 0
+
+    async def on_shard_connect(self, shard_id):
+        self.get(shard_id)['connects'] += 1
+
+    async def on_shard_resumed(self, shard_id):
+        self.get(shard_id)['resumes'] += 1
+
+    async def on_shard_disconnect(self, shard_id):
+        self.get(shard_id)['disconnects'] += 1
+
+    """ Method | Get Report
+
+    Every shard this process runs with its latency and counters, sorted by shard ID.
+    Reconnects are every connection after the first, whether a new session or a resume.
+    """
+    def get_report(self):
+        report = []
+        for shard_id, latency in sorted(self.bot.latencies):
+            shard = self.get(shard_id)
+            report.append({
+                "id": shard_id,
+                "latency": latency,
+                "events": shard['events'],
+                "rate": shard['rate'],
+                "reconnects": max(shard['connects'] - 1, 0) + shard['resumes'],
+                "disconnects": shard['disconnects'],
+                "guilds": sum(1 for guild in self.bot.guilds if guild.shard_id == shard_id)
+            })
+        return report
+
+    """ Method | Format Latency
+
+    A latency in milliseconds, or "N/A" before the shard's first heartbeat (when it is infinite or NaN).
+    """
+    @staticmethod
+    def format_latency(latency):
+        if latency != latency or latency == float('inf'):
+            return "N/A"
+        return f"{latency * 1000:.0f} ms"
+
+    """ Method | Get Fields
+
+    The report as embed fields, one per shard.
+    """
+    def get_fields(self):
+        return [
+            {
+                "name": f"Shard {s['id']}",
+                "value": f"Latency: `{self.format_latency(s['latency'])}`\nGuilds: `{s['guilds']}`\nEvents: `{s['events']}` (`{s['rate']:.1f}/s`)\nReconnects: `{s['reconnects']}`",
+                "inline": True
+            }
+            for s in self.get_report()
+        ]
@@ -0,0 +1,183 @@
+"""Resource | Store
+
+This file hosts the places the bot's persistent data can be kept. More details provided for each.
+"""
+import json
+import logging
+import os
+import sqlite3
+
+""" Class | JSON Store
+
+Keeps all of the data in a single JSON file, rewritten on every save.
+
+This is the original storage, and is fine for a single bot process.
+"""
+class JSONStore:
+    def __init__(self, path):
+        self.path = path
+        # The size of the data as of the last save.
+        self.size = 0
+
+    """ Method | Load
+
+    Reads all of the data, creating the file if it doesn't exist or is empty.
+    """
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding = "utf-8") as file:
+                content = file.read()
+            if len(content) > 0:
+                return json.loads(content)
+        self.save({})
+        return {}
+
+    """ Method | Save
+
+    Writes all of the data, given as the JSON of each key. Every key counts as changed, as the whole file is rewritten.
+    """
+    def save(self, encoded, base = None):
+        content = json.dumps({key: json.loads(value) for key, value in encoded.items()}, indent = 2)
+        with open(self.path, 'w+', encoding = "utf-8") as save_file:
+            save_file.write(content)
+        self.size = len(content)
+        return list(encoded)
+
+    def load_keys(self, keys):
+        data = self.load()
+        return {key: data[key] for key in keys if key in data}
+
+    def close(self):
+        pass
+
+""" Class | SQLite Store
+
+Keeps each top level key of the data (e.g. "role_reactions", "mute") as its own row in an SQLite database,
+so several bot processes can share the data.
+
+The database is in WAL mode, so reads never wait on a write in another process. Saving only writes
+the keys whose content changed from the version the data was based on, in a single transaction, and
+returns them so other processes can be told to reload just those keys with `load_keys`.
+
+If another process changed one of those keys since then, the two versions are merged (see `merge`)
+inside the same transaction, so each process only overwrites the records it changed itself.
+
+When the database is first created, it is filled from the JSON data file if there is one.
+"""
+class SQLiteStore:
+    def __init__(self, path, import_from = None):
+        self.path = path
+        self.import_from = import_from
+        self.size = 0
+
+        # Saves are run on another thread (see `DataManager.run_store`), one at a time.
+        self.db = sqlite3.connect(path, timeout = 10, isolation_level = None, check_same_thread = False)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS data (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def load(self):
+        rows = self.db.execute("SELECT key, value FROM data").fetchall()
+        if not rows and self.import_from and os.path.exists(self.import_from):
+            data = JSONStore(self.import_from).load()
+            self.save({key: json.dumps(value) for key, value in data.items()})
+            logging.getLogger("bot.Data").info(f"Imported {len(data)} data keys from {self.import_from} into {self.path}.")
+            return data
+
+        return {key: json.loads(value) for key, value in rows}
+
+    """ Method | Save
+
+    Writes the keys of `encoded` (the JSON of each key) that differ from `base`, the JSON of each
+    key as it was when the data was last loaded or saved, and removes the keys that are gone.
+    """
+    def save(self, encoded, base = None):
+        base = base or {}
+        changed = [key for key, value in encoded.items() if base.get(key) != value]
+        removed = [key for key in base if key not in encoded]
+        self.size = sum(len(value) for value in encoded.values())
+        if not changed and not removed:
+            return []
+
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            for key in changed + removed:
+                row = self.db.execute("SELECT value FROM data WHERE key = ?", (key,)).fetchone()
+                current = row[0] if row else None
+                value = encoded.get(key)
+                if current != base.get(key):
+                    value = merge(decode(base.get(key)), decode(value), decode(current))
+                    value = None if value is MISSING else json.dumps(value)
+
+                if value is None:
+                    self.db.execute("DELETE FROM data WHERE key = ?", (key,))
+                else:
+                    self.db.execute("INSERT OR REPLACE INTO data (key, value) VALUES (?, ?)", (key, value))
+
+        return changed + removed
+
+    """ Method | Load Keys
+
+    Reads the current value of some keys, leaving out any that no longer exist.
+    """
+    def load_keys(self, keys):
+        data = {}
+        for key in keys:
+            row = self.db.execute("SELECT value FROM data WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                data[key] = json.loads(row[0])
+        return data
+
+    def close(self):
+        self.db.close()
+
+# Stands in for a key that doesn't exist, in `merge`.
+MISSING = object()
+
+def decode(value):
+    return MISSING if value is None else json.loads(value)
+
+""" Function | Merge
+
+Merges two versions of some data (`ours` and `theirs`) that were both changed from the same `base`.
+
+Dicts are merged key by key, so changes to different records are all kept. Lists are merged as
+collections of records, matched by `record_key`: records removed on either side are removed, records
+added on either side are added (once, if both sides added the same one), and a record changed on both
+sides is merged like a dict. When both sides changed the same value to something different, `ours` is kept.
+Keys that don't exist are passed as `MISSING`.
+"""
+def merge(base, ours, theirs):
+    if ours == base:
+        return theirs
+    if theirs == base or ours == theirs:
+        return ours
+
+    if all(isinstance(value, dict) for value in (base, ours, theirs)):
+        merged = {}
+        for key in list(theirs) + [key for key in ours if key not in theirs]:
+            value = merge(base.get(key, MISSING), ours.get(key, MISSING), theirs.get(key, MISSING))
+            if value is not MISSING:
+                merged[key] = value
+        return merged
+
+    if all(isinstance(value, list) for value in (base, ours, theirs)):
+        base, ours, theirs = ({record_key(item): item for item in value} for value in (base, ours, theirs))
+        return list(merge(base, ours, theirs).values())
+
+    return ours
+
+# The keys that identify a record in a list, e.g. a mute or role reaction's "id", or a role reaction role's "role".
+RECORD_KEYS = ("id", "message_id", "role")
+
+""" Function | Record Key
+
+What a record in a list is matched by when merging: its identifying key (and its guild, if it has one),
+or its whole content if it doesn't have one.
+"""
+def record_key(item):
+    if isinstance(item, dict):
+        for key in RECORD_KEYS:
+            if key in item:
+                return json.dumps([key, item[key], item.get('guild')])
+    return json.dumps(item, sort_keys = True)
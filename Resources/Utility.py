@@ -3,12 +3,37 @@
 This file hosts classes/functions which are used regularly throughout
 the program. More details provided for each.
 """
+import hashlib
+import json
 import re
 
 import discord
 from discord.ext import menus
 import datetime
 
+class EmbedLimits:
+    """Class | Embed Limits
+
+    The size limits Discord places on embedded messages, all in characters
+    except for `fields`, which is the maximum number of fields.
+    """
+    title = 256
+    description = 4096
+    fields = 25
+    field_name = 256
+    field_value = 1024
+    footer = 2048
+    author = 256
+    total = 6000
+
+class EmbedTooLarge(discord.DiscordException):
+    """Exception | Embed Too Large
+
+    Raised when an embedded message would break one of Discord's size
+    limits, before any request is made.
+    """
+    pass
+
 class EmbedUtil:
     def __init__(self, bot):
         self.embed_color = bot.embed_color
@@ -17,6 +42,31 @@ class EmbedUtil:
         self.timestamp = bot.embed_ts
         self.show_author = bot.show_command_author
 
+        # Prebuilt shapes for embeds that are sent over and over, see `from_template`.
+        self.templates = {
+            "mod_action": EmbedTemplate(
+                self,
+                title = "New Moderation Action",
+                fields = [
+                    {"name": "Action Type", "value": "`{action}`", "inline": False},
+                    {"name": "Moderator", "value": "`{moderator}`", "inline": True},
+                    {"name": "Target", "value": "`{target}`", "inline": True}
+                ],
+                ts = True
+            ),
+            "role_reaction_log": EmbedTemplate(
+                self,
+                title = "Role Reaction {action}",
+                desc = "`{user}` has {verb} a role reaction in {channel}.",
+                ts = True
+            ),
+            "error_report": EmbedTemplate(
+                self,
+                title = "{title}",
+                desc = "{desc}"
+            )
+        }
+
     def get_embed(self, title=None, desc=None, fields=None, ts=False,
                   author=None, thumbnail=None, image=None, footer=None,
                   footer_image=None, url=None, color=None):
@@ -25,17 +75,26 @@ class EmbedUtil:
         This function reads the default embed settings from the bot
         attributes, then creates an embedded message to the specifications
         of the input.
+
+        The size of the embed is counted as it is built, and an
+        `EmbedTooLarge` error is raised as soon as any of Discord's
+        limits would be broken. Use `get_embeds` for content that may
+        need to be split across several embeds.
         """
         embed = discord.Embed(
             color=self.embed_color if not color else color
         )
+        size = 0
         if title:
+            size = self.count(size, "title", title, EmbedLimits.title)
             embed.title = title
         if desc:
+            size = self.count(size, "description", desc, EmbedLimits.description)
             embed.description = desc
         if url:
             embed.url = url
         if not footer == False:
+            size = self.count(size, "footer", self.footer if not footer else footer, EmbedLimits.footer)
             embed.set_footer(
                 text=self.footer if not footer else footer,
                 icon_url=self.footer_image if not footer_image else footer_image
@@ -43,6 +102,7 @@ class EmbedUtil:
         if ts:
             embed.timestamp = self.timestamp()
         if author:
+            size = self.count(size, "author name", author['name'] if type(author) == dict else author.name, EmbedLimits.author)
             if type(author) == dict:
                 if 'icon_url' in author and author['icon_url']:
                     embed.set_author(
@@ -60,7 +120,11 @@ class EmbedUtil:
                 )
 
         if fields:
+            if len(fields) > EmbedLimits.fields:
+                raise EmbedTooLarge(f"The embed has {len(fields)} fields, the limit is {EmbedLimits.fields}.")
             for field in fields:
+                size = self.count(size, "field name", field['name'], EmbedLimits.field_name)
+                size = self.count(size, "field value", field['value'], EmbedLimits.field_value)
                 embed.add_field(
                     name=field['name'],
                     value=field['value'],
@@ -76,6 +140,113 @@ class EmbedUtil:
             )
         return embed
 
+    def get_embeds(self, title=None, desc=None, fields=None, ts=False,
+                   author=None, **kwargs):
+        """Function | Create Split Embedded Messages
+
+        Works like `get_embed`, but splits content that does not fit in
+        a single embed across continuation embeds instead of failing.
+
+        Overlong descriptions are split on line breaks, overlong field
+        values are split into continuation fields, and fields are spread
+        over as many embeds as needed to stay within the field count and
+        total size limits. The author is only shown on the first embed.
+
+        Returns a list of embeds, in the order they should be sent.
+        """
+        cont_title = f"{title[:EmbedLimits.title - 8]} (cont.)" if title else None
+        footer = kwargs.get('footer')
+        base_size = len(str(footer if footer else self.footer)) if not footer == False else 0
+
+        pages = []
+        for i, chunk in enumerate(self.split_text(desc, EmbedLimits.description) if desc else [None]):
+            pages.append({"title": title if i == 0 else cont_title, "desc": chunk, "fields": []})
+
+        page = pages[-1]
+        size = base_size + len(page['title'] or '') + len(page['desc'] or '')
+        if len(pages) == 1 and author:
+            size += len(str(author['name'] if type(author) == dict else author.name))
+
+        for field in self.split_fields(fields or []):
+            field_size = len(str(field['name'])) + len(str(field['value']))
+            if len(page['fields']) >= EmbedLimits.fields or size + field_size > EmbedLimits.total:
+                page = {"title": cont_title, "desc": None, "fields": []}
+                pages.append(page)
+                size = base_size + len(cont_title or '')
+            page['fields'].append(field)
+            size += field_size
+
+        return [
+            self.get_embed(
+                title = p['title'],
+                desc = p['desc'],
+                fields = p['fields'],
+                ts = ts,
+                author = author if i == 0 else None,
+                **kwargs
+            )
+            for i, p in enumerate(pages)
+        ]
+
+    def split_fields(self, fields):
+        """Function | Split Embed Fields
+
+        Splits any field whose value is too long into continuation
+        fields with the same name and layout.
+        """
+        result = []
+        for field in fields:
+            value = str(field['value'])
+            if len(value) <= EmbedLimits.field_value:
+                result.append(field)
+                continue
+            for i, chunk in enumerate(self.split_text(value, EmbedLimits.field_value)):
+                result.append({
+                    "name": field['name'] if i == 0 else f"{str(field['name'])[:EmbedLimits.field_name - 8]} (cont.)",
+                    "value": chunk,
+                    "inline": field.get('inline', True)
+                })
+        return result
+
+    def split_text(self, text, limit):
+        """Function | Split Text
+
+        Splits text into chunks no longer than `limit`, breaking on line
+        breaks where possible and mid-line only for overlong lines.
+        """
+        chunks = []
+        lines = []
+        length = -1
+        for line in str(text).split("\n"):
+            while len(line) > limit:
+                if lines:
+                    chunks.append("\n".join(lines))
+                    lines, length = [], -1
+                chunks.append(line[:limit])
+                line = line[limit:]
+            if length + 1 + len(line) > limit:
+                chunks.append("\n".join(lines))
+                lines, length = [], -1
+            lines.append(line)
+            length += 1 + len(line)
+        if lines:
+            chunks.append("\n".join(lines))
+        return chunks
+
+    def count(self, size, part, text, limit):
+        """Function | Count Embed Size
+
+        Adds the length of part of an embed to the running size of the
+        embed, raising `EmbedTooLarge` if either limit is broken.
+        """
+        length = len(str(text))
+        if length > limit:
+            raise EmbedTooLarge(f"The embed {part} is {length} characters long, the limit is {limit}.")
+        size += length
+        if size > EmbedLimits.total:
+            raise EmbedTooLarge(f"The embed is over the {EmbedLimits.total} character limit.")
+        return size
+
     def update_embed(self, embed, title = None, desc = None, fields = None, ts = False,
                     author = None, thumbnail = None, image = None, footer = None,
                     footer_image = None):
@@ -83,7 +254,29 @@ class EmbedUtil:
 
         This function takes in an embedded message and modifies it
         based on inputs.
+
+        The size of the result is counted from the new and kept parts
+        before anything is changed, so an `EmbedTooLarge` error leaves
+        the embed as it was.
         """
+        size = self.count(0, "title", title if title else embed.title or "", EmbedLimits.title)
+        size = self.count(size, "description", desc if desc else embed.description or "", EmbedLimits.description)
+        size = self.count(size, "footer", footer if footer else embed.footer.text or "", EmbedLimits.footer)
+        if author:
+            size = self.count(size, "author name", author['name'] if type(author) == dict else author.name, EmbedLimits.author)
+        else:
+            size = self.count(size, "author name", embed.author.name or "", EmbedLimits.author)
+        if fields:
+            if len(fields) > EmbedLimits.fields:
+                raise EmbedTooLarge(f"The embed has {len(fields)} fields, the limit is {EmbedLimits.fields}.")
+            for field in fields:
+                size = self.count(size, "field name", field['name'], EmbedLimits.field_name)
+                size = self.count(size, "field value", field['value'], EmbedLimits.field_value)
+        else:
+            for field in embed.fields:
+                size = self.count(size, "field name", field.name, EmbedLimits.field_name)
+                size = self.count(size, "field value", field.value, EmbedLimits.field_value)
+
         if title:
             embed.title = title
         if desc:
@@ -128,6 +321,137 @@ class EmbedUtil:
         )
         return embed
 
+    def get_hash(self, embed):
+        """Function | Hash Embedded Message
+
+        Returns a hash of the rendered content of an embedded message,
+        ignoring the timestamp, which can be compared to tell whether
+        two embeds would look the same once sent.
+        """
+        data = embed.to_dict()
+        data.pop('timestamp', None)
+        return hashlib.sha1(json.dumps(data, sort_keys = True).encode('utf-8')).hexdigest()
+
+    def from_template(self, name, **slots):
+        """Function | Create Embed From Template
+
+        Creates an embedded message from one of the named templates
+        in `self.templates`, filling its slots with the keyword arguments.
+        """
+        return self.templates[name].render(**slots)
+
+    def get_author(self, author):
+        """Function | Format Embed Author
+
+        Converts either a dict or a discord user into the raw author
+        data used by an embedded message.
+        """
+        if isinstance(author, dict):
+            if author.get('icon_url'):
+                return {"name": str(author['name']), "icon_url": str(author['icon_url'])}
+            return {"name": str(author['name'])}
+        return {"name": str(author.name), "icon_url": str(author.avatar_url)}
+
+class EmbedTemplate:
+    """Class | Embed Template
+
+    A prebuilt embed shape, where the title, description and fields
+    can contain `{slot}` placeholders which are filled in when rendered.
+
+    Everything that does not change between renders (color, footer,
+    field layout, which strings need formatting and the size of the
+    static text) is worked out once when the template is created, so
+    rendering only fills in the slots, counts them, and sets them on a new embed.
+    """
+    def __init__(self, embed_util, title = None, desc = None, fields = None, ts = False):
+        if len(fields or []) > EmbedLimits.fields:
+            raise EmbedTooLarge(f"The template has {len(fields)} fields, the limit is {EmbedLimits.fields}.")
+        self.embed_util = embed_util
+        self.colour = embed_util.embed_color
+        self.footer = {"text": str(embed_util.footer), "icon_url": str(embed_util.footer_image)}
+        # Static text is counted as it is compiled, so renders only count what their slots add.
+        self.base_size = embed_util.count(0, "footer", self.footer['text'], EmbedLimits.footer)
+        self.title = self.compile("title", title, EmbedLimits.title)
+        self.desc = self.compile("description", desc, EmbedLimits.description)
+        self.fields = [
+            (
+                self.compile("field name", f['name'], EmbedLimits.field_name),
+                self.compile("field value", f['value'], EmbedLimits.field_value),
+                f.get('inline', True)
+            )
+            for f in fields or []
+        ]
+        self.ts = ts
+
+    def compile(self, part, text, limit):
+        # Static text is counted once here and kept as it is. Text with slots is kept as a
+        # (text, part, limit) tuple, so only it is formatted and counted when rendering.
+        if text is None:
+            return None
+        if '{' in text:
+            return (text, part, limit)
+        self.base_size = self.embed_util.count(self.base_size, part, text, limit)
+        return text if text else discord.Embed.Empty
+
+    def fill(self, compiled, slots):
+        text, part, limit = compiled
+        text = text.format_map(slots)
+        if len(text) > limit:
+            raise EmbedTooLarge(f"The embed {part} is {len(text)} characters long, the limit is {limit}.")
+        return text if text else discord.Embed.Empty
+
+    def render(self, author = None, ts = None, **slots):
+        """Function | Render Template
+
+        Creates a new embed from the template. `author` and `ts` work the
+        same as in `EmbedUtil.get_embed`, with `ts` defaulting to the
+        template's own setting.
+
+        Each filled slot is counted as it is added, and `EmbedTooLarge`
+        is raised if any of Discord's limits would be broken.
+        """
+        size = self.base_size
+        title = self.title
+        if type(title) is tuple:
+            title = self.fill(title, slots)
+            size += len(title or "")
+        desc = self.desc
+        if type(desc) is tuple:
+            desc = self.fill(desc, slots)
+            size += len(desc or "")
+        fields = []
+        for name, value, inline in self.fields:
+            if type(name) is tuple:
+                name = self.fill(name, slots)
+                size += len(name or "")
+            if type(value) is tuple:
+                value = self.fill(value, slots)
+                size += len(value or "")
+            fields.append({"name": name, "value": value, "inline": inline})
+        if author:
+            author = self.embed_util.get_author(author)
+            size = self.embed_util.count(size, "author name", author['name'], EmbedLimits.author)
+        if size > EmbedLimits.total:
+            raise EmbedTooLarge(f"The embed is over the {EmbedLimits.total} character limit.")
+
+        # The embed is filled in directly, the same way `Embed.from_dict` does it, without
+        # going through a dict first. Each embed gets its own footer and fields, so editing
+        # one never changes another.
+        embed = discord.Embed.__new__(discord.Embed)
+        embed.type = "rich"
+        embed.url = discord.Embed.Empty
+        embed.title = title or discord.Embed.Empty
+        embed.description = desc or discord.Embed.Empty
+        embed._colour = self.colour
+        embed._footer = dict(self.footer)
+        if fields:
+            embed._fields = fields
+        if author:
+            embed._author = author
+        if self.ts if ts is None else ts:
+            embed.timestamp = self.embed_util.timestamp()
+        return embed
+
 class Confirmation(menus.Menu):
     def __init__(self, title = None, msg = None, url = None):
         super().__init__(timeout = 30.0, delete_message_after = True)
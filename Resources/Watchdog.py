@@ -0,0 +1,141 @@
+"""Resource | Watchdog
+
+This file hosts the event loop watchdog, which finds code that blocks the
+event loop. More details provided for each.
+"""
+import asyncio
+import collections
+import os
+import sys
+import threading
+import time
+import traceback
+
+""" Class | Loop Watchdog
+
+Measures the event loop's lag all the time, and catches whatever is blocking it.
+
+A task on the loop wakes up every `interval` seconds, noting the time and how late it woke up (the lag).
+A separate thread checks that time, and if the loop hasn't woken the task for more than `threshold`
+seconds, something is running without awaiting. The thread then takes the stack of the loop's thread,
+which is the stack of the blocking code, and adds it to a ring buffer of the last `history` stalls.
+Once the loop wakes the task again, the stall's duration is filled in.
+
+Each stall is a dict containing:
+    - time (float): When the stall was caught, as a UNIX timestamp.
+    - duration (Optional[float]): How long the loop was blocked in seconds, or None while it still is.
+    - where (str): The innermost line of the bot's own code in the stack, which is what gets blamed.
+    - stack (traceback.StackSummary): The full stack of the loop's thread.
+"""
+class LoopWatchdog:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def __init__(self, bot, threshold = 0.25, interval = 0.1, history = 50):
+        self.bot = bot
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls = collections.deque(maxlen = history)
+        # A minute of lag samples.
+        self.lags = collections.deque(maxlen = max(int(60 / interval), 1))
+
+        self.beat = time.monotonic()
+        self.current = None
+        self.loop_thread = None
+        self.task = None
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        self.running = True
+        self.task = self.bot.loop.create_task(self.run())
+
+    def stop(self):
+        self.running = False
+        if self.task:
+            self.task.cancel()
+
+    """ Coroutine | Run
+
+    The task on the loop, which wakes up every interval. The watching thread is started from here,
+    once the loop (and so the thread it runs on) is known.
+    """
+    async def run(self):
+        self.loop_thread = threading.get_ident()
+        self.beat = time.monotonic()
+        self.thread = threading.Thread(target = self.watch, name = "LoopWatchdog", daemon = True)
+        self.thread.start()
+
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = now - start - self.interval
+            self.beat = now
+            self.lags.append(lag)
+
+            stall = self.current
+            if stall is not None:
+                self.current = None
+                stall['duration'] = lag
+                if self.bot.metrics:
+                    self.bot.metrics.loop_stalls.inc()
+
+    """ Method | Watch
+
+    The watching thread, which catches the loop's stack when it stops waking up.
+    """
+    def watch(self):
+        while self.running:
+            time.sleep(self.interval / 2)
+            beat = self.beat
+            if self.current is not None or time.monotonic() - beat <= self.threshold:
+                continue
+
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            del frame
+            # The loop may have woken up while the stack was being taken, in which case it isn't the blocker.
+            if self.beat != beat:
+                continue
+
+            self.current = {"time": time.time(), "duration": None, "where": self.locate(stack), "stack": stack}
+            self.stalls.append(self.current)
+
+    """ Method | Locate
+
+    The innermost line of the bot's own code in a stack, or the innermost line if there isn't one.
+    """
+    def locate(self, stack):
+        for frame in reversed(stack):
+            if frame.filename.startswith(self.root) and frame.filename != __file__:
+                return f"{os.path.relpath(frame.filename, self.root)}:{frame.lineno} in {frame.name}"
+        frame = stack[-1]
+        return f"{frame.filename}:{frame.lineno} in {frame.name}"
+
+    """ Method | Get Lag
+
+    The average and highest lag over the last minute, in seconds.
+    """
+    def get_lag(self):
+        if not self.lags:
+            return 0.0, 0.0
+        return sum(self.lags) / len(self.lags), max(self.lags)
+
+    """ Method | Get Blockers
+
+    The recorded stalls grouped by where they happened, most total time blocked first.
+    Each blocker is a dict of its location, stall count, total and longest duration, and the longest stall itself.
+    """
+    def get_blockers(self):
+        blockers = {}
+        for stall in list(self.stalls):
+            duration = stall['duration'] or 0.0
+            blocker = blockers.setdefault(stall['where'], {"where": stall['where'], "count": 0, "total": 0.0, "max": 0.0, "stall": stall})
+            blocker['count'] += 1
+            blocker['total'] += duration
+            if duration >= blocker['max']:
+                blocker['max'] = duration
+                blocker['stall'] = stall
+        return sorted(blockers.values(), key = lambda b: b['total'], reverse = True)
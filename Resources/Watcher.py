@@ -0,0 +1,199 @@
+"""Resource | Watcher
+
+This file hosts the tools used to reload the config and permissions
+as soon as their files change. More details provided for each.
+"""
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+
+""" Class | Inotify
+
+A minimal wrapper around the Linux inotify API, used to be told when files in a directory change
+instead of having to check them. Only available on Linux, `Inotify.available()` says whether it can be used.
+"""
+class Inotify:
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    header = struct.Struct("iIII")
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno = True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    @staticmethod
+    def available():
+        return sys.platform.startswith("linux")
+
+    def watch(self, directory):
+        # Watching the directory catches editors that save by replacing the file, as well as writing to it.
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE | self.IN_MODIFY
+        if self.libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    """ Method | Read
+
+    Returns the names of every file changed since the last read, without blocking.
+    """
+    def read(self):
+        names = set()
+        while True:
+            try:
+                data = os.read(self.fd, 4096)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = self.header.unpack_from(data, offset)
+                offset += self.header.size
+                names.add(os.fsdecode(data[offset:offset + length].rstrip(b"\0")))
+                offset += length
+
+    def close(self):
+        os.close(self.fd)
+
+""" Class | Config Watcher
+
+Watches `Config.yml`, `Permissions.json` and `RateLimits.json`, and reloads them when they change.
+
+Changes are picked up with inotify on Linux, and by checking each file's modification time
+every `poll_interval` seconds everywhere else. A burst of changes (editors often write a file
+more than once when saving) only causes one reload.
+
+Each file is parsed and checked in a separate thread, then put onto the bot in one go. A file with
+a mistake in it is rejected (and reported to the log channel) without changing anything.
+After the new settings are put onto the bot, `on_reload` is called to rebuild what is made from them.
+If that fails, the previous settings are put back and `on_reload` is called again, so the bot is
+never left running half of a reload. Otherwise the `config_reload` event is dispatched with the
+name of the file, so cogs can rebuild anything they made from it with a listener:
+
+    @commands.Cog.listener()
+    async def on_config_reload(self, name):
+"""
+class ConfigWatcher:
+    def __init__(self, bot, on_reload, poll_interval = 5, delay = 0.5):
+        self.bot = bot
+        self.on_reload = on_reload
+        self.poll_interval = poll_interval
+        self.delay = delay
+        self.log = bot.log_util.get_logger("Watcher")
+
+        # The parser and applier of each file, and what to apply to put the current settings back.
+        self.files = {
+            os.path.abspath("./Config.yml"): (bot.data_manager.parse_config, bot.data_manager.apply_config, lambda: (bot.config, bot.settings)),
+            os.path.abspath("./Permissions.json"): (bot.data_manager.parse_permissions, bot.data_manager.apply_permissions, lambda: (bot.permissions, bot.permission_roles)),
+            os.path.abspath("./RateLimits.json"): (bot.data_manager.parse_rate_limits, bot.data_manager.apply_rate_limits, lambda: (bot.rate_limits,))
+        }
+        self.stats = {path: self.stat(path) for path in self.files}
+        self.pending = {}
+        self.inotify = None
+        self.task = None
+
+    def stat(self, path):
+        try:
+            result = os.stat(path)
+            return result.st_mtime_ns, result.st_size
+        except OSError:
+            return None
+
+    """ Method | Start
+
+    Starts watching, using inotify if possible, or polling if not.
+    """
+    def start(self):
+        if Inotify.available():
+            try:
+                self.inotify = Inotify()
+                for directory in {os.path.dirname(path) for path in self.files}:
+                    self.inotify.watch(directory)
+                self.bot.loop.add_reader(self.inotify.fd, self.on_inotify)
+                self.log.debug("Watching config files with inotify.")
+                return
+            except (OSError, AttributeError, NotImplementedError) as e:
+                self.log.warning(f"Could not use inotify, checking config files every {self.poll_interval}s instead: {e}")
+                if self.inotify:
+                    self.inotify.close()
+                self.inotify = None
+
+        self.task = self.bot.loop.create_task(self.poll())
+
+    def stop(self):
+        if self.inotify:
+            self.bot.loop.remove_reader(self.inotify.fd)
+            self.inotify.close()
+            self.inotify = None
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        for handle in self.pending.values():
+            handle.cancel()
+        self.pending = {}
+
+    def on_inotify(self):
+        for name in self.inotify.read():
+            for path in self.files:
+                if os.path.basename(path) == name:
+                    self.changed(path)
+
+    async def poll(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            for path in self.files:
+                if self.stat(path) != self.stats[path]:
+                    self.changed(path)
+
+    """ Method | Changed
+
+    Schedules a reload of a changed file, pushing back any reload already waiting for it.
+    """
+    def changed(self, path):
+        if path in self.pending:
+            self.pending[path].cancel()
+        self.pending[path] = self.bot.loop.call_later(self.delay, lambda: self.bot.loop.create_task(self.reload(path)))
+
+    """ Coroutine | Reload
+
+    Parses a file in another thread, then applies it if it is valid, putting the previous
+    settings back if anything made from them can't be rebuilt.
+    """
+    async def reload(self, path):
+        self.pending.pop(path, None)
+        stat = self.stat(path)
+        if stat is None or stat == self.stats[path]:
+            return
+        self.stats[path] = stat
+
+        name = os.path.basename(path)
+        parse, apply, current = self.files[path]
+        try:
+            parsed = await self.bot.loop.run_in_executor(None, parse, path)
+        except ValueError as e:
+            self.log.error(f"Rejected changes to {name}, keeping the current settings", extra = {"fields": {"Error": e}})
+            await self.report("Config Reload Rejected", f"The changes to `{name}` were not applied.\n`{e}`")
+            return
+
+        previous = current()
+        try:
+            apply(*parsed)
+            self.on_reload()
+        except Exception as e:
+            self.log.exception(f"Could not apply the changes to {name}, putting the previous settings back.")
+            apply(*previous)
+            self.on_reload()
+            await self.report("Config Reload Rejected", f"The changes to `{name}` could not be applied, so the previous settings were put back.\n`{e}`")
+            return
+        self.bot.dispatch("config_reload", name)
+        self.log.info(f"Reloaded {name}.")
+        await self.report("Config Reloaded", f"The changes to `{name}` are now active.")
+
+    async def report(self, title, desc):
+        channel = self.bot.get_channel(self.bot.log_channel_id)
+        if channel:
+            await channel.send(embed = self.bot.embed_util.get_embed(title = title, desc = desc, ts = True))
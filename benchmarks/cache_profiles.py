@@ -0,0 +1,133 @@
+"""Benchmark | Cache Profiles
+
+Measures how much memory each cache profile uses for a synthetic guild, by feeding gateway payloads
+through discord.py's own `ConnectionState` parsers, built with the profile's intents and member cache flags:
+    - startup: the guild arrives in GUILD_CREATE (which for a large guild only includes the bot), then, for
+      the profiles that chunk guilds, its members arrive in GUILD_MEMBERS_CHUNK payloads of 1000, with
+      presences when the profile receives them.
+    - activity: 1% of the guild joins (GUILD_MEMBER_ADD), 5% of the members have their roles changed
+      (GUILD_MEMBER_UPDATE), and, when the profile receives presences, 10% change status (PRESENCE_UPDATE).
+
+So whatever each profile ends up caching is decided by discord.py, the same way it would be when connected.
+
+Each profile is run in a fresh Python process, so memory freed by one can't hide the cost of another.
+The RSS is read from `/proc/self/statm` on Linux, and from the peak RSS everywhere else.
+
+Run from the repository root:
+    python -m benchmarks.cache_profiles [members]
+"""
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+
+import discord
+from discord.state import ChunkRequest
+
+from Resources.Cache import CacheProfile
+
+def get_rss():
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        # Reported in kilobytes on Linux and bytes on macOS, this is only a fallback.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def member_data(i):
+    return {
+        "user": {"id": str(10 ** 17 + i), "username": f"user{i}", "discriminator": f"{i % 10000:04}", "avatar": None},
+        "roles": ["2"] if i % 3 else [],
+        "joined_at": "2021-01-01T00:00:00+00:00",
+        "nick": None,
+        "deaf": False,
+        "mute": False
+    }
+
+def presence_data(i):
+    return {
+        "user": {"id": str(10 ** 17 + i)},
+        "status": "online" if i % 4 else "offline",
+        "client_status": {"desktop": "online"},
+        "activities": [{"name": "Some Game", "type": 0}] if i % 2 else []
+    }
+
+def build(profile_name, count):
+    profile = CacheProfile(profile_name)
+    intents = profile.get_intents()
+    client = discord.Client(
+        intents = intents,
+        member_cache_flags = profile.get_member_cache_flags(intents),
+        chunk_guilds_at_startup = profile.chunk_guilds
+    )
+    state = client._connection
+    # Nothing is listening, so events are dropped instead of being scheduled on a loop.
+    state.dispatch = lambda *args, **kwargs: None
+    state.user = discord.ClientUser(state = state, data = member_data(0)['user'])
+    presences = "presences" in profile.provides
+
+    gc.collect()
+    before = get_rss()
+    start = time.perf_counter()
+
+    role = {"id": "2", "name": "Member", "permissions": "0", "position": 1, "color": 0, "hoist": False, "managed": False, "mentionable": False}
+    everyone = dict(role, id = "1", name = "@everyone", position = 0)
+    guild = state._add_guild_from_data({
+        "id": "1", "name": "Synthetic Guild", "member_count": count, "large": True, "roles": [everyone, role], "channels": [],
+        "members": [member_data(0)]
+    })
+
+    if profile.chunk_guilds:
+        # Registered the same way `ConnectionState.chunk_guild` does, without sending the request.
+        request = ChunkRequest(guild.id, state.loop, state._get_guild, cache = state.member_cache_flags.joined)
+        state._chunk_requests[guild.id] = request
+        chunks = (count + 999) // 1000
+        for index in range(chunks):
+            ids = range(index * 1000, min(index * 1000 + 1000, count))
+            payload = {"guild_id": "1", "members": [member_data(i) for i in ids], "chunk_index": index, "chunk_count": chunks, "nonce": request.nonce}
+            if presences:
+                payload['presences'] = [presence_data(i) for i in ids]
+            state.parse_guild_members_chunk(payload)
+    after_startup = len(guild.members)
+
+    for i in range(count, count + count // 100):
+        state.parse_guild_member_add(dict(member_data(i), guild_id = "1"))
+    for i in range(0, count, 20):
+        state.parse_guild_member_update(dict(member_data(i), guild_id = "1", roles = ["2"]))
+    if presences:
+        for i in range(0, count, 10):
+            update = presence_data(i)
+            update['user'] = member_data(i)['user']
+            state.parse_presence_update(dict(update, guild_id = "1", status = "idle"))
+
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    return {
+        "profile": profile_name,
+        "startup_members": after_startup,
+        "cached_members": len(guild.members),
+        "rss_mb": round((get_rss() - before) / 2 ** 20, 1),
+        "seconds": round(elapsed, 2)
+    }
+
+def main(count = 100000):
+    results = []
+    for profile in CacheProfile.profiles:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.cache_profiles", str(count), profile],
+            check = True, capture_output = True, text = True
+        ).stdout
+        results.append(json.loads(output))
+
+    for r in results:
+        print(f"{r['profile']:>8}: {r['rss_mb']:>7.1f} MB RSS | {r['startup_members']:>7} members cached at startup, {r['cached_members']:>7} after activity | {r['seconds']:.2f}s")
+    return results
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print(json.dumps(build(sys.argv[2], int(sys.argv[1]))))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,53 @@
+"""Benchmark | Config Loading
+
+Compares the ways `Config.yml` can be loaded at startup:
+    - yaml.Loader: The pure Python loader the bot used to use.
+    - CSafeLoader: The C loader, when PyYAML was built with libyaml.
+    - cached: The compiled config read back from the config cache.
+
+Run from the repository root:
+    python -m benchmarks.config_load [count]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+from Resources.Config import BotConfig
+from Resources.Data import DataManager
+
+def bench(count, func):
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return time.perf_counter() - start
+
+def load_with(loader):
+    def load():
+        with open("./Config.yml", 'rb') as file:
+            BotConfig.from_dict(yaml.load(file.read(), Loader = loader))
+    return load
+
+def main(count = 200):
+    results = {"yaml.Loader": bench(count, load_with(yaml.Loader))}
+    if hasattr(yaml, 'CSafeLoader'):
+        results["CSafeLoader"] = bench(count, load_with(yaml.CSafeLoader))
+    else:
+        print("PyYAML was built without libyaml, skipping CSafeLoader.")
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_manager = DataManager(cache_file = os.path.join(directory, "config_cache.json"))
+        # The first parse writes the cache, every one after it reads from it.
+        cold = data_manager.parse_config()[1]
+        assert data_manager.parse_config()[1] == cold
+        results["cached"] = bench(count, data_manager.parse_config)
+
+    for name, seconds in results.items():
+        print(f"{name:>12}: {seconds:.3f}s total | {seconds / count * 1000:.3f} ms per load")
+    print(f"{'speedup':>12}: {results['yaml.Loader'] / results['cached']:.1f}x (cached vs yaml.Loader)")
+    return results
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,79 @@
+"""Benchmark | Embed Templates
+
+Compares building the moderation log embed with `EmbedUtil.get_embed`
+against rendering the prebuilt `mod_action` template.
+
+Run from the repository root:
+    python -m benchmarks.embed_templates [count]
+"""
+import datetime
+import sys
+import time
+import types
+
+import discord
+
+from Resources.Utility import EmbedUtil
+
+def make_embed_util():
+    # Only the config values read by EmbedUtil are needed, so no connection is made.
+    bot = types.SimpleNamespace(
+        embed_color = discord.Color.from_rgb(0, 51, 102),
+        footer = "UArizona Esports Bot",
+        footer_image = "https://example.com/icon.png",
+        embed_ts = lambda: datetime.datetime.now(datetime.timezone.utc),
+        show_command_author = False
+    )
+    return EmbedUtil(bot)
+
+def bench_builder(embed_util, count):
+    start = time.perf_counter()
+    for i in range(count):
+        embed_util.get_embed(
+            title = "New Moderation Action",
+            fields = [
+                {"name": "Action Type", "value": "`Mute`", "inline": False},
+                {"name": "Moderator", "value": f"`Moderator#{i % 10000:04}`", "inline": True},
+                {"name": "Target", "value": f"`Target#{i % 10000:04}`", "inline": True}
+            ],
+            ts = True
+        )
+    return time.perf_counter() - start
+
+def bench_template(embed_util, count):
+    start = time.perf_counter()
+    for i in range(count):
+        embed_util.from_template(
+            "mod_action",
+            action = "Mute",
+            moderator = f"Moderator#{i % 10000:04}",
+            target = f"Target#{i % 10000:04}"
+        )
+    return time.perf_counter() - start
+
+def main(count = 100000):
+    embed_util = make_embed_util()
+
+    # Both paths must produce the same embed for the comparison to be fair.
+    built = embed_util.get_embed(
+        title = "New Moderation Action",
+        fields = [
+            {"name": "Action Type", "value": "`Mute`", "inline": False},
+            {"name": "Moderator", "value": "`a`", "inline": True},
+            {"name": "Target", "value": "`b`", "inline": True}
+        ]
+    )
+    rendered = embed_util.from_template("mod_action", action = "Mute", moderator = "a", target = "b", ts = False)
+    assert built.to_dict() == rendered.to_dict()
+
+    results = {
+        "get_embed": bench_builder(embed_util, count),
+        "template": bench_template(embed_util, count)
+    }
+    for name, seconds in results.items():
+        print(f"{name:>10}: {seconds:.3f}s total | {seconds / count * 1e6:.2f} us per embed")
+    print(f"{'speedup':>10}: {results['get_embed'] / results['template']:.2f}x")
+    return results
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,361 @@
+"""Benchmark | Fake Discord
+
+A local stand in for Discord's gateway and REST API, for running the bot with no network.
+
+`FakeDiscord` serves both on 127.0.0.1 with aiohttp: discord.py is pointed at it by changing
+`discord.http.Route.BASE`, and the gateway URL it hands out leads back to it. Each shard that
+connects is sent HELLO, READY and a GUILD_CREATE for every guild of the synthetic `World` on that
+shard, and heartbeats are acknowledged. REST calls answer with what discord.py expects to parse
+(e.g. a message for a message send), and are counted by route.
+
+Events are sent to the bot with `send`, optionally with the REST call the bot is expected to make
+in response. The time between the two is recorded as the event's latency, see `Expectations`.
+"""
+import asyncio
+import collections
+import datetime
+import itertools
+import json
+import re
+import socket
+import time
+
+import discord
+from aiohttp import web
+
+BOT_ID = 800000000000000001
+
+def snowflake_now(counter = itertools.count()):
+    """A unique snowflake for the current time, so `created_at` works on what the fake makes."""
+    base = discord.utils.time_snowflake(datetime.datetime.utcnow())
+    return base + next(counter) % (1 << 22)
+
+def json_response(data, status = 200):
+    """A JSON response, with the bare content type discord.py checks for (aiohttp's adds a charset)."""
+    return web.Response(body = json.dumps(data).encode(), status = status, headers = {"Content-Type": "application/json"})
+
+def timestamp():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+def user_data(user_id, name, bot = False):
+    return {"id": str(user_id), "username": name, "discriminator": f"{user_id % 10000:04}", "avatar": None, "bot": bot}
+
+def member_data(user_id, name, roles):
+    return {
+        "user": user_data(user_id, name),
+        "roles": [str(r) for r in roles],
+        "joined_at": "2021-01-01T00:00:00+00:00",
+        "nick": None,
+        "deaf": False,
+        "mute": False
+    }
+
+def message_data(message_id, channel_id, author, content = "", embeds = (), guild_id = None, member = None):
+    data = {
+        "id": str(message_id),
+        "channel_id": str(channel_id),
+        "author": author,
+        "content": content,
+        "timestamp": timestamp(),
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": list(embeds),
+        "pinned": False,
+        "type": 0,
+        "flags": 0
+    }
+    if guild_id is not None:
+        data['guild_id'] = str(guild_id)
+    if member is not None:
+        data['member'] = member
+    return data
+
+""" Class | World
+
+The synthetic guilds the bot sees: each has the roles from Permissions.json, a few extra roles for
+role reactions, `channels` text channels and `members` members. Guild IDs are picked so that guild `i`
+is on shard `i % shard_count`, the same way Discord routes guilds.
+
+The first channel of the first guild is the bot's log channel.
+"""
+class World:
+    reaction_emojis = ("\N{RED APPLE}", "\N{GREEN APPLE}", "\N{TANGERINE}")
+
+    def __init__(self, guilds = 1, members = 1000, channels = 5, permission_roles = None, admins = 5):
+        self.permission_roles = dict(permission_roles or {})
+        self.guilds = []
+        for g in range(guilds):
+            guild_id = ((g + 1) << 22) + 1000
+            base = (g + 1) * 10 ** 9
+            guild = {
+                "id": guild_id,
+                "channels": [base + 100 + c for c in range(channels)],
+                "reaction_roles": [base + 200 + r for r in range(len(self.reaction_emojis))],
+                "reaction_message": base + 300,
+                "members": [base + 10000 + m for m in range(members)],
+                "admins": admins
+            }
+            self.guilds.append(guild)
+        self.log_channel = self.guilds[0]['channels'][0]
+        self.next_user = itertools.count(9 * 10 ** 15)
+
+    def shard_for(self, guild_id, shard_count):
+        return (guild_id >> 22) % shard_count
+
+    def member_roles(self, guild, user_id):
+        roles = [self.permission_roles.get("Member")]
+        if user_id - guild['members'][0] < guild['admins']:
+            roles.append(self.permission_roles.get("Admin"))
+        return [r for r in roles if r]
+
+    def member(self, guild, user_id):
+        return member_data(user_id, f"user{user_id % 100000}", self.member_roles(guild, user_id))
+
+    def new_member(self, guild):
+        user_id = next(self.next_user)
+        return member_data(user_id, f"raider{user_id % 100000}", [])
+
+    def guild_create(self, guild):
+        role = lambda role_id, name, position: {
+            "id": str(role_id), "name": name, "permissions": "0", "position": position,
+            "color": 0, "hoist": False, "managed": False, "mentionable": False
+        }
+        roles = [role(guild['id'], "@everyone", 0)]
+        roles += [role(role_id, name, i + 1) for i, (name, role_id) in enumerate(self.permission_roles.items())]
+        roles += [role(role_id, f"Reaction {i}", 10 + i) for i, role_id in enumerate(guild['reaction_roles'])]
+        channels = [{
+            "id": str(channel_id), "type": 0, "name": f"channel-{i}", "position": i,
+            "permission_overwrites": [], "topic": None, "nsfw": False, "parent_id": None
+        } for i, channel_id in enumerate(guild['channels'])]
+        members = [self.member(guild, user_id) for user_id in guild['members']]
+        members.append(member_data(BOT_ID, "Harness Bot", []))
+        members[-1]['user']['bot'] = True
+        return {
+            "id": str(guild['id']),
+            "name": f"Guild {guild['id'] >> 22}",
+            "owner_id": str(guild['members'][0]),
+            "region": "us-west",
+            "afk_channel_id": None,
+            "afk_timeout": 300,
+            "verification_level": 0,
+            "default_message_notifications": 0,
+            "explicit_content_filter": 0,
+            "mfa_level": 0,
+            "features": [],
+            "emojis": [],
+            "roles": roles,
+            "channels": channels,
+            "members": members,
+            "member_count": len(members),
+            "presences": [],
+            "voice_states": [],
+            "large": len(members) > 250,
+            "unavailable": False,
+            "joined_at": "2021-01-01T00:00:00+00:00"
+        }
+
+    """ Method | Role Reaction Data
+
+    The bot's `role_reactions` data for a role reaction menu in every guild, giving each emoji its reaction role.
+    """
+    def role_reaction_data(self):
+        return [{
+            "title": "Harness Roles",
+            "description": "Pick a fruit.",
+            "roles": [{"emoji": emoji, "role": role_id} for emoji, role_id in zip(self.reaction_emojis, guild['reaction_roles'])],
+            "guild": guild['id'],
+            "channel": guild['channels'][1 % len(guild['channels'])],
+            "id": guild['reaction_message']
+        } for guild in self.guilds]
+
+""" Class | Expectations
+
+The REST calls the bot is expected to make, each with the time the event causing it was sent.
+Calls are matched to expectations first in, first out, by method and exact path.
+"""
+class Expectations:
+    def __init__(self):
+        self.pending = collections.defaultdict(collections.deque)
+        self.waiting = 0
+        self.latencies = []
+
+    def expect(self, method, path, sent):
+        self.pending[(method, path)].append(sent)
+        self.waiting += 1
+
+    def match(self, method, path, now):
+        queue = self.pending.get((method, path))
+        if queue:
+            self.latencies.append(now - queue.popleft())
+            self.waiting -= 1
+
+    def reset(self):
+        self.pending.clear()
+        self.waiting = 0
+        self.latencies = []
+
+""" Class | Fake Discord
+
+The gateway and REST server. `start` returns once it is listening, `install` points discord.py at it.
+"""
+class FakeDiscord:
+    route_ids = re.compile(r"/\d{5,}")
+    route_emoji = re.compile(r"/reactions/[^/]+")
+
+    def __init__(self, world, shard_count = 1, host = "127.0.0.1"):
+        self.world = world
+        self.shard_count = shard_count
+        self.host = host
+        self.port = None
+        self.runner = None
+        self.shards = {}
+        self.sequence = collections.defaultdict(int)
+        self.calls = collections.Counter()
+        self.expectations = Expectations()
+        self.last_call = time.perf_counter()
+        self.ready = asyncio.Event()
+
+    async def start(self):
+        app = web.Application(client_max_size = 32 * 2 ** 20)
+        app.router.add_get("/gateway/ws", self.gateway)
+        app.router.add_route("*", "/api/v7/{path:.*}", self.rest)
+        self.runner = web.AppRunner(app, access_log = None)
+        await self.runner.setup()
+        # Bound here rather than by aiohttp, to get the free port the system picked.
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind((self.host, 0))
+        self.port = sock.getsockname()[1]
+        await web.SockSite(self.runner, sock).start()
+
+    def install(self):
+        discord.http.Route.BASE = f"http://{self.host}:{self.port}/api/v7"
+
+    async def stop(self):
+        for ws in list(self.shards.values()):
+            await ws.close()
+        if self.runner:
+            await self.runner.cleanup()
+
+    """ Coroutine | Send
+
+    Sends a gateway event to the shard of its guild, expecting the REST call `expect` (a method and path) in response.
+    """
+    async def send(self, event, data, guild_id, expect = None):
+        shard_id = self.world.shard_for(guild_id, self.shard_count)
+        if expect:
+            self.expectations.expect(*expect, time.perf_counter())
+        await self.dispatch(shard_id, event, data)
+
+    async def dispatch(self, shard_id, event, data):
+        ws = self.shards[shard_id]
+        self.sequence[shard_id] += 1
+        await ws.send_str(json.dumps({"op": 0, "t": event, "s": self.sequence[shard_id], "d": data}))
+
+    async def gateway(self, request):
+        ws = web.WebSocketResponse(max_msg_size = 0)
+        await ws.prepare(request)
+        await ws.send_str(json.dumps({"op": 10, "d": {"heartbeat_interval": 41250}}))
+        shard_id = None
+        async for msg in ws:
+            payload = json.loads(msg.data)
+            op = payload['op']
+            if op == 1:
+                await ws.send_str(json.dumps({"op": 11, "d": None}))
+            elif op == 2:
+                shard_id = payload['d'].get('shard', [0, 1])[0]
+                self.shards[shard_id] = ws
+                await self.identify(shard_id)
+            elif op == 8:
+                await self.send_chunk(shard_id, payload['d'])
+        if shard_id is not None and self.shards.get(shard_id) is ws:
+            del self.shards[shard_id]
+        return ws
+
+    async def identify(self, shard_id):
+        guilds = [g for g in self.world.guilds if self.world.shard_for(g['id'], self.shard_count) == shard_id]
+        await self.dispatch(shard_id, "READY", {
+            "v": 6,
+            "user": user_data(BOT_ID, "Harness Bot", bot = True),
+            "guilds": [{"id": str(g['id']), "unavailable": True} for g in guilds],
+            "session_id": f"harness-{shard_id}",
+            "shard": [shard_id, self.shard_count],
+            "private_channels": [],
+            "relationships": [],
+            "application": {"id": str(BOT_ID), "flags": 0}
+        })
+        for guild in guilds:
+            await self.dispatch(shard_id, "GUILD_CREATE", self.world.guild_create(guild))
+        if len(self.shards) == self.shard_count:
+            self.ready.set()
+
+    async def send_chunk(self, shard_id, data):
+        guild = next(g for g in self.world.guilds if g['id'] == int(data['guild_id']))
+        await self.dispatch(shard_id, "GUILD_MEMBERS_CHUNK", {
+            "guild_id": str(guild['id']),
+            "members": [self.world.member(guild, user_id) for user_id in guild['members']],
+            "chunk_index": 0,
+            "chunk_count": 1,
+            "nonce": data.get('nonce')
+        })
+
+    """ Coroutine | REST
+
+    Answers every REST call. Calls are counted by route, with IDs and emojis replaced (e.g. "PUT /guilds/{id}/members/{id}/roles/{id}").
+    """
+    async def rest(self, request):
+        now = time.perf_counter()
+        self.last_call = now
+        path = "/" + request.match_info['path']
+        method = request.method
+        route = self.route_emoji.sub("/reactions/{emoji}", self.route_ids.sub("/{id}", path))
+        self.calls[f"{method} {route}"] += 1
+        self.expectations.match(method, path, now)
+
+        body = {}
+        if request.can_read_body:
+            if request.content_type == "application/json":
+                body = await request.json()
+            elif request.content_type.startswith("multipart/"):
+                async for part in await request.multipart():
+                    if part.name == "payload_json":
+                        body = json.loads(await part.text())
+                    else:
+                        await part.read()
+
+        parts = path.strip("/").split("/")
+        if route == "/gateway" or route == "/gateway/bot":
+            return json_response({
+                "url": f"ws://{self.host}:{self.port}/gateway/ws",
+                "shards": self.shard_count,
+                "session_start_limit": {"total": 1000, "remaining": 1000, "reset_after": 0, "max_concurrency": 1}
+            })
+        if route == "/users/@me":
+            return json_response(user_data(BOT_ID, "Harness Bot", bot = True))
+        if route == "/channels/{id}/messages" and method == "POST":
+            return json_response(message_data(
+                snowflake_now(), parts[1], user_data(BOT_ID, "Harness Bot", bot = True),
+                content = body.get('content') or "", embeds = [body['embed']] if body.get('embed') else body.get('embeds', [])
+            ))
+        if route == "/channels/{id}/messages/{id}" and method == "PATCH":
+            return json_response(message_data(
+                parts[3], parts[1], user_data(BOT_ID, "Harness Bot", bot = True),
+                content = body.get('content') or "", embeds = [body['embed']] if body.get('embed') else []
+            ))
+        if route == "/channels/{id}" and method == "GET":
+            for guild in self.world.guilds:
+                if int(parts[1]) in guild['channels']:
+                    return json_response({
+                        "id": parts[1], "type": 0, "name": "fetched", "position": 0, "guild_id": str(guild['id']),
+                        "permission_overwrites": [], "nsfw": False, "parent_id": None
+                    })
+        if route == "/guilds/{id}/members/{id}" and method == "GET":
+            for guild in self.world.guilds:
+                if guild['id'] == int(parts[1]) and int(parts[3]) in guild['members']:
+                    return json_response(self.world.member(guild, int(parts[3])))
+        if method in ("PUT", "DELETE", "POST", "PATCH"):
+            return web.Response(status = 204)
+        return json_response({"message": "Unknown", "code": 0}, status = 404)
@@ -0,0 +1,307 @@
+"""Benchmark | Harness
+
+Runs the real bot (`main.py` and its cogs) against a fake Discord (see `fake_discord.py`),
+and replays streams of events at it to measure how it holds up, with no network needed.
+
+The bot is set up in a temporary folder with a copy of `Config.yml` changed to point at the
+synthetic world (log channel, shard count, no file watching or metrics endpoint), the real
+`Permissions.json` and `RateLimits.json`, and data with a role reaction menu in every guild.
+The Moderation cog is loaded on top of the cogs `main.py` loads, for the member join logs.
+
+Scenarios:
+    - reaction_storm: Members react to the role reaction menus, each expecting a role to be added.
+    - join_raid: Members join the first guild, each expecting a join log message.
+    - command_burst: Members use a mix of commands in every channel, each expecting a reply.
+    - script: Replays events from a JSON lines file given with `--script`, each line being
+      {"event": "MESSAGE_CREATE", "data": {...}, "guild": 123, "expect": ["POST", "/channels/1/messages"], "delay": 0.01}
+      with "expect" and "delay" optional.
+
+For each scenario, the events sent, how long it took until the bot stopped making REST calls,
+the latency from each event to the REST call it expects (p50, p95, p99 and max), the events that
+never got their call, the REST calls made by route, and the worst event loop lag are reported.
+
+Run from the repository root:
+    python -m benchmarks.harness [scenario ...] [--count 1000] [--guilds 1] [--members 2000]
+        [--shards 1] [--rate 0] [--no-rate-limits] [--script events.jsonl] [--out results.json]
+
+The exit code is 1 if the bot never became ready, so this can be run as a CI check.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import discord
+import yaml
+
+from benchmarks.fake_discord import FakeDiscord, World, message_data, snowflake_now
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOKEN = "harness-token"
+
+""" Function | Prepare
+
+Fills `directory` with the files the bot reads at startup, set up for the world.
+"""
+def prepare(directory, world, shard_count, rate_limits = True):
+    with open(os.path.join(ROOT, "Config.yml"), 'r', encoding = "utf-8") as file:
+        config = yaml.safe_load(file)
+    config['Token Env Var'] = "HARNESS_BOT_TOKEN"
+    config['Log Channel'] = world.log_channel
+    config['DEBUG'] = False
+    config['Lazy Cogs'] = False
+    config['Sharding']['Shard Count'] = shard_count
+    config['Cluster']['Workers'] = 1
+    config['Data Store'] = "json"
+    config['File Watching']['Active'] = False
+    config['Metrics']['Active'] = False
+    config['Startup Profiler']['Active'] = False
+    config['Logging']['Level'] = "WARN"
+    with open(os.path.join(directory, "Config.yml"), 'w', encoding = "utf-8") as file:
+        yaml.safe_dump(config, file)
+
+    shutil.copy(os.path.join(ROOT, "Permissions.json"), directory)
+    if rate_limits:
+        shutil.copy(os.path.join(ROOT, "RateLimits.json"), directory)
+    else:
+        with open(os.path.join(directory, "RateLimits.json"), 'w', encoding = "utf-8") as file:
+            json.dump({"limits": {}}, file)
+
+    os.makedirs(os.path.join(directory, "Data"))
+    log_types = ("errors", "mute", "unmute", "member_join", "member_leave", "member_update", "member_ban", "member_unban", "stats", "role_reaction")
+    data = {
+        "logs": {log_type: world.log_channel for log_type in log_types},
+        "mute": {"role": None, "mutes": []},
+        "role_reactions": world.role_reaction_data()
+    }
+    with open(os.path.join(directory, "Data", "data_storage.json"), 'w', encoding = "utf-8") as file:
+        json.dump(data, file)
+
+""" Function | Load Bot
+
+Imports `main.py` from inside `directory`, which sets up the bot and loads its cogs without connecting.
+"""
+def load_bot(directory):
+    os.environ["HARNESS_BOT_TOKEN"] = TOKEN
+    os.chdir(directory)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    import main
+    bot = main.bot
+    bot.extension_loader.load("Cogs.Moderation")
+    return bot
+
+async def connect(bot, fake, timeout):
+    await fake.start()
+    fake.install()
+
+    # Discord makes every shard but the first wait 5 seconds before identifying, the fake doesn't.
+    async def no_wait(shard_id, *, initial = False):
+        pass
+    bot.before_identify_hook = no_wait
+    # How long discord.py waits for more guilds before it is ready, 2 seconds by default.
+    bot._connection.guild_ready_timeout = 0.05
+
+    task = asyncio.ensure_future(bot.start(TOKEN))
+    ready = asyncio.ensure_future(bot.wait_until_ready())
+    await asyncio.wait([task, ready], timeout = timeout, return_when = asyncio.FIRST_COMPLETED)
+    if not ready.done():
+        ready.cancel()
+        if task.done():
+            # Raises whatever stopped the bot from connecting.
+            task.result()
+        raise asyncio.TimeoutError()
+    return task
+
+async def reaction_storm(fake, world, count, pace):
+    for i in range(count):
+        guild = world.guilds[i % len(world.guilds)]
+        user_id = guild['members'][(i // len(world.guilds)) % len(guild['members'])]
+        emoji = i % len(world.reaction_emojis)
+        await fake.send("MESSAGE_REACTION_ADD", {
+            "user_id": str(user_id),
+            "channel_id": str(guild['channels'][1 % len(guild['channels'])]),
+            "message_id": str(guild['reaction_message']),
+            "guild_id": str(guild['id']),
+            "emoji": {"id": None, "name": world.reaction_emojis[emoji]},
+            "member": world.member(guild, user_id)
+        }, guild['id'], expect = ("PUT", f"/guilds/{guild['id']}/members/{user_id}/roles/{guild['reaction_roles'][emoji]}"))
+        await pace()
+    return count
+
+async def join_raid(fake, world, count, pace):
+    guild = world.guilds[0]
+    for i in range(count):
+        member = world.new_member(guild)
+        member['guild_id'] = str(guild['id'])
+        await fake.send("GUILD_MEMBER_ADD", member, guild['id'], expect = ("POST", f"/channels/{world.log_channel}/messages"))
+        await pace()
+    return count
+
+async def command_burst(fake, world, count, pace):
+    commands = ("ping", "uptime", "hexconvert #EB1D24", "charinfo a")
+    for i in range(count):
+        guild = world.guilds[i % len(world.guilds)]
+        # The log channel is left out, so its messages aren't mistaken for replies.
+        channels = guild['channels'][1:] or guild['channels']
+        channel_id = channels[i % len(channels)]
+        user_id = guild['members'][(i // len(world.guilds)) % len(guild['members'])]
+        member = world.member(guild, user_id)
+        author = member.pop('user')
+        data = message_data(snowflake_now(), channel_id, author, content = "!" + commands[i % len(commands)], guild_id = guild['id'], member = member)
+        await fake.send("MESSAGE_CREATE", data, guild['id'], expect = ("POST", f"/channels/{channel_id}/messages"))
+        await pace()
+    return count
+
+def script(path):
+    async def replay(fake, world, count, pace):
+        sent = 0
+        with open(path, 'r', encoding = "utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                await fake.send(entry['event'], entry['data'], int(entry['guild']), expect = tuple(entry['expect']) if entry.get('expect') else None)
+                sent += 1
+                if entry.get('delay'):
+                    await asyncio.sleep(entry['delay'])
+                else:
+                    await pace()
+        return sent
+    return replay
+
+def percentiles(samples):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    pick = lambda p: samples[min(int(len(samples) * p / 100), len(samples) - 1)]
+    return {
+        "p50": round(pick(50) * 1000, 2),
+        "p95": round(pick(95) * 1000, 2),
+        "p99": round(pick(99) * 1000, 2),
+        "max": round(samples[-1] * 1000, 2)
+    }
+
+""" Coroutine | Run Scenario
+
+Sends a scenario's events, then waits until every expected REST call was made and the bot has been
+quiet for a moment, or until it has been quiet for `idle` seconds.
+"""
+async def run_scenario(bot, fake, world, scenario, count, rate, idle):
+    fake.calls.clear()
+    fake.expectations.reset()
+    if bot.watchdog:
+        bot.watchdog.lags.clear()
+
+    async def pace():
+        # Yields to the bot between events either way, like events arriving over a real connection.
+        await asyncio.sleep(1 / rate if rate else 0)
+
+    start = time.perf_counter()
+    sent = await scenario(fake, world, count, pace)
+    fake.last_call = max(fake.last_call, time.perf_counter())
+    while True:
+        await asyncio.sleep(0.05)
+        quiet = time.perf_counter() - fake.last_call
+        if quiet > idle or (not fake.expectations.waiting and quiet > 0.25):
+            break
+    seconds = max(fake.last_call - start, 1e-9)
+
+    return {
+        "events": sent,
+        "seconds": round(seconds, 3),
+        "events_per_second": round(sent / seconds, 1),
+        "latency_ms": percentiles(fake.expectations.latencies),
+        "unanswered": fake.expectations.waiting,
+        "api_calls": sum(fake.calls.values()),
+        "api_calls_by_route": dict(fake.calls.most_common()),
+        "loop_lag_max_ms": round(bot.watchdog.get_lag()[1] * 1000, 2) if bot.watchdog else None
+    }
+
+async def run(bot, fake, world, scenarios, args):
+    results = {}
+    start = time.perf_counter()
+    try:
+        task = await connect(bot, fake, args.timeout)
+    except asyncio.TimeoutError:
+        print(f"The bot wasn't ready after {args.timeout}s.", file = sys.stderr)
+        return None
+    results['startup_seconds'] = round(time.perf_counter() - start, 3)
+    results['scenarios'] = {}
+
+    for name, scenario in scenarios:
+        result = await run_scenario(bot, fake, world, scenario, args.count, args.rate, args.idle)
+        results['scenarios'][name] = result
+        latency = result['latency_ms'] or {}
+        print(
+            f"{name:>15}: {result['events']:>6} events in {result['seconds']:>7.2f}s ({result['events_per_second']:>8.1f}/s) | "
+            f"p50 {latency.get('p50', 0):>7.1f} ms p99 {latency.get('p99', 0):>7.1f} ms | "
+            f"{result['api_calls']:>6} API calls | {result['unanswered']} unanswered"
+        )
+
+    await bot.close()
+    await fake.stop()
+    task.cancel()
+    return results
+
+def main(argv = None):
+    scenario_names = {"reaction_storm": reaction_storm, "join_raid": join_raid, "command_burst": command_burst}
+    parser = argparse.ArgumentParser(prog = "python -m benchmarks.harness", description = "Runs the bot against a fake Discord.")
+    parser.add_argument("scenarios", nargs = "*", help = f"any of {', '.join(scenario_names)} and script, all but script by default")
+    parser.add_argument("--count", type = int, default = 1000, help = "events per scenario")
+    parser.add_argument("--guilds", type = int, default = 1)
+    parser.add_argument("--members", type = int, default = 2000, help = "members per guild")
+    parser.add_argument("--channels", type = int, default = 5, help = "text channels per guild")
+    parser.add_argument("--shards", type = int, default = 1)
+    parser.add_argument("--rate", type = float, default = 0, help = "events per second, 0 to send as fast as possible")
+    parser.add_argument("--idle", type = float, default = 5, help = "seconds without REST calls before giving up on a scenario")
+    parser.add_argument("--timeout", type = float, default = 60, help = "seconds to wait for the bot to be ready")
+    parser.add_argument("--no-rate-limits", action = "store_true", help = "run without the limits in RateLimits.json")
+    parser.add_argument("--script", help = "a JSON lines file of events, for the script scenario")
+    parser.add_argument("--out", help = "a file to write the results to, as JSON")
+    args = parser.parse_args(argv)
+
+    names = args.scenarios or list(scenario_names)
+    for name in names:
+        if name not in scenario_names and name != "script":
+            parser.error(f"unknown scenario {name}")
+    if "script" in names and not args.script:
+        parser.error("the script scenario needs --script")
+    scenarios = [(name, script(os.path.abspath(args.script)) if name == "script" else scenario_names[name]) for name in names]
+    out = os.path.abspath(args.out) if args.out else None
+
+    with open(os.path.join(ROOT, "Permissions.json"), 'r', encoding = "utf-8") as file:
+        permission_roles = json.load(file)['roles']
+    world = World(guilds = args.guilds, members = args.members, channels = args.channels, permission_roles = permission_roles)
+
+    directory = tempfile.mkdtemp(prefix = "bot-harness-")
+    try:
+        prepare(directory, world, args.shards, rate_limits = not args.no_rate_limits)
+        bot = load_bot(directory)
+        fake = FakeDiscord(world, shard_count = args.shards)
+        results = bot.loop.run_until_complete(run(bot, fake, world, scenarios, args))
+        bot.log_util.stop()
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(directory, ignore_errors = True)
+
+    if results is None:
+        return 1
+    results['settings'] = {
+        "count": args.count, "guilds": args.guilds, "members": args.members, "channels": args.channels,
+        "shards": args.shards, "rate": args.rate, "rate_limits": not args.no_rate_limits
+    }
+    results['python'] = platform.python_version()
+    results['discord.py'] = discord.__version__
+    if out:
+        with open(out, 'w', encoding = "utf-8") as file:
+            json.dump(results, file, indent = 2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""Benchmark | Hot Paths
+
+Times the code that runs most often, or on the most data, each at a few sizes:
+    - data_save / data_load: `DataManager.save_data` and `load_data` with both data stores, as the data grows.
+      Each save changes one mute, which is what most saves look like.
+    - command_permissions: The global check every command goes through, for members with more and more roles.
+    - role_reaction_lookup: `on_raw_reaction_add` finding the menu and role for a reaction (hit), or finding it
+      isn't on a menu (miss), with more and more menus.
+    - get_embed: `EmbedUtil.get_embed` with more and more fields.
+    - format_page: `MenuListSource.format_page` for a page of a menu, with and without a role reaction shown.
+    - school_mapping: `SchoolRoles.get_school_mapping` with more and more schools under a letter.
+    - check_mutes: A single run of `Moderation.check_mutes` over 10,000 timed mutes, none of them over.
+
+Discord objects are replaced with small fakes, so no connection is needed. The global check is taken from
+the real `main.py`, which is imported the same way the harness does it (see `harness.py`).
+
+Each case is run `repeat` times, reporting the median and best time per operation in microseconds.
+The results are written as JSON with the commit they were run on, so runs can be compared across commits:
+    python -m benchmarks.hot_paths [--quick] [--only NAME] [--out results.json] [--compare old.json]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+import discord
+
+from benchmarks.embed_templates import make_embed_util
+from benchmarks.harness import ROOT, load_bot, prepare
+from benchmarks.fake_discord import World
+from Resources.Data import DataManager
+from Resources.Menus import MenuListSource
+from Resources.Metrics import Metrics
+
+class FakeRole:
+    def __init__(self, role_id, name = None):
+        self.id = role_id
+        self.name = name or f"Role {role_id}"
+        self.mention = f"<@&{role_id}>"
+
+class FakeGuild:
+    def __init__(self, guild_id, roles = ()):
+        self.id = guild_id
+        self.roles = {role.id: role for role in roles}
+
+    def get_role(self, role_id):
+        return self.roles.get(role_id)
+
+class FakeMember:
+    def __init__(self, member_id, roles = ()):
+        self.id = member_id
+        self.roles = list(roles)
+        self.guild_permissions = discord.Permissions.none()
+
+    async def add_roles(self, *roles):
+        pass
+
+def fake_bot(**attributes):
+    bot = types.SimpleNamespace(cluster = None, metrics = None, **attributes)
+    bot.log_util = types.SimpleNamespace(get_logger = lambda name: types.SimpleNamespace(info = print, warning = print))
+    return bot
+
+""" Function | Measure
+
+Runs `func` (a function, or a coroutine function when `is_async`) `number` times per run, for `repeat` runs.
+"""
+def measure(func, number, repeat, is_async = False):
+    async def run_async():
+        start = time.perf_counter()
+        for _ in range(number):
+            await func()
+        return time.perf_counter() - start
+
+    def run():
+        if is_async:
+            return asyncio.run(run_async())
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - start
+
+    times = [run() / number * 1e6 for _ in range(repeat)]
+    return {"median_us": round(statistics.median(times), 3), "best_us": round(min(times), 3), "number": number, "repeat": repeat}
+
+def mute_data(count):
+    until = (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days = 1)).isoformat()
+    return [{"id": 10 ** 17 + i, "guild": 1, "time": until} for i in range(count)]
+
+def bench_data(directory, size, scale):
+    results = {}
+    data = {
+        "logs": {"errors": 1},
+        "mute": {"role": 1, "mutes": mute_data(size)},
+        "role_reactions": [{"title": f"Menu {i}", "description": "", "roles": [{"emoji": "\N{RED APPLE}", "role": i}], "guild": 1, "channel": 1, "id": i} for i in range(size)],
+        "school_roles": {letter: list(range(size // 26)) for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"}
+    }
+    for store in ("json", "sqlite"):
+        path = os.path.join(directory, f"data_{store}_{size}")
+        bot = fake_bot(data_file = path + ".json", settings = types.SimpleNamespace(data_store = store, store_file = path + ".sqlite3"))
+        data_manager = DataManager(bot)
+        data_manager.load_data()
+        bot.data = json.loads(json.dumps(data))
+        data_manager.save_data()
+
+        def save():
+            bot.data['mute']['mutes'][0]['time'] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            data_manager.save_data()
+
+        number = max(int(2000 * scale / max(size / 100, 1)), 3)
+        results[f"data_save[{store},size={size}]"] = measure(save, number, 5)
+        results[f"data_load[{store},size={size}]"] = measure(data_manager.load_data, number, 5)
+        data_manager.store.close()
+    return results
+
+def bench_permissions(bot, scale):
+    results = {}
+    command = bot.get_command("hexconvert")
+    member_role = bot.data_manager.parse_permissions()[1]["hexconvert"]
+    for count in (1, 10, 100, 250):
+        # The allowed role is the member's last one, the worst case for finding it.
+        member = FakeMember(1, [FakeRole(10 ** 6 + i) for i in range(count - 1)] + [FakeRole(next(iter(member_role)))])
+        ctx = types.SimpleNamespace(bot = bot, command = command, author = member, guild = None, channel = None, metrics_start = None)
+        check = sys.modules['main'].command_permissions
+
+        async def run():
+            ctx.metrics_start = None
+            await check(ctx)
+
+        results[f"command_permissions[roles={count}]"] = measure(run, int(20000 * scale), 5, is_async = True)
+    return results
+
+def bench_role_reactions(scale):
+    from Cogs.RoleReactions import RoleReaction
+    results = {}
+    for count in (10, 100, 1000):
+        roles = [FakeRole(1000 + i) for i in range(5)]
+        bot = fake_bot(user = types.SimpleNamespace(id = 1), data = {"role_reactions": [{
+            "title": f"Menu {i}", "description": "", "guild": 1, "channel": 2, "id": 10 ** 6 + i,
+            "roles": [{"emoji": emoji, "role": role.id} for emoji, role in zip(World.reaction_emojis + ("A", "B"), roles)]
+        } for i in range(count)]})
+        bot.metrics = Metrics(bot)
+        guild = FakeGuild(1, roles)
+        bot.get_guild = lambda guild_id: guild
+        cog = RoleReaction.__new__(RoleReaction)
+        cog.bot = bot
+
+        for case, message_id in (("hit", 10 ** 6 + count - 1), ("miss", 5)):
+            payload = types.SimpleNamespace(
+                user_id = 2, message_id = message_id, guild_id = 1,
+                emoji = discord.PartialEmoji(name = World.reaction_emojis[0]), member = FakeMember(2)
+            )
+            results[f"role_reaction_lookup[menus={count},{case}]"] = measure(
+                lambda: cog.on_raw_reaction_add(payload), int(20000 * scale / max(count / 100, 1)), 5, is_async = True
+            )
+    return results
+
+def bench_embeds(scale):
+    results = {}
+    embed_util = make_embed_util()
+    for count in (0, 5, 25):
+        fields = [{"name": f"Field {i}", "value": f"`Value {i}`", "inline": i % 2 == 0} for i in range(count)]
+        results[f"get_embed[fields={count}]"] = measure(
+            lambda: embed_util.get_embed(title = "Title", desc = "Description", fields = fields, ts = True), int(20000 * scale), 5
+        )
+
+    menu = types.SimpleNamespace(current_page = 0)
+    roles = [{"emoji": emoji, "role": f"<@&{i}>"} for i, emoji in enumerate(World.reaction_emojis)]
+    for case, rr in (("plain", None), ("role_reaction", ({"title": "Menu", "description": "Pick one."}, roles, FakeRole(5)))):
+        source = MenuListSource(embed_util, title = "Role Reactions", desc = "Select one.", entries = [f"Entry {i}" for i in range(100)], rr = rr)
+        page = source.entries[:source.per_page]
+        results[f"format_page[{case}]"] = measure(lambda: source.format_page(menu, page), int(20000 * scale), 5, is_async = True)
+    return results
+
+def bench_school_mapping(scale):
+    from Cogs.SchoolRoles import SchoolRoles
+    results = {}
+    for count in (10, 100, 500):
+        roles = [FakeRole(5000 + i, f"University {count - i}") for i in range(count)]
+        bot = fake_bot(data = {"guilds": {"1": {"school_roles": {"A": [role.id for role in roles]}}}})
+        bot.data_manager = DataManager(bot)
+        cog = SchoolRoles.__new__(SchoolRoles)
+        cog.bot = bot
+        guild = FakeGuild(1, roles)
+        results[f"school_mapping[schools={count}]"] = measure(lambda: cog.get_school_mapping(guild, "A"), int(5000 * scale / max(count / 100, 1)), 5)
+    return results
+
+def bench_check_mutes(scale):
+    from Cogs.Moderation import Moderation
+    results = {}
+    count = 10000
+    bot = fake_bot(data = {"mute": {"role": 1, "mutes": mute_data(count)}})
+    cog = Moderation.__new__(Moderation)
+    cog.bot = bot
+    results[f"check_mutes[mutes={count}]"] = measure(lambda: Moderation.check_mutes.coro(cog), max(int(20 * scale), 2), 5, is_async = True)
+    return results
+
+def get_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd = ROOT, check = True, capture_output = True, text = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, path):
+    with open(path, 'r', encoding = "utf-8") as file:
+        old = json.load(file)
+    print(f"\nCompared to {old.get('commit') or path}:")
+    for name, result in results.items():
+        before = old['results'].get(name)
+        if before:
+            ratio = result['median_us'] / before['median_us']
+            print(f"{name:>45}: {ratio:.2f}x ({'slower' if ratio > 1 else 'faster'})")
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m benchmarks.hot_paths", description = "Times the bot's hot paths.")
+    parser.add_argument("--quick", action = "store_true", help = "run each case a tenth as many times")
+    parser.add_argument("--only", action = "append", help = "only run the cases starting with this name, can be repeated")
+    parser.add_argument("--out", help = "a file to write the results to, as JSON")
+    parser.add_argument("--compare", help = "a results file from an earlier run to compare against")
+    args = parser.parse_args(argv)
+    scale = 0.1 if args.quick else 1
+    out = os.path.abspath(args.out) if args.out else None
+    old = os.path.abspath(args.compare) if args.compare else None
+    wanted = lambda name: not args.only or any(name.startswith(prefix) for prefix in args.only)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        if wanted("data_"):
+            for size in (100, 1000, 10000):
+                results.update(bench_data(directory, size, scale))
+        if wanted("command_permissions"):
+            bot_directory = os.path.join(directory, "bot")
+            os.makedirs(bot_directory)
+            prepare(bot_directory, World(), shard_count = 1)
+            bot = load_bot(bot_directory)
+            results.update(bench_permissions(bot, scale))
+            bot.loop.run_until_complete(bot.close())
+            bot.log_util.stop()
+            os.chdir(ROOT)
+        if wanted("role_reaction_lookup"):
+            results.update(bench_role_reactions(scale))
+        if wanted("get_embed") or wanted("format_page"):
+            results.update({name: result for name, result in bench_embeds(scale).items() if wanted(name)})
+        if wanted("school_mapping"):
+            results.update(bench_school_mapping(scale))
+        if wanted("check_mutes"):
+            results.update(bench_check_mutes(scale))
+
+    for name, result in results.items():
+        print(f"{name:>45}: {result['median_us']:>12.2f} us median | {result['best_us']:>12.2f} us best")
+
+    report = {
+        "commit": get_commit(),
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "discord.py": discord.__version__,
+        "results": results
+    }
+    if out:
+        with open(out, 'w', encoding = "utf-8") as file:
+            json.dump(report, file, indent = 2)
+    if old:
+        compare(results, old)
+    return report
+
+if __name__ == "__main__":
+    main()
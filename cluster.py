@@ -0,0 +1,136 @@
+"""Cluster Launcher
+
+Runs the bot's shards across several processes (workers), so the bot can use more than one CPU core.
+
+Each worker is a normal `main.py` process, told which shards to run through environment variables.
+The launcher hosts the unix socket the workers talk to each other over (see `Resources/Cluster.py`),
+starts the workers one at a time so they don't all identify with Discord at once, and starts any
+worker that stops again, which is also how the `restart` command restarts every worker.
+
+The number of workers is set by the "Cluster" config option, or given when starting:
+    python cluster.py [workers]
+
+NOTE: Unix sockets are needed, so this doesn't run on Windows. Use `main.py` directly there.
+"""
+import asyncio
+import logging
+import os
+import signal
+import sys
+import time
+
+import discord
+
+from Resources.Cluster import ClusterHub, split_shards
+from Resources.Data import DataManager
+
+log = logging.getLogger("cluster")
+
+""" Coroutine | Get Shard Count
+
+The configured shard count, or the number Discord recommends for the bot if there isn't one.
+"""
+async def get_shard_count(settings):
+    if settings.shard_count:
+        return settings.shard_count
+
+    http = discord.http.HTTPClient()
+    try:
+        await http.static_login(os.getenv(settings.token_env_var), bot = True)
+        shards, _ = await http.get_bot_gateway()
+    finally:
+        await http.close()
+    return shards
+
+""" Class | Launcher
+
+Starts the workers and keeps them running.
+"""
+class Launcher:
+    def __init__(self, settings, workers, shard_count):
+        self.settings = settings
+        self.shard_count = shard_count
+        self.ranges = split_shards(shard_count, workers)
+        self.hub = ClusterHub(settings.cluster_socket)
+        # Only one worker connects to Discord at a time.
+        self.starting = asyncio.Lock()
+        self.processes = {}
+        self.closing = False
+
+    async def run(self):
+        await self.hub.start()
+        log.info(f"Running {self.shard_count} shards on {len(self.ranges)} workers.")
+        workers = [asyncio.ensure_future(self.run_worker(i, shard_ids)) for i, shard_ids in enumerate(self.ranges)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            await self.hub.stop()
+
+    """ Coroutine | Run Worker
+
+    Runs a single worker, starting it again whenever it stops. A worker that stops within a minute
+    of starting waits longer each time before being started again, up to 5 minutes.
+    """
+    async def run_worker(self, cluster_id, shard_ids):
+        delay = 5
+        while not self.closing:
+            async with self.starting:
+                if self.closing:
+                    return
+                env = dict(
+                    os.environ,
+                    BOT_CLUSTER_ID = str(cluster_id),
+                    BOT_SHARD_IDS = ",".join(map(str, shard_ids)),
+                    BOT_SHARD_COUNT = str(self.shard_count)
+                )
+                log.info(f"Starting worker {cluster_id} (shards {shard_ids[0]}-{shard_ids[-1]}).")
+                started = time.monotonic()
+                self.hub.reset(cluster_id)
+                process = self.processes[cluster_id] = await asyncio.create_subprocess_exec(
+                    sys.executable, "main.py", env = env, stdin = asyncio.subprocess.DEVNULL
+                )
+                # Each shard can take a few seconds to identify, on top of the bot's own startup.
+                ready = asyncio.ensure_future(self.hub.wait_ready(cluster_id, timeout = 60 + 10 * len(shard_ids)))
+                exited = asyncio.ensure_future(process.wait())
+                await asyncio.wait([ready, exited], return_when = asyncio.FIRST_COMPLETED)
+                ready.cancel()
+
+            code = await exited
+            if self.closing:
+                return
+
+            delay = 5 if time.monotonic() - started > 60 else min(delay * 2, 300)
+            log.warning(f"Worker {cluster_id} stopped with exit code {code}, starting it again in {delay}s.")
+            await asyncio.sleep(delay)
+
+    def stop(self):
+        self.closing = True
+        for process in self.processes.values():
+            if process.returncode is None:
+                process.terminate()
+
+async def main():
+    logging.basicConfig(format = "[%(asctime)s] [%(name)s] %(levelname)s: %(message)s", level = logging.INFO)
+
+    # Relative paths in the config are relative to the bot's folder.
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    _, settings = DataManager().parse_config()
+
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else settings.cluster_workers
+    if workers > 1 and settings.data_store != "sqlite":
+        log.error("Running more than one worker needs the sqlite data store, see \"Data Store\" in Config.yml.")
+        return
+
+    shard_count = await get_shard_count(settings)
+    if workers > shard_count:
+        log.warning(f"There are only {shard_count} shards, so only {shard_count} workers will be started.")
+        workers = shard_count
+
+    launcher = Launcher(settings, workers, shard_count)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, launcher.stop)
+    await launcher.run()
+
+if __name__ == "__main__":
+    asyncio.run(main())
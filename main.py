@@ -28,23 +28,83 @@ Local Modules:
                 The utility class for creating and handling the Discord embedded message formatting.
             Confirmation:
                 The utility class for giving users a confirmation menu.
+        Delivery:
+            FanOut:
+                The class for sending a message to many channels concurrently.
+        Extensions:
+            ExtensionLoader:
+                The class for loading extensions, either right away or on first use, and timing how long each one takes.
+        Bot:
+            Bot:
+                The bot class, which keeps track of the registered command names.
+        Logger:
+            LogUtil:
+                The class that sets up the bot's logging, which writes to the console and log files from a background thread.
+        Watcher:
+            ConfigWatcher:
+                The class that reloads the config and permissions when their files change.
+        Cache:
+            CacheProfile:
+                The class that picks the intents and member caching to use.
+        Profiler:
+            StartupProfiler:
+                The class for timing each step of the bot's startup.
+        Shards:
+            ShardMetrics:
+                The class counting each shard's gateway events and reconnects.
+        Cluster:
+            ClusterClient:
+                The class that talks to the other processes when the bot is started by `cluster.py`.
+        Metrics:
+            Metrics:
+                The class keeping the bot's metrics, and serving them to Prometheus.
+        Watchdog:
+            LoopWatchdog:
+                The class that catches code blocking the event loop.
+        Limits:
+            RateLimiter:
+                The class that applies the rate limits from RateLimits.json to commands.
 """
 
 # standard python modules
 import asyncio
 import datetime
+import io
 import os
+import sys
+import time
+import traceback
+
+# The profiler only uses the standard library, so it can time the imports after it.
+from Resources.Profiler import StartupProfiler, SamplingProfiler
+profiler = StartupProfiler()
 
 # 3rd party modules
-import discord
-from discord.ext import commands
-import yaml
-from colorama import init
-init()
+with profiler.measure("Imports", "discord"):
+    import discord
+    from discord.ext import commands
+with profiler.measure("Imports", "yaml"):
+    import yaml
+with profiler.measure("Imports", "colorama"):
+    from colorama import init
+    init()
 
 # local modules
-from Resources.Data import DataManager
-from Resources.Utility import EmbedUtil, Confirmation
+with profiler.measure("Imports", "Resources"):
+    from Resources.Bot import Bot
+    from Resources.Cache import CacheProfile
+    from Resources.Shards import ShardMetrics
+    from Resources.Cluster import ClusterClient
+    from Resources.Metrics import Metrics
+    from Resources.Watchdog import LoopWatchdog
+    from Resources.Memory import MemoryTracker, format_size
+    from Resources.Limits import RateLimiter
+    from Resources.Data import DataManager
+    from Resources.Utility import EmbedUtil, Confirmation
+    from Resources.Delivery import FanOut
+    from Resources.Extensions import ExtensionLoader
+    from Resources.Logger import LogUtil
+    from Resources.Watcher import ConfigWatcher
 
 def get_prefix(bot, message):
     """Allows for a dynamic prefix option to be anabled for the bot.
@@ -61,13 +121,50 @@ def get_prefix(bot, message):
     """
     return bot.prefix
 
-# Allows the Discord client to see all Members, Roles, etc by default.
-intents = discord.Intents.default()
-intents.members = True
-intents.presences = True
+# The config is read before the bot is created, as it decides what the bot keeps in memory.
+data_manager = DataManager()
+with profiler.measure("Setup", "Load Config"):
+    config, settings = data_manager.parse_config()
+
+# Picks which Members, presences, etc the Discord client sees and caches.
+cache_profile = CacheProfile(settings.cache_profile_name)
+intents = cache_profile.get_intents()
+
+# When started by `cluster.py`, this process only runs the shards it was given.
+cluster_id = os.getenv("BOT_CLUSTER_ID")
+if cluster_id is not None:
+    cluster_id = int(cluster_id)
+    shard_ids = [int(i) for i in os.environ["BOT_SHARD_IDS"].split(",")]
+    shard_count = int(os.environ["BOT_SHARD_COUNT"])
+else:
+    shard_ids = None
+    shard_count = settings.shard_count
 
 # Create the 'bot' instance, using the fucntion above for getting the prefix.
-bot = commands.Bot(command_prefix=get_prefix, description="Heroicos_HM's Custom Bot", case_insensitive = True, intents = intents)
+bot = Bot(
+    command_prefix=get_prefix,
+    description="Heroicos_HM's Custom Bot",
+    case_insensitive = True,
+    intents = intents,
+    member_cache_flags = cache_profile.get_member_cache_flags(intents),
+    chunk_guilds_at_startup = cache_profile.chunk_guilds,
+    # None lets Discord pick the number of shards.
+    shard_count = shard_count,
+    shard_ids = shard_ids
+)
+bot.cache_profile = cache_profile
+bot.shard_metrics = ShardMetrics(bot)
+bot.metrics = Metrics(bot)
+bot.rate_limiter = RateLimiter(bot)
+bot.before_invoke(bot.metrics.before_invoke)
+bot.add_listener(bot.metrics.on_command_error)
+bot.add_listener(bot.rate_limiter.on_command_error)
+
+# The bot only has a single after invoke hook, shared by everything that needs one.
+@bot.after_invoke
+async def after_invoke(ctx):
+    await bot.rate_limiter.after_invoke(ctx)
+    await bot.metrics.after_invoke(ctx)
 
 # Remove the help command to leave room for implementing a custom one.
 bot.remove_command('help')
@@ -75,19 +172,68 @@ bot.remove_command('help')
 # Give the bobt global access to the yaml reading module.
 bot.yaml = yaml
 
+bot.profiler = profiler
+
 """Initial Data Loading/Prep
 
-Create a DataManager instance, then call pertinent loading functions.
+Give the DataManager instance the bot, then call pertinent loading functions.
 
 Then, create an instance of the Embed tool for use later.
 The bot's config and data contain information
 """
-bot.data_manager = DataManager(bot)
-bot.data_manager.load_config()
-bot.data_manager.load_permissions()
-bot.data_manager.load_data()
+data_manager.bot = bot
+bot.data_manager = data_manager
+bot.data_manager.apply_config(config, settings)
+
+# Logging is set up first, so everything after this point can log.
+bot.log_util = LogUtil(bot, suffix = None if cluster_id is None else f"worker{cluster_id}")
+log = bot.log_util.get_logger("Main")
+log.info(f"Using the {cache_profile.name} cache profile.")
+
+if cluster_id is not None:
+    bot.cluster = ClusterClient(bot, bot.settings.cluster_socket, cluster_id, shard_ids)
+    bot.cluster.start()
+
+with profiler.measure("Setup", "Load Permissions"):
+    bot.data_manager.load_permissions()
+    bot.data_manager.load_rate_limits()
+with profiler.measure("Setup", "Load Data"):
+    bot.data_manager.load_data()
 
 bot.embed_util = EmbedUtil(bot)
+bot.fan_out = FanOut(bot)
+
+def refresh_config():
+    """Rebuilds everything made from the config, after it has been reloaded.
+    """
+    bot.log_util.configure()
+    bot.embed_util = EmbedUtil(bot)
+    bot.fan_out = FanOut(bot)
+    if bot.is_ready():
+        bot.loop.create_task(load_log_channel())
+
+async def load_log_channel():
+    """Gets the log channel, fetching it from Discord if it is in a guild on another cluster worker's shards.
+    """
+    bot.log_channel = bot.get_channel(bot.log_channel_id)
+    if bot.log_channel is None and bot.cluster:
+        bot.log_channel = await bot.fetch_channel(bot.log_channel_id)
+
+def hot_restart():
+    """Saves the data, reloads the config, permissions and rate limits, then reloads every extension.
+
+    Raises the error if any of them can't be reloaded, otherwise returns
+    the extension that failed to reload and its error, as `ExtensionLoader.reload_all` does.
+    """
+    bot.data_manager.save_data()
+    bot.data_manager.load_config()
+    bot.data_manager.load_permissions()
+    bot.data_manager.load_rate_limits()
+
+    # Rebuilt so they pick up the new config.
+    refresh_config()
+
+    return bot.extension_loader.reload_all()
 
 # List of extension files to load.
 bot.exts = [
@@ -101,21 +247,75 @@ bot.exts = [
     # 'Cogs.Tickets'
 ]
 
+# Extensions from the list above that are only loaded the first time one of their
+# commands is used or one of their events happens, when "Lazy Cogs" is enabled.
+# NOTE: Cogs with background tasks (like Moderation's mute timers) shouldn't be listed,
+# as the tasks won't run until the cog is loaded.
+bot.lazy_exts = [
+    'Cogs.General',
+    'Cogs.RoleReactions',
+    'Cogs.SchoolRoles',
+    'Cogs.Tickets'
+]
+
 # Check if the bot is meant to be run in DEBUG mode.
 # When DEBUG mode is inactive, error logging to the console is limited,
 # but the error logs are also shown in Discord as well.
 if bot.DEBUG:
     # Print to the user that the bot will run in Debug mode.
-    print(f"{bot.WARN} {bot.TIMELOG()} Debug mode active.")
+    log.warning("Debug mode active.")
 else:
     # Adds the custom error logging if no in debug mode.
     bot.exts.append('Cogs.Errors')
 
 # Load the extension files listed above.
+bot.extension_loader = ExtensionLoader(bot)
 for extension in bot.exts:
-    bot.load_extension(extension)
+    if bot.settings.lazy_cogs and extension in bot.lazy_exts:
+        bot.extension_loader.register_lazy(extension)
+    else:
+        bot.extension_loader.load(extension)
+bot.extension_loader.report()
+
+# Reload the config and permissions whenever their files are edited.
+if bot.settings.watch_files:
+    bot.config_watcher = ConfigWatcher(bot, refresh_config, poll_interval = bot.settings.watch_interval)
+    bot.config_watcher.start()
+
+async def start_metrics():
+    """Starts the metrics endpoint, with each cluster worker on its own port.
+    """
+    port = bot.settings.metrics_port + (bot.cluster.id if bot.cluster else 0)
+    try:
+        await bot.metrics.start(bot.settings.metrics_host, port)
+        log.info(f"Serving metrics on http://{bot.settings.metrics_host}:{port}/metrics")
+    except OSError as e:
+        log.error(f"Could not start the metrics endpoint: {e}")
 
-print(f"{bot.OK} {bot.TIMELOG()} Connecting to Discord...")
+if bot.settings.metrics_active:
+    bot.loop.create_task(start_metrics())
+
+# Catches code that blocks the event loop, shown by the `lag` command.
+bot.watchdog = None
+if bot.settings.watchdog_active:
+    bot.watchdog = LoopWatchdog(bot, threshold = bot.settings.watchdog_threshold, history = bot.settings.watchdog_history)
+    bot.watchdog.start()
+
+# Profiles the bot on demand, for the `profile` command.
+bot.sampling_profiler = SamplingProfiler(bot.settings.sampling_interval)
+
+# Tracks memory for the `memory` command, and logs how it grows over time if active.
+bot.memory_tracker = MemoryTracker(bot, frames = bot.settings.memory_frames, interval = bot.settings.memory_interval, path = bot.settings.memory_file, top = bot.settings.memory_top)
+if bot.settings.memory_active:
+    bot.memory_tracker.start()
+
+log.info("Connecting to Discord...")
+
+@bot.event
+async def on_connect():
+    """Triggers every time the bot connects to the Discord gateway, before the bot's cache is ready.
+    """
+    profiler.mark("connected")
 
 @bot.event
 async def on_ready():
@@ -125,11 +325,19 @@ async def on_ready():
 
     Sets up any configuration for the bot that requires a Discord connection first.
     """
+    profiler.mark("ready")
+
+    # Set the bot start time for use in the uptime command, before anything awaits, as commands can arrive as soon as the bot is ready.
+    bot.start_time = bot.embed_ts()
+
     # Get the log channel object first, this allows logging to happen without having to retrieve the channel every time.
-    bot.log_channel = bot.get_channel(bot.log_channel_id)
+    await load_log_channel()
 
     # Print the connection message.
-    print(f"{bot.OK} {bot.TIMELOG()} Logged in as {bot.user} and connected to Discord! (ID: {bot.user.id})")
+    log.info(f"Logged in as {bot.user} and connected to Discord! (ID: {bot.user.id})", extra = {"fields": {
+        "Shards": f"{len(bot.latencies)} of {bot.shard_count}",
+        "Guilds": len(bot.guilds)
+    }})
 
     # Set the "playing" status of the bot to what is set in the config.
     if bot.show_game_status:
@@ -147,8 +355,47 @@ async def on_ready():
     # Send the embed "online" message to the log channel.
     await bot.log_channel.send(embed = embed)
 
-    # Set the bot start time for use in the uptime command.
-    bot.start_time = bot.embed_ts()
+    # Lets the launcher start the next worker.
+    if bot.cluster:
+        bot.cluster.broadcast("ready")
+
+    # Report how long startup took, if the profiler is enabled (only on the first connection).
+    profiler.mark("ready done")
+    if bot.settings.profile_startup and not profiler.reported:
+        profiler.between("Connection", "Gateway Connect", "connecting", "connected")
+        profiler.between("Connection", "Cache Ready", "connected", "ready")
+        profiler.between("Connection", "On Ready", "ready", "ready done")
+        await profiler.send_report(bot)
+
+@bot.event
+async def on_message(message):
+    """Command Pre-Filter
+
+    Checks the first word of a message against the known command names before handing it to the command system.
+
+    Anything that is not a command (e.g. "!!!" or "!typo") is either dropped right away when the
+    "Silent" option is set, or passed on to get a "Command Not Found" error, up to a limit per user.
+
+    Commands belonging to a lazy cog that hasn't been loaded yet load that cog first.
+    """
+    if message.author.bot:
+        return
+
+    prefix = await bot.get_prefix(message)
+    prefix = (prefix,) if isinstance(prefix, str) else tuple(prefix)
+    if not message.content.startswith(prefix):
+        return
+
+    used = next(p for p in prefix if message.content.startswith(p))
+    name = message.content[len(used):].split(maxsplit = 1)
+    if not name:
+        return
+
+    if not bot.is_command(name[0]) and not bot.extension_loader.load_for_command(name[0]):
+        if bot.settings.unknown_silent or not bot.allow_unknown_command(message.author.id):
+            return
+
+    await bot.process_commands(message)
 
 @bot.check
 async def command_permissions(ctx):
@@ -160,41 +407,19 @@ async def command_permissions(ctx):
     from Permissions.yml to verify that a user is/is not allowed
     to use a command.
     """
-    # Administrators are always allowed to use the command.
-    if ctx.author.guild_permissions.administrator:
-        return True
-    else:
-        # Finding permission name scheme of a command.
-        # e.g. "!command" is "command" and "!category command" is "category-command"
-        name = ctx.command.name
-        if ctx.command.parent:
-            command = ctx.command
-            parent_exists = True
-            while parent_exists == True:
-                name = ctx.command.parent.name + '-' + name
-                command = ctx.command.parent
-                if not command.parent:
-                    parent_exists = False
-
-        """Checking command permissions
+    # This is the first check to run, so command timings start here.
+    ctx.bot.metrics.start_timing(ctx)
 
-        For each role ID listed for a command, check if the user has that role id.
+    # Finding permission name scheme of a command.
+    # e.g. "!command" is "command" and "!category command" is "category-command"
+    name = ctx.command.qualified_name.replace(' ', '-')
 
-        If they do, allow command usage, otherwise, proceed to checking next role on the list.
+    # Administrators are always allowed, otherwise the user needs one of the roles listed for the command.
+    if not ctx.bot.data_manager.has_permission(ctx.author, name):
+        return False
 
-        If the user does not have any of the roles, deny the command usage.
-        """
-        if name in ctx.bot.permissions.keys():
-            for permission in ctx.bot.permissions[name]:
-                try:
-                    role = ctx.guild.get_role(int(permission))
-                    if role in ctx.author.roles:
-                        return True
-                except Exception as e:
-                    print(e)
-            return False
-        else:
-            return True
+    # Only invocations that are allowed use up the rate limits, see RateLimits.json.
+    return await ctx.bot.rate_limiter.check(ctx)
 
 class Internal(commands.Cog, name = "Internal"):
     """
@@ -212,6 +437,8 @@ class Internal(commands.Cog, name = "Internal"):
 
         Either a Batch or Shell script (depending on operating system) will then
         re-activate the bot, which allows the bot to take in file updates on the fly.
+
+        In a cluster, every worker restarts, and `cluster.py` starts them again.
         """
         # Confirm that the user wants to restart
         confirm = await Confirmation(
@@ -232,6 +459,9 @@ class Internal(commands.Cog, name = "Internal"):
             except:
                 pass
 
+            if self.bot.cluster:
+                self.bot.cluster.broadcast("restart")
+
             for extension in self.bot.exts:
                 self.bot.remove_cog(extension)
 
@@ -276,12 +506,316 @@ class Internal(commands.Cog, name = "Internal"):
         await self.bot.log_channel.send(embed = embed)
     """
 
+    @commands.command(name = "hotrestart", aliases = ['hr'], help = "Reloads the config, permissions and every cog without disconnecting from Discord.", brief = "")
+    async def hotrestart(self, ctx):
+        """Restarts the bot in place.
+
+        Saves the data, reloads the config and permissions, then reloads every extension
+        while staying connected to Discord, which is much faster than a full restart.
+
+        If any extension fails to load, every extension is put back to the version it
+        was running before, the config and permissions stay reloaded.
+
+        The `Resources` modules and this file are not reloaded, so changes to them
+        (including the commands of this cog) still need a full restart.
+
+        In a cluster, every other worker hot restarts as well.
+        """
+        start = time.perf_counter()
+        try:
+            failed, error = hot_restart()
+        except Exception as e:
+            log.exception("Hot restart failed to reload the config.")
+            embed = self.bot.embed_util.get_embed(
+                title = "Hot Restart Failed",
+                desc = f"The config or permissions could not be reloaded, nothing else was changed.\n`{e}`",
+                author = ctx.author
+            )
+            return await ctx.send(embed = embed)
+
+        downtime = time.perf_counter() - start
+        if self.bot.cluster:
+            self.bot.cluster.broadcast("hotrestart")
+
+        if failed:
+            embed = self.bot.embed_util.get_embed(
+                title = "Hot Restart Rolled Back",
+                desc = f"`{failed}` failed to load, so every cog was put back to the version it was running before.\n`{error}`",
+                fields = [{"name": "Downtime", "value": f"`{downtime * 1000:.1f} ms`", "inline": True}],
+                author = ctx.author
+            )
+        else:
+            log.info(f"Hot restarted in {downtime * 1000:.1f} ms.")
+            embed = self.bot.embed_util.get_embed(
+                title = "Hot Restart Complete",
+                desc = f"Reloaded the config, permissions and {len(self.bot.extensions)} cogs.",
+                fields = [{"name": "Downtime", "value": f"`{downtime * 1000:.1f} ms`", "inline": True}],
+                author = ctx.author
+            )
+        await ctx.send(embed = embed)
+        embed = self.bot.embed_util.update_embed(embed, ts = True)
+        await self.bot.log_channel.send(embed = embed)
+
+    @commands.command(name = "loglevel", help = "Changes how much a cog logs while the bot is running. Use `reset` to go back to the configured level, or no arguments to list the current levels.", brief = "Moderation DEBUG")
+    async def loglevel(self, ctx, cog_name: str = None, level: str = None):
+        """Changes the log level of a cog.
+
+        Only lasts until the bot restarts, use the "Cog Levels" config option to make it permanent.
+        """
+        if not cog_name:
+            levels = self.bot.log_util.get_levels()
+            embed = self.bot.embed_util.get_embed(
+                title = "Log Levels",
+                desc = "\n".join(f"`{name}`: `{lvl}`" for name, lvl in sorted(levels.items())),
+                fields = [{"name": "Queued Records", "value": f"`{self.bot.log_util.queue_depth()}`", "inline": True}],
+                author = ctx.author
+            )
+            return await ctx.send(embed = embed)
+
+        try:
+            cog_name = self.bot.log_util.find_logger(cog_name)
+        except ValueError as e:
+            embed = self.bot.embed_util.get_embed(
+                title = "Unknown Cog",
+                desc = str(e),
+                author = ctx.author
+            )
+            return await ctx.send(embed = embed)
+
+        try:
+            self.bot.log_util.set_level(cog_name, None if not level or level.lower() == "reset" else level)
+        except ValueError as e:
+            embed = self.bot.embed_util.get_embed(
+                title = "Invalid Log Level",
+                desc = str(e),
+                author = ctx.author
+            )
+            return await ctx.send(embed = embed)
+
+        embed = self.bot.embed_util.get_embed(
+            title = "Log Level Updated",
+            desc = f"`{cog_name}` now logs at `{self.bot.log_util.get_levels()[cog_name]}`.",
+            author = ctx.author
+        )
+        await ctx.send(embed = embed)
+        embed = self.bot.embed_util.update_embed(embed, ts = True)
+        await self.bot.log_channel.send(embed = embed)
+
+    @commands.command(name = "lag", help = "Shows how far behind the bot's event loop is, and the code that blocked it the most.", brief = "")
+    async def lag(self, ctx):
+        """Event loop lag.
+
+        Shows the average and highest lag over the last minute, then the code that
+        blocked the loop for the longest in total, from the watchdog's recent history.
+        The stack of the longest block is shown for the worst offender.
+        """
+        if not self.bot.watchdog:
+            embed = self.bot.embed_util.get_embed(
+                title = "Loop Watchdog Off",
+                desc = "The loop watchdog isn't active, see \"Loop Watchdog\" in the config.",
+                author = ctx.author
+            )
+            return await ctx.send(embed = embed)
+
+        average, highest = self.bot.watchdog.get_lag()
+        blockers = self.bot.watchdog.get_blockers()
+        fields = [
+            {"name": "Average Lag", "value": f"`{average * 1000:.1f} ms`", "inline": True},
+            {"name": "Highest Lag", "value": f"`{highest * 1000:.1f} ms`", "inline": True},
+            {"name": "Blocks Recorded", "value": f"`{len(self.bot.watchdog.stalls)}`", "inline": True}
+        ]
+        if blockers:
+            fields.append({
+                "name": "Top Blockers",
+                "value": "\n".join(f"`{b['where']}` - {b['count']}x, `{b['total'] * 1000:.0f} ms` total, `{b['max'] * 1000:.0f} ms` max" for b in blockers[:5]),
+                "inline": False
+            })
+            stack = "".join(traceback.format_list(blockers[0]['stall']['stack'][-6:]))
+            fields.append({"name": "Worst Blocker Stack", "value": f"```{stack[-1000:]}```", "inline": False})
+
+        embed = self.bot.embed_util.get_embed(
+            title = "Event Loop Lag",
+            desc = f"Blocks of more than `{self.bot.watchdog.threshold * 1000:.0f} ms` are recorded.",
+            fields = fields,
+            author = ctx.author
+        )
+        await ctx.send(embed = embed)
+
+    @commands.command(name = "profile", help = "Profiles what the bot spends its time on for a number of seconds, sending the results to the log channel.", brief = "30")
+    async def profile(self, ctx, seconds: float = 10):
+        """CPU profile.
+
+        Samples the running bot for the given number of seconds, then sends the top 20 functions and the time
+        spent on each coroutine to the log channel, with a collapsed stack file that flamegraph tools can read.
+        """
+        if not 0 < seconds <= self.bot.settings.sampling_max_time:
+            embed = self.bot.embed_util.get_embed(
+                title = "Invalid Duration",
+                desc = f"A profile can run for up to `{self.bot.settings.sampling_max_time:g}` seconds.",
+                author = ctx.author
+            )
+            return await ctx.send(embed = embed)
+
+        embed = self.bot.embed_util.get_embed(
+            title = "Profiling",
+            desc = f"Sampling the bot for `{seconds:g}` seconds, the results will be sent to the log channel.",
+            author = ctx.author
+        )
+        await ctx.send(embed = embed)
+
+        profile = await self.bot.sampling_profiler.run(seconds)
+        busy = max(profile.duration - profile.idle, 1e-9)
+        functions = [
+            f"`{own / busy * 100:5.1f}% {total / busy * 100:5.1f}%` {name[:60]}"
+            for name, own, total in profile.top_functions(20)
+        ]
+        coroutines = [f"`{time_spent / max(profile.duration, 1e-9) * 100:5.1f}%` {name[:60]}" for name, time_spent in profile.by_coroutine()[:10]]
+        fields = [
+            {"name": "Top Functions (self / total)", "value": "\n".join(functions[:10]) or "None", "inline": False},
+            {"name": "Top Functions (cont.)", "value": "\n".join(functions[10:]), "inline": False},
+            {"name": "By Coroutine", "value": "\n".join(coroutines) or "None", "inline": False}
+        ]
+
+        embed = self.bot.embed_util.get_embed(
+            title = "CPU Profile",
+            desc = (
+                f"`{profile.samples}` samples over `{profile.duration:.1f}` seconds, with the loop busy for "
+                f"`{(profile.duration - profile.idle) / max(profile.duration, 1e-9) * 100:.1f}%` of the time. "
+                "Function times are a share of the busy time, coroutine times of all of it."
+            ),
+            fields = [field for field in fields if field['value']],
+            author = ctx.author,
+            ts = True
+        )
+        name = f"profile-{datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%d-%H%M%S')}.collapsed"
+        await self.bot.log_channel.send(embed = embed, file = discord.File(io.BytesIO(profile.collapse().encode("utf-8")), name))
+
+    @commands.group(name = "memory", help = "Shows what is using the bot's memory, and what grew since a baseline.", invoke_without_command = True)
+    async def memory(self, ctx):
+        """Memory usage.
+
+        Shows the memory used, the lines that allocated the most (while tracing) and the types with the most objects.
+        """
+        tracker = self.bot.memory_tracker
+        summary = await self.bot.loop.run_in_executor(None, tracker.get_summary)
+        rss = format_size(summary['rss']) if summary['rss'] is not None else "Unknown"
+        fields = [
+            {"name": "Memory Used", "value": f"`{rss}`", "inline": True},
+            {"name": "Tracing", "value": f"`{format_size(summary['traced'][0])}` (peak `{format_size(summary['traced'][1])}`)" if summary['traced'] else "`Off`", "inline": True},
+            {"name": "Stored Mutes", "value": f"`{len(self.bot.data.get('mute', {}).get('mutes', []))}`", "inline": True},
+            {"name": "Cached Messages", "value": f"`{len(self.bot.cached_messages)}`", "inline": True},
+            {"name": "Cached Members", "value": f"`{sum(len(guild.members) for guild in self.bot.guilds)}`", "inline": True}
+        ]
+        if summary['sites']:
+            fields.append({
+                "name": "Top Allocations",
+                "value": "\n".join(f"`{format_size(size):>10}` {where[-60:]} ({count} blocks)" for where, size, count in summary['sites']),
+                "inline": False
+            })
+        fields.append({
+            "name": "Most Objects",
+            "value": "\n".join(f"`{count:>8}` {name[-60:]}" for name, count in summary['types']),
+            "inline": False
+        })
+
+        embed = self.bot.embed_util.get_embed(
+            title = "Memory",
+            desc = "Use `memory baseline` then `memory diff` to see what grows." if tracker.baseline is None else f"Baseline taken `{(time.time() - tracker.baseline['time']) / 60:.1f}` minutes ago, see `memory diff`.",
+            fields = fields,
+            author = ctx.author
+        )
+        await ctx.send(embed = embed)
+
+    @memory.command(name = "baseline", help = "Takes the snapshot that `memory diff` compares to, turning on tracing if it's off.", brief = "")
+    async def memory_baseline(self, ctx):
+        """Memory baseline.
+
+        Tracing only sees allocations made after it was turned on, so a baseline taken right after turning it on shows everything.
+        """
+        await self.bot.loop.run_in_executor(None, self.bot.memory_tracker.set_baseline)
+        embed = self.bot.embed_util.get_embed(
+            title = "Memory Baseline Taken",
+            desc = "Use `memory diff` later to see what grew since, and `memory stop` to turn tracing off once done.",
+            author = ctx.author
+        )
+        await ctx.send(embed = embed)
+
+    @memory.command(name = "diff", help = "Shows the lines and types that grew the most since the baseline.", brief = "")
+    async def memory_diff(self, ctx):
+        """Memory diff.
+
+        Compares a new snapshot to the baseline, showing the lines that allocated the most since and the types that gained the most objects.
+        """
+        diff = await self.bot.loop.run_in_executor(None, self.bot.memory_tracker.diff)
+        if diff is None:
+            embed = self.bot.embed_util.get_embed(
+                title = "No Baseline",
+                desc = "Take one with `memory baseline` first.",
+                author = ctx.author
+            )
+            return await ctx.send(embed = embed)
+
+        fields = [
+            {
+                "name": "Top Growth",
+                "value": "\n".join(f"`{'+' + format_size(size):>11}` {where[-60:]} ({count:+} blocks)" for where, size, count in diff['sites']) or "Nothing grew.",
+                "inline": False
+            },
+            {
+                "name": "Most New Objects",
+                "value": "\n".join(f"`{count:>+8}` {name[-60:]}" for name, count in diff['types']) or "No new objects.",
+                "inline": False
+            }
+        ]
+        embed = self.bot.embed_util.get_embed(
+            title = "Memory Diff",
+            desc = f"Since the baseline `{diff['seconds'] / 60:.1f}` minutes ago.",
+            fields = fields,
+            author = ctx.author
+        )
+        await ctx.send(embed = embed)
+
+    @memory.command(name = "stop", help = "Turns memory tracing off, dropping the baseline.", brief = "")
+    async def memory_stop(self, ctx):
+        """Stops memory tracing.
+
+        Frees the memory used by tracing and makes allocations fast again. The background sampler, if active, keeps logging the memory used.
+        """
+        self.bot.memory_tracker.stop_tracing()
+        embed = self.bot.embed_util.get_embed(
+            title = "Memory Tracing Stopped",
+            desc = "Use `memory baseline` to turn it back on.",
+            author = ctx.author
+        )
+        await ctx.send(embed = embed)
+
     @commands.group(name = 'cog', aliases=['cogs'], help = "A group of commands for loading, unloading, and reloading cogs.", invoke_without_command=True)
     async def cog(self, ctx):
         """The parent command for all commands related to cogs.
         """
         pass
 
+    @cog.command(name = 'timings', help = 'Shows how long each cog took to load.', brief = "")
+    async def timings(self, ctx):
+        """Cog load timings.
+
+        Lists the load time of every cog, and which lazy cogs have not been loaded yet.
+        """
+        lines = []
+        for name, timing in self.bot.extension_loader.timings.items():
+            if timing['load'] is None:
+                lines.append(f"`{name}` - Lazy, not loaded yet")
+            else:
+                lazy = " (lazy)" if timing['lazy'] else ""
+                lines.append(f"`{name}` - Load `{timing['load'] * 1000:.1f} ms`{lazy}")
+
+        embed = self.bot.embed_util.get_embed(
+            title = "Cog Load Timings",
+            desc = "\n".join(lines),
+            author = ctx.author
+        )
+        await ctx.send(embed = embed)
+
     @cog.command(name = 'load', help = 'Load a cog by name.', brief = "Cogs.General")
     async def load(self, ctx, cog_name):
         """Loading a cog.
@@ -289,8 +823,10 @@ class Internal(commands.Cog, name = "Internal"):
         Loads a cog into the system by name. Folder path separators are replaced by "."
         """
         try:
-            if cog_name in self.bot.cog_exts:
+            if cog_name in self.bot.exts:
                 self.bot.reload_extension(cog_name)
+                if self.bot.cluster:
+                    self.bot.cluster.broadcast("cog", action = "load", name = cog_name)
                 embed = self.bot.embed_util.get_embed(
                     title = f"Loaded {cog_name}",
                     author = ctx.author,
@@ -324,8 +860,10 @@ class Internal(commands.Cog, name = "Internal"):
         Turns off a registered cog by name.
         """
         try:
-            if cog_name in self.bot.cog_exts:
+            if cog_name in self.bot.exts:
                 self.bot.remove_cog(cog_name.split('.')[-1])
+                if self.bot.cluster:
+                    self.bot.cluster.broadcast("cog", action = "unload", name = cog_name)
                 embed = self.bot.embed_util.get_embed(
                     title = f"Unloaded {cog_name}",
                     author = ctx.author,
@@ -354,8 +892,10 @@ class Internal(commands.Cog, name = "Internal"):
         Essentially just unloads and then reloads a cog.
         """
         try:
-            if cog_name in self.bot.cog_exts:
+            if cog_name in self.bot.exts:
                 self.bot.reload_extension(cog_name)
+                if self.bot.cluster:
+                    self.bot.cluster.broadcast("cog", action = "reload", name = cog_name)
                 embed = self.bot.embed_util.get_embed(
                     title = f"Reloaded {cog_name}",
                     author = ctx.author,
@@ -385,9 +925,57 @@ class Internal(commands.Cog, name = "Internal"):
 # Register the internal cogs as a cog.
 bot.add_cog(Internal(bot))
 
-# Run the bot, or print an error if the bot's token is invalid.
-try:
-    bot.run(bot.TOKEN, bot = True, reconnect = True)
-except discord.LoginFailure:
-    print(f"{bot.ERR} {bot.TIMELOG()} Invalid TOKEN Variable: {bot.TOKEN}")
-    input("Press enter to continue.")
+async def cluster_data(keys):
+    """Reloads data another worker changed.
+    """
+    bot.data_manager.reload_keys(keys)
+
+async def cluster_cog(action, name):
+    """Loads, unloads or reloads a cog, as another worker did.
+    """
+    if action == "unload":
+        bot.remove_cog(name.split('.')[-1])
+    else:
+        bot.reload_extension(name)
+    log.info(f"{action.capitalize()}ed {name}, as another worker did.")
+
+async def cluster_hotrestart():
+    """Hot restarts, as another worker did.
+    """
+    failed, error = hot_restart()
+    if failed:
+        log.error(f"Hot restart rolled back, {failed} failed to load: {error}")
+    else:
+        log.info("Hot restarted, as another worker did.")
+
+async def cluster_restart():
+    """Shuts down, as another worker did, for the launcher to start this worker again.
+    """
+    log.info("Restarting, as another worker did.")
+    await bot.close()
+
+if bot.cluster:
+    bot.cluster.on("data", cluster_data)
+    bot.cluster.on("cog", cluster_cog)
+    bot.cluster.on("hotrestart", cluster_hotrestart)
+    bot.cluster.on("restart", cluster_restart)
+
+def run():
+    """Runs the bot, or logs an error if the bot's token is invalid.
+
+    Only called when this file is run, so importing it (e.g. from `benchmarks/harness.py`)
+    sets the bot up without connecting to Discord.
+    """
+    try:
+        profiler.mark("connecting")
+        bot.run(bot.TOKEN, bot = True, reconnect = True)
+    except discord.LoginFailure:
+        log.error(f"Invalid TOKEN Variable: {bot.TOKEN}")
+        # Make sure the error is shown before waiting on the user.
+        bot.log_util.stop()
+        input("Press enter to continue.")
+    finally:
+        bot.log_util.stop()
+
+if __name__ == "__main__":
+    run()